@@ -13,11 +13,21 @@ Dependencies:
 - python-dotenv
 """
 
+import csv
+import hashlib
+import json
+import logging
 import os
-import warnings
-from typing import Optional, Dict, Any
-from io import StringIO
+import re
+import tempfile
+import time
+from functools import lru_cache
+from itertools import islice
+from pathlib import Path
+from typing import Optional, Dict, Any, List, Tuple, Union
+from io import BytesIO, StringIO
 
+import numpy as np
 import pandas as pd
 from dotenv import load_dotenv
 
@@ -33,20 +43,141 @@ except ImportError:
     APITimeoutError = Exception
     RateLimitError = Exception
 
+# Read timeouts raised while iterating a stream come straight from httpx;
+# the SDK only wraps those hit before the response starts (APITimeoutError)
+try:
+    from httpx import TimeoutException as StreamTimeoutError
+except ImportError:
+    StreamTimeoutError = APITimeoutError
+
+logger = logging.getLogger(__name__)
+
 # Load environment variables
 load_dotenv()
 
+# Test filename pattern: r{test_num}_{miner}_{timestamp}
+_FILENAME_RE = re.compile(r'^r(\d+)_(\d+)_(.+)$')
+
+# Standardized ingestion columns and the names the prompt defines
+_STANDARD_TO_LLM_COLUMNS = {
+    'seconds': 'miner.seconds',
+    'mode_power': 'miner.mode.power',
+    'summary_wattage': 'miner.summary.wattage',
+    'temp_hash_board_max': 'miner.temp.hash_board_max',
+    'psu_temp_max': 'miner.psu.temp_max',
+    'outage': 'miner.outage'
+}
+# Columns described in the prompt; anything else only costs input tokens
+_LLM_COLUMNS = tuple(_STANDARD_TO_LLM_COLUMNS.values())
+_FAST_CSV_HEADER = ','.join(_LLM_COLUMNS)
+_FAST_CSV_FORMAT = '%d,%d,%d,%.1f,%.1f,%d'
+
+# Environment variable that enables the on-disk response cache
+CACHE_DIR_ENV_VAR = 'REPORT_GENERATOR_CACHE_DIR'
+
+
+@lru_cache(maxsize=None)
+def _round_decimals(column: str) -> int:
+    """
+    Decimal places to keep for a numeric column in the LLM CSV.
+    
+    Seconds and power/wattage round to whole numbers, temperatures to one
+    decimal, everything else to two.
+    """
+    name = column.lower()
+    if 'seconds' in name or 'wattage' in name or 'power' in name:
+        return 0
+    if 'temp' in name:
+        return 1
+    return 2
+
+
+@lru_cache(maxsize=4)
+def _get_client(api_key: str, timeout: int):
+    """
+    Return a shared Anthropic client for the given key and timeout.
+    
+    Reusing the client keeps its HTTP connection pool alive across calls.
+    """
+    return anthropic.Anthropic(api_key=api_key, timeout=timeout)
+
+
+def _transition_keep_positions(
+    seconds: np.ndarray,
+    target_rows: int,
+    window_seconds: float = 60.0
+) -> np.ndarray:
+    """
+    Row positions to keep when reducing a series to about target_rows rows.
+    
+    Every row within ±window_seconds of t=0 is kept, and the remaining
+    budget is spread evenly over the rows outside it. If the window alone
+    exceeds the budget, the window itself is evenly strided.
+    
+    Args:
+        seconds: Time values in row order
+        target_rows: Maximum number of rows to keep
+        window_seconds: Half-width of the transition window (default: 60)
+    
+    Returns:
+        Sorted integer positions into seconds
+    """
+    if len(seconds) <= target_rows:
+        return np.arange(len(seconds))
+    
+    in_window = np.abs(seconds) <= window_seconds
+    window_idx = np.flatnonzero(in_window)
+    
+    def _evenly_spaced(positions: np.ndarray, count: int) -> np.ndarray:
+        if count <= 0 or positions.size == 0:
+            return positions[:0]
+        picks = np.linspace(0, positions.size - 1, min(count, positions.size))
+        return positions[np.unique(picks.round().astype(np.int64))]
+    
+    if window_idx.size >= target_rows:
+        return _evenly_spaced(window_idx, target_rows)
+    
+    tail_idx = np.flatnonzero(~in_window)
+    tail_keep = _evenly_spaced(tail_idx, target_rows - window_idx.size)
+    return np.union1d(window_idx, tail_keep)
+
+
+def _decimate_around_transition(
+    df: pd.DataFrame,
+    target_rows: int,
+    window_seconds: float = 60.0
+) -> pd.DataFrame:
+    """
+    Reduce a frame to about target_rows rows, favoring the transition window.
+    
+    Args:
+        df: DataFrame with a 'miner.seconds' column
+        target_rows: Maximum number of rows to keep
+        window_seconds: Half-width of the transition window (default: 60)
+    
+    Returns:
+        Row subset of df in original order
+    """
+    if len(df) <= target_rows:
+        return df
+    
+    seconds = df['miner.seconds'].to_numpy(dtype=float)
+    return df.iloc[_transition_keep_positions(seconds, target_rows, window_seconds)]
+
 
 def format_csv_for_llm(
     raw_data: pd.DataFrame,
     max_tokens: int = 14000
-) -> str:
+) -> Tuple[str, List[str]]:
     """
     Convert DataFrame to compact CSV string optimized for LLM token consumption.
     
     This function formats the raw power profile data into a compact CSV string
     suitable for sending to Claude API. It optimizes for token efficiency while
-    preserving all critical information.
+    preserving all critical information. Only the columns defined in the
+    prompt are sent; others (e.g. miner.collection.*) are dropped. Output that
+    would exceed max_tokens is downsampled, keeping every row within ±60s of
+    the transition.
     
     Token estimation: ~4 characters = 1 token (rough approximation)
     
@@ -58,16 +189,18 @@ def format_csv_for_llm(
                   - miner.temp.hash_board_max
                   - miner.psu.temp_max
                   - miner.outage
-                  - miner.collection.summary_error
-                  - miner.collection.mode_error
         max_tokens: Maximum token count target (default: 14000)
     
     Returns:
-        Compact CSV string representation
+        Tuple of (csv_string, warnings)
+        - csv_string: Compact CSV string representation
+        - warnings: List of data-size warnings (e.g. downsampling applied)
     
     Raises:
         ValueError: If required columns are missing or DataFrame is empty
     """
+    format_warnings: List[str] = []
+    
     # Validate input
     if raw_data is None or raw_data.empty:
         raise ValueError("raw_data cannot be None or empty")
@@ -85,41 +218,149 @@ def format_csv_for_llm(
             f"Missing required columns: {', '.join(missing_cols)}"
         )
     
-    # Create a copy to avoid modifying original
-    df = raw_data.copy()
-    
-    # Round numeric columns to reduce precision (saves tokens without losing meaning)
-    numeric_cols = df.select_dtypes(include=['float64', 'float32']).columns
-    for col in numeric_cols:
-        if 'seconds' in col.lower():
-            # Keep seconds as integers (they're already integers)
-            df[col] = df[col].round(0).astype('Int64')
-        elif 'wattage' in col.lower() or 'power' in col.lower():
-            # Round power to nearest watt
-            df[col] = df[col].round(0).astype('Int64')
-        elif 'temp' in col.lower():
-            # Round temperature to 1 decimal
-            df[col] = df[col].round(1)
-        else:
-            # Other numeric fields: 2 decimals
-            df[col] = df[col].round(2)
-    
-    # Convert to CSV string without index
-    csv_buffer = StringIO()
-    df.to_csv(csv_buffer, index=False, lineterminator='\n')
-    csv_string = csv_buffer.getvalue()
-    
-    # Estimate token count (rough: 4 chars = 1 token)
-    estimated_tokens = len(csv_string) // 4
-    
-    # Warn if exceeding target
+    # Keep only the columns the prompt defines, in prompt order
+    llm_columns = [col for col in _LLM_COLUMNS if col in raw_data.columns]
+    dropped = len(raw_data.columns) - len(llm_columns)
+    if dropped:
+        logger.debug(f"Dropped {dropped} columns not used by the prompt from LLM CSV")
+    
+    # Round float columns to reduce precision (saves tokens without losing
+    # meaning). Columns are assembled into a new frame, so the original is
+    # never copied or modified.
+    out = {}
+    for col in llm_columns:
+        values = raw_data[col].to_numpy()
+        if values.dtype == np.bool_:
+            # 0/1 is one byte per row instead of "True"/"False"
+            out[col] = values.view(np.int8)
+            continue
+        if values.dtype.kind != 'f':
+            out[col] = raw_data[col].array
+            continue
+        
+        decimals = _round_decimals(col)
+        rounded = np.round(values, decimals)
+        
+        if decimals == 0:
+            # Whole numbers print without ".0"; NaN stays blank via nullable ints
+            nan_mask = np.isnan(rounded)
+            if nan_mask.any():
+                rounded = pd.arrays.IntegerArray(
+                    np.where(nan_mask, 0, rounded).astype(np.int64), nan_mask
+                )
+            else:
+                rounded = rounded.astype(np.int64)
+        
+        out[col] = rounded
+    
+    df = pd.DataFrame(out, copy=False)
+    
+    # Serialize straight to UTF-8 bytes; the byte count gives the token
+    # estimate without materializing an intermediate string
+    csv_buffer = BytesIO()
+    df.to_csv(csv_buffer, index=False, lineterminator='\n', mode='wb', encoding='utf-8')
+    
+    # Estimate token count (rough: 4 chars = 1 token; data is ASCII)
+    estimated_tokens = csv_buffer.tell() // 4
+    
+    # Downsample to fit the budget instead of sending an oversized payload
+    if estimated_tokens > max_tokens:
+        avg_row_bytes = csv_buffer.tell() / (len(df) + 1)  # +1 for header
+        target_rows = max(int(max_tokens * 4 / avg_row_bytes) - 1, 1)
+        decimated = _decimate_around_transition(df, target_rows)
+        
+        csv_buffer = BytesIO()
+        decimated.to_csv(csv_buffer, index=False, lineterminator='\n', mode='wb', encoding='utf-8')
+        
+        warning = (
+            f"CSV data exceeded token limit: ~{estimated_tokens:,} tokens "
+            f"(target: {max_tokens:,}). Downsampled from {len(df):,} to "
+            f"{len(decimated):,} rows around the transition."
+        )
+        logger.warning(warning)
+        format_warnings.append(warning)
+    
+    return csv_buffer.getvalue().decode('utf-8'), format_warnings
+
+
+def format_csv_for_llm_fast(
+    df_std: pd.DataFrame,
+    max_tokens: int = 14000
+) -> Tuple[str, List[str]]:
+    """
+    Format an already-ingested DataFrame for the LLM without pandas CSV writing.
+    
+    Takes the standardized, type-converted frame from DataIngestion.load_csv
+    and writes the six prompt columns straight from NumPy arrays with
+    np.savetxt. Values are rounded the same way as format_csv_for_llm and
+    the header uses the prompt's column names.
+    
+    Args:
+        df_std: DataFrame with standardized columns (seconds, mode_power,
+                summary_wattage, temp_hash_board_max, psu_temp_max, outage)
+        max_tokens: Maximum token count target (default: 14000)
+    
+    Returns:
+        Tuple of (csv_string, warnings), as from format_csv_for_llm()
+    
+    Raises:
+        ValueError: If standardized columns are missing or DataFrame is empty
+    """
+    if df_std is None or df_std.empty:
+        raise ValueError("df_std cannot be None or empty")
+    
+    missing_cols = [col for col in _STANDARD_TO_LLM_COLUMNS if col not in df_std.columns]
+    if missing_cols:
+        raise ValueError(
+            f"Missing required columns: {', '.join(missing_cols)}"
+        )
+    
+    arrays = [
+        df_std[col].to_numpy(dtype=float)
+        for col in list(_STANDARD_TO_LLM_COLUMNS)[:-1]
+    ]
+    outage = df_std['outage'].to_numpy(dtype=np.int8)
+    
+    # savetxt cannot write blank cells; let pandas handle frames with NaN
+    if any(np.isnan(values).any() for values in arrays):
+        renamed = df_std[list(_STANDARD_TO_LLM_COLUMNS)].rename(columns=_STANDARD_TO_LLM_COLUMNS)
+        renamed['miner.outage'] = outage
+        return format_csv_for_llm(renamed, max_tokens=max_tokens)
+    
+    # Whole-number columns are rounded here; '%d' alone would truncate
+    table = np.column_stack([
+        np.rint(arrays[0]),
+        np.rint(arrays[1]),
+        np.rint(arrays[2]),
+        arrays[3],
+        arrays[4],
+        outage
+    ])
+    
+    def _render(rows: np.ndarray) -> BytesIO:
+        buffer = BytesIO()
+        np.savetxt(buffer, rows, fmt=_FAST_CSV_FORMAT, header=_FAST_CSV_HEADER, comments='')
+        return buffer
+    
+    format_warnings: List[str] = []
+    csv_buffer = _render(table)
+    estimated_tokens = csv_buffer.tell() // 4
+    
     if estimated_tokens > max_tokens:
-        warnings.warn(
-            f"CSV data may exceed token limit: ~{estimated_tokens:,} tokens "
-            f"(target: {max_tokens:,}). Consider sampling or reducing columns."
+        avg_row_bytes = csv_buffer.tell() / (len(table) + 1)  # +1 for header
+        target_rows = max(int(max_tokens * 4 / avg_row_bytes) - 1, 1)
+        keep = _transition_keep_positions(arrays[0], target_rows)
+        csv_buffer = _render(table[keep])
+        
+        warning = (
+            f"CSV data exceeded token limit: ~{estimated_tokens:,} tokens "
+            f"(target: {max_tokens:,}). Downsampled from {len(table):,} to "
+            f"{len(keep):,} rows around the transition."
         )
+        logger.warning(warning)
+        format_warnings.append(warning)
     
-    return csv_string
+    return csv_buffer.getvalue().decode('utf-8'), format_warnings
 
 
 def estimate_token_count(text: str) -> int:
@@ -153,14 +394,28 @@ def validate_csv_format(csv_string: str) -> bool:
     if not csv_string or not csv_string.strip():
         raise ValueError("CSV string is empty")
     
-    # Try to parse it back
-    try:
-        df = pd.read_csv(StringIO(csv_string))
-        if df.empty:
-            raise ValueError("CSV parses to empty DataFrame")
+    # Structural check instead of a full pandas parse: a header line with
+    # at least one delimiter followed by at least one data row
+    stripped = csv_string.strip()
+    if stripped.count('"') % 2:
+        raise ValueError("Invalid CSV format: unclosed quoted field")
+    
+    header_end = stripped.find('\n')
+    if header_end == -1:
+        raise ValueError("Invalid CSV format: CSV parses to empty DataFrame")
+    
+    header = stripped[:header_end]
+    if ',' in header and '"' not in header:
         return True
-    except Exception as e:
+    
+    # Single-column or quoted headers may span lines; read two real rows
+    try:
+        rows = list(islice(csv.reader(StringIO(stripped)), 2))
+    except csv.Error as e:
         raise ValueError(f"Invalid CSV format: {str(e)}")
+    if len(rows) < 2:
+        raise ValueError("Invalid CSV format: CSV parses to empty DataFrame")
+    return True
 
 
 def extract_test_info(file_path: str) -> Dict[str, str]:
@@ -179,14 +434,9 @@ def extract_test_info(file_path: str) -> Dict[str, str]:
     Raises:
         ValueError: If filename doesn't match expected format
     """
-    import re
-    from pathlib import Path
-    
     filename = Path(file_path).stem  # Get filename without extension
     
-    # Pattern: r{test_num}_{miner}_{timestamp}
-    pattern = r'^r(\d+)_(\d+)_(.+)$'
-    match = re.match(pattern, filename)
+    match = _FILENAME_RE.match(filename)
     
     if not match:
         raise ValueError(
@@ -203,6 +453,57 @@ def extract_test_info(file_path: str) -> Dict[str, str]:
     }
 
 
+def _typical_power(values: np.ndarray) -> float:
+    """
+    Most common power value (smallest on ties), or the mean if all are NaN.
+    
+    Args:
+        values: Target power readings for one side of the transition
+    
+    Returns:
+        Typical power in watts (NaN if no valid readings)
+    """
+    valid = values[~np.isnan(values)]
+    if valid.size == 0:
+        return float('nan')
+    
+    as_int = valid.astype(np.int64)
+    if as_int.min() >= 0 and np.array_equal(as_int, valid):
+        # Integer watt settings: counting is cheaper than sorting
+        return float(np.bincount(as_int).argmax())
+    
+    unique_values, counts = np.unique(valid, return_counts=True)
+    return float(unique_values[counts.argmax()])
+
+
+def _power_before_after(raw_data: pd.DataFrame) -> Tuple[Optional[float], Optional[float]]:
+    """
+    Typical target power before (t < 0) and after (t > 0) the transition.
+    
+    Args:
+        raw_data: DataFrame with 'miner.seconds' and 'miner.mode.power' columns
+    
+    Returns:
+        Tuple of (power_before, power_after); a side is None if it has no rows
+    
+    Raises:
+        ValueError: If 'miner.mode.power' column is missing
+    """
+    if 'miner.mode.power' not in raw_data.columns:
+        raise ValueError("Missing 'miner.mode.power' column")
+    
+    seconds = raw_data['miner.seconds'].to_numpy(dtype=float)
+    power = raw_data['miner.mode.power'].to_numpy(dtype=float)
+    
+    before = power[seconds < 0]
+    after = power[seconds > 0]
+    
+    return (
+        _typical_power(before) if before.size else None,
+        _typical_power(after) if after.size else None
+    )
+
+
 def determine_step_direction(raw_data: pd.DataFrame) -> str:
     """
     Determine if test is UP-STEP or DOWN-STEP by analyzing mode.power changes.
@@ -216,20 +517,11 @@ def determine_step_direction(raw_data: pd.DataFrame) -> str:
     Raises:
         ValueError: If step direction cannot be determined
     """
-    if 'miner.mode.power' not in raw_data.columns:
-        raise ValueError("Missing 'miner.mode.power' column")
-    
-    # Get power values before and after transition (t=0)
-    before_transition = raw_data[raw_data['miner.seconds'] < 0]['miner.mode.power']
-    after_transition = raw_data[raw_data['miner.seconds'] > 0]['miner.mode.power']
+    power_before, power_after = _power_before_after(raw_data)
     
-    if before_transition.empty or after_transition.empty:
+    if power_before is None or power_after is None:
         raise ValueError("Cannot determine step direction: missing before/after data")
     
-    # Get typical values (use mode or most common value)
-    power_before = before_transition.mode().iloc[0] if not before_transition.mode().empty else before_transition.mean()
-    power_after = after_transition.mode().iloc[0] if not after_transition.mode().empty else after_transition.mean()
-    
     if power_after > power_before:
         return "UP-STEP"
     elif power_after < power_before:
@@ -251,14 +543,11 @@ def format_power_range(raw_data: pd.DataFrame) -> str:
     Returns:
         Formatted string like "1000W → 3500W"
     """
-    if 'miner.mode.power' not in raw_data.columns:
-        raise ValueError("Missing 'miner.mode.power' column")
-    
-    before_transition = raw_data[raw_data['miner.seconds'] < 0]['miner.mode.power']
-    after_transition = raw_data[raw_data['miner.seconds'] > 0]['miner.mode.power']
+    power_before, power_after = _power_before_after(raw_data)
     
-    power_before = before_transition.mode().iloc[0] if not before_transition.mode().empty else before_transition.mean()
-    power_after = after_transition.mode().iloc[0] if not after_transition.mode().empty else after_transition.mean()
+    nan = float('nan')
+    power_before = nan if power_before is None else power_before
+    power_after = nan if power_after is None else power_after
     
     return f"{power_before:.0f}W → {power_after:.0f}W"
 
@@ -295,32 +584,44 @@ def build_prompt(
     )
 
 
-def get_analysis(
-    prompt: str,
-    model: str = "claude-sonnet-4-20250514",
-    timeout: int = 60,
-    max_tokens: int = 2000
-) -> Dict[str, Any]:
+def build_prompt_blocks(
+    test_id: str,
+    miner_number: str,
+    step_direction: str,
+    power_range: str,
+    csv_content: str
+) -> List[Dict[str, Any]]:
     """
-    Call Claude API to get narrative analysis.
+    Build analysis prompt as content blocks with a cacheable static prefix.
     
     Args:
-        prompt: Complete analysis prompt
-        model: Claude model to use (default: claude-sonnet-4-20250514)
-        timeout: Request timeout in seconds (default: 60)
-        max_tokens: Maximum tokens in response (default: 2000)
+        test_id: Test identifier
+        miner_number: Miner unit number
+        step_direction: UP-STEP or DOWN-STEP
+        power_range: Power transition range
+        csv_content: Formatted CSV data
     
     Returns:
-        Dictionary with:
-            - 'analysis': Generated narrative text
-            - 'tokens_used': Dict with 'input' and 'output' token counts
-            - 'model': Model used for generation
-            - 'stop_reason': Why the model stopped generating
+        List of content blocks ready to pass to get_analysis()
+    """
+    from src.analysis.prompt_template import format_prompt_blocks
+    
+    return format_prompt_blocks(
+        test_id=test_id,
+        miner_number=miner_number,
+        step_direction=step_direction,
+        power_range=power_range,
+        csv_content=csv_content
+    )
+
+
+def _get_api_key(model: str) -> str:
+    """
+    Check API prerequisites and return the configured API key.
     
     Raises:
-        ValueError: If API key is missing or invalid
-        TimeoutError: If request exceeds timeout
-        RuntimeError: For API errors (rate limits, invalid request, etc.)
+        ImportError: If the anthropic package is not installed
+        ValueError: If API key is missing or model name is invalid
     """
     # Check if anthropic package is available
     if anthropic is None:
@@ -344,15 +645,186 @@ def get_analysis(
     if not model or not isinstance(model, str):
         raise ValueError(f"Invalid model name: {model}")
     
-    try:
-        # Initialize client
-        client = anthropic.Anthropic(
-            api_key=api_key,
-            timeout=timeout
+    return api_key
+
+
+def _build_result(analysis_text: str, response: Any) -> Dict[str, Any]:
+    """Assemble the analysis result dict from text and a final API message."""
+    # Cache counters are absent when caching was not used
+    usage = response.usage
+    cache_read = getattr(usage, 'cache_read_input_tokens', None)
+    cache_creation = getattr(usage, 'cache_creation_input_tokens', None)
+    
+    return {
+        'analysis': analysis_text,
+        'tokens_used': {
+            'input': usage.input_tokens,
+            'output': usage.output_tokens,
+            'total': usage.input_tokens + usage.output_tokens,
+            'cache_read': cache_read if isinstance(cache_read, int) else 0,
+            'cache_creation': cache_creation if isinstance(cache_creation, int) else 0
+        },
+        'model': response.model,
+        'stop_reason': response.stop_reason
+    }
+
+
+def _translate_api_error(
+    error: Exception,
+    timeout: int,
+    stall_timeout: Optional[float] = None
+) -> Exception:
+    """Map an Anthropic SDK error to the exception raised by this module."""
+    if isinstance(error, (APITimeoutError, StreamTimeoutError)):
+        if stall_timeout is not None:
+            return TimeoutError(
+                f"Claude API request timed out or stalled (no connection within "
+                f"{timeout} seconds, or no data for {stall_timeout:.0f} seconds). "
+                "Try increasing the timeout parameters or check your network connection."
+            )
+        return TimeoutError(
+            f"Claude API request timed out after {timeout} seconds. "
+            "Try increasing the timeout parameter or check your network connection."
+        )
+    
+    if isinstance(error, RateLimitError):
+        return RuntimeError(
+            "Claude API rate limit exceeded. Please wait a moment and try again, "
+            "or upgrade your Anthropic account for higher limits."
         )
+    
+    if isinstance(error, APIConnectionError):
+        return RuntimeError(
+            f"Failed to connect to Claude API: {str(error)}. "
+            "Check your internet connection and try again."
+        )
+    
+    if isinstance(error, APIError):
+        # Handle various API errors
+        error_msg = str(error)
+        if 'invalid' in error_msg.lower() and 'api' in error_msg.lower() and 'key' in error_msg.lower():
+            return ValueError(
+                "Invalid ANTHROPIC_API_KEY. Please check your API key in .env file. "
+                "Get a valid key from https://console.anthropic.com/"
+            )
+        return RuntimeError(f"Claude API error: {error_msg}")
+    
+    # Any other unexpected error
+    return RuntimeError(
+        f"Unexpected error calling Claude API: {type(error).__name__}: {str(error)}"
+    )
+
+
+def _response_cache_path(
+    cache_dir: Path,
+    prompt: Union[str, List[Dict[str, Any]]],
+    model: str,
+    max_tokens: int
+) -> Path:
+    """Cache file for a request, keyed by a hash of everything sent to the API."""
+    if isinstance(prompt, str):
+        prompt_text = prompt
+    else:
+        prompt_text = json.dumps(prompt, sort_keys=True, ensure_ascii=False)
+    
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{model}\0{max_tokens}\0".encode('utf-8'))
+    digest.update(prompt_text.encode('utf-8'))
+    return cache_dir / f"{digest.hexdigest()}.json"
+
+
+def _read_cached_response(path: Path) -> Optional[Dict[str, Any]]:
+    """Load a cached analysis result, or None if absent or unreadable."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable analysis cache entry {path}: {e}")
+        return None
+
+
+def _write_cached_response(path: Path, result: Dict[str, Any]) -> None:
+    """Store an analysis result; failures are logged, never raised."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Unique temp file per writer, so concurrent writers of the same key
+        # never rename each other's half-written file into place
+        with tempfile.NamedTemporaryFile(
+            'w', encoding='utf-8', dir=path.parent, prefix=f"{path.stem}.",
+            suffix='.tmp', delete=False
+        ) as f:
+            tmp_path = Path(f.name)
+            json.dump(result, f, ensure_ascii=False)
+        try:
+            os.replace(tmp_path, path)
+        except OSError:
+            tmp_path.unlink(missing_ok=True)
+            raise
+    except OSError as e:
+        logger.warning(f"Could not write analysis cache entry {path}: {e}")
+
+
+def get_analysis(
+    prompt: Union[str, List[Dict[str, Any]]],
+    model: str = "claude-sonnet-4-20250514",
+    timeout: int = 60,
+    max_tokens: int = 2000,
+    stall_timeout: float = 30.0,
+    cache_dir: Optional[Union[str, Path]] = None
+) -> Dict[str, Any]:
+    """
+    Call Claude API to get narrative analysis.
+    
+    Args:
+        prompt: Complete analysis prompt, either a plain string or content
+                blocks from build_prompt_blocks() (enables prompt caching)
+        model: Claude model to use (default: claude-sonnet-4-20250514)
+        timeout: Connect and write timeout in seconds (default: 60)
+        max_tokens: Maximum tokens in response (default: 2000)
+        stall_timeout: Read timeout in seconds: the longest the stream may
+                       go without receiving data, including before the first
+                       token (default: 30)
+        cache_dir: Directory for cached responses keyed by prompt hash.
+                   Defaults to $REPORT_GENERATOR_CACHE_DIR; caching is
+                   disabled when neither is set. Only complete responses
+                   (stop_reason 'end_turn') are cached.
+    
+    Returns:
+        Dictionary with:
+            - 'analysis': Generated narrative text
+            - 'tokens_used': Dict with 'input', 'output', 'total',
+              'cache_read' and 'cache_creation' token counts
+            - 'model': Model used for generation
+            - 'stop_reason': Why the model stopped generating
+    
+    Raises:
+        ValueError: If API key is missing or invalid
+        TimeoutError: If request exceeds timeout or the stream stalls
+        RuntimeError: For API errors (rate limits, invalid request, etc.)
+    """
+    cache_dir = cache_dir or os.getenv(CACHE_DIR_ENV_VAR)
+    cache_path = None
+    if cache_dir:
+        cache_path = _response_cache_path(Path(cache_dir).expanduser(), prompt, model, max_tokens)
+        cached = _read_cached_response(cache_path)
+        if cached is not None:
+            logger.info(f"Using cached analysis from {cache_path}")
+            return cached
+    
+    api_key = _get_api_key(model)
+    
+    try:
+        # Reuse client (and its connection pool) across calls
+        client = _get_client(api_key, timeout)
+        
+        # Stream the response with stall_timeout as the socket read timeout,
+        # so a hung connection fails as soon as no data arrives for that long
+        # (the API sends keep-alive pings while the model is working)
+        chunks: List[str] = []
         
-        # Make API call
-        response = client.messages.create(
+        with client.messages.stream(
             model=model,
             max_tokens=max_tokens,
             messages=[
@@ -360,62 +832,144 @@ def get_analysis(
                     "role": "user",
                     "content": prompt
                 }
-            ]
-        )
+            ],
+            timeout=anthropic.Timeout(timeout, read=stall_timeout)
+        ) as stream:
+            for text in stream.text_stream:
+                chunks.append(text)
+            
+            response = stream.get_final_message()
         
         # Extract response text
-        if not response.content or len(response.content) == 0:
+        analysis_text = ''.join(chunks)
+        if not analysis_text:
             raise RuntimeError("Claude API returned empty response")
         
-        # Get text from first content block
-        analysis_text = response.content[0].text if hasattr(response.content[0], 'text') else str(response.content[0])
-        
-        # Return structured response
-        return {
-            'analysis': analysis_text,
-            'tokens_used': {
-                'input': response.usage.input_tokens,
-                'output': response.usage.output_tokens,
-                'total': response.usage.input_tokens + response.usage.output_tokens
-            },
-            'model': response.model,
-            'stop_reason': response.stop_reason
-        }
+        result = _build_result(analysis_text, response)
     
-    except APITimeoutError as e:
-        raise TimeoutError(
-            f"Claude API request timed out after {timeout} seconds. "
-            "Try increasing the timeout parameter or check your network connection."
-        ) from e
+    except Exception as e:
+        raise _translate_api_error(e, timeout, stall_timeout) from e
     
-    except RateLimitError as e:
-        raise RuntimeError(
-            "Claude API rate limit exceeded. Please wait a moment and try again, "
-            "or upgrade your Anthropic account for higher limits."
-        ) from e
+    # Only complete answers are cached; a response cut off at max_tokens
+    # would otherwise be replayed instead of retried
+    if cache_path is not None and result['stop_reason'] == 'end_turn':
+        _write_cached_response(cache_path, result)
     
-    except APIConnectionError as e:
-        raise RuntimeError(
-            f"Failed to connect to Claude API: {str(e)}. "
-            "Check your internet connection and try again."
-        ) from e
+    # Return structured response
+    return result
+
+
+def get_analysis_batch(
+    prompts: List[Dict[str, Any]],
+    model: str = "claude-sonnet-4-20250514",
+    timeout: int = 60,
+    max_tokens: int = 2000,
+    poll_interval: float = 10.0,
+    max_wait: float = 24 * 3600
+) -> List[Dict[str, Any]]:
+    """
+    Analyze several tests in one Message Batches API request.
     
-    except APIError as e:
-        # Handle various API errors
-        error_msg = str(e)
-        if 'invalid' in error_msg.lower() and 'api' in error_msg.lower() and 'key' in error_msg.lower():
-            raise ValueError(
-                "Invalid ANTHROPIC_API_KEY. Please check your API key in .env file. "
-                "Get a valid key from https://console.anthropic.com/"
-            ) from e
-        else:
-            raise RuntimeError(
-                f"Claude API error: {error_msg}"
-            ) from e
+    Batches are billed at half the per-token price of single requests but
+    finish asynchronously, so this suits offline report runs rather than
+    interactive use. A batch still running at max_wait is cancelled.
+    
+    Args:
+        prompts: List of dicts with 'test_id' and 'prompt' (string or
+                 content blocks from build_prompt_blocks())
+        model: Claude model to use (default: claude-sonnet-4-20250514)
+        timeout: HTTP request timeout in seconds (default: 60)
+        max_tokens: Maximum tokens in each response (default: 2000)
+        poll_interval: Seconds between batch status checks (default: 10)
+        max_wait: Maximum seconds to wait for the batch (default: 24h)
+    
+    Returns:
+        One dictionary per prompt, in input order, with 'test_id' plus either
+        the get_analysis() fields or an 'error' message for that request
+    
+    Raises:
+        ValueError: If API key is missing or invalid
+        TimeoutError: If the batch does not finish within max_wait
+        RuntimeError: For API errors (rate limits, invalid request, etc.)
+    """
+    api_key = _get_api_key(model)
+    
+    if not prompts:
+        return []
+    
+    # custom_id must be unique per batch, so key requests by position
+    requests = [
+        {
+            'custom_id': f"prompt-{idx}",
+            'params': {
+                'model': model,
+                'max_tokens': max_tokens,
+                'messages': [
+                    {
+                        'role': 'user',
+                        'content': item['prompt']
+                    }
+                ]
+            }
+        }
+        for idx, item in enumerate(prompts)
+    ]
+    
+    try:
+        client = _get_client(api_key, timeout)
+        batch = client.messages.batches.create(requests=requests)
+        logger.info(f"Submitted message batch {batch.id} with {len(requests)} requests")
+        
+        deadline = time.monotonic() + max_wait
+        while batch.processing_status != 'ended':
+            if time.monotonic() > deadline:
+                # Stop billing for a batch nobody will collect
+                try:
+                    client.messages.batches.cancel(batch.id)
+                except Exception as e:
+                    logger.warning(f"Could not cancel message batch {batch.id}: {e}")
+                raise TimeoutError(
+                    f"Message batch {batch.id} did not finish within {max_wait:.0f} seconds"
+                )
+            time.sleep(poll_interval)
+            batch = client.messages.batches.retrieve(batch.id)
+        
+        results: List[Optional[Dict[str, Any]]] = [None] * len(prompts)
+        for entry in client.messages.batches.results(batch.id):
+            idx = int(entry.custom_id.split('-', 1)[1])
+            test_id = prompts[idx].get('test_id')
+            
+            if entry.result.type != 'succeeded':
+                results[idx] = {
+                    'test_id': test_id,
+                    'error': f"Batch request {entry.result.type}"
+                }
+                continue
+            
+            message = entry.result.message
+            analysis_text = ''.join(
+                block.text for block in message.content if getattr(block, 'type', None) == 'text'
+            )
+            if not analysis_text:
+                results[idx] = {
+                    'test_id': test_id,
+                    'error': "Claude API returned empty response"
+                }
+                continue
+            
+            results[idx] = {'test_id': test_id, **_build_result(analysis_text, message)}
+        
+        # Requests missing from the results stream are reported, not dropped
+        return [
+            result if result is not None else {
+                'test_id': prompts[idx].get('test_id'),
+                'error': "No result returned for batch request"
+            }
+            for idx, result in enumerate(results)
+        ]
+    
+    except TimeoutError:
+        raise
     
     except Exception as e:
-        # Catch any other unexpected errors
-        raise RuntimeError(
-            f"Unexpected error calling Claude API: {type(e).__name__}: {str(e)}"
-        ) from e
-
+        raise _translate_api_error(e, timeout) from e
@@ -18,17 +18,25 @@ Template placeholders:
 - {csv_content}: Raw CSV data as compact string
 """
 
-# Hardcoded prompt template with required placeholders
-ANALYSIS_PROMPT_TEMPLATE = """You are analyzing a cryptocurrency miner power profile test. The test measures how the miner responds when its power target changes.
+import logging
+import re
+from functools import lru_cache
+from string import Formatter
+from typing import Optional, Tuple
 
-Test Information:
-- Test: {test_id}
-- Miner: {miner_number}
-- Test Type: {step_direction}
-- Power Transition: {power_range}
+logger = logging.getLogger(__name__)
 
-Raw Test Data (CSV):
-{csv_content}
+# Placeholder names such as {test_id}
+_PLACEHOLDER_RE = re.compile(r'\{(\w+)\}')
+
+# Static instructions shared by every test. Kept first so it forms a stable
+# prefix that Anthropic prompt caching can reuse across calls; it must stay
+# above the model's minimum cacheable length (1,024 tokens for Sonnet/Opus),
+# so the field definitions, rubric and output format all live here.
+STATIC_PREAMBLE = """You are analyzing a cryptocurrency miner power profile test. The test measures how the miner responds when its power target changes.
+
+Test Procedure:
+Each test records one miner for a period before and after a single change of its power target. The miner runs at a starting power target, the target is changed at one instant (the action), and the miner is expected to move to and settle at the new target. An UP-STEP test raises the target (for example from a low power mode to a high power mode); a DOWN-STEP test lowers it. The test information that follows these instructions states which kind of test this is and the commanded power range. Readings are sampled roughly once per second, but samples can be missing, duplicated or irregularly spaced, so read the time column rather than counting rows.
 
 Column Definitions:
 - miner.seconds: Time in seconds (negative = before action, positive = after action, 0 = transition moment)
@@ -36,7 +44,35 @@ Column Definitions:
 - miner.summary.wattage: Actual power consumption measured (in watts)
 - miner.temp.hash_board_max: Hash board temperature (°C)
 - miner.psu.temp_max: PSU temperature (°C)
-- miner.outage: Whether miner is offline
+- miner.outage: 1 if miner offline, else 0
+
+Field Notes:
+- miner.seconds is relative to the action, so t=0 is the moment the new target was commanded. A value of -120 means two minutes before the change; 300 means five minutes after it.
+- miner.mode.power normally holds the old target before t=0 and the new target after it. If it changes at any other time, or never changes, mention it.
+- miner.summary.wattage is the quantity the story is about. Compare it with miner.mode.power to judge whether the miner is following its target.
+- Empty cells mean the reading was not reported for that sample. Treat them as missing data, not as zero power.
+- A wattage of zero, or rows with miner.outage equal to 1, mean the miner was offline or not hashing. Describe when an outage started, how long it lasted and whether power recovered afterwards.
+- Temperatures are context. Mention them only if they rise or fall noticeably, approach unusual levels, or coincide with a change in power.
+- Long stretches of data may have been downsampled to fit the prompt, while the period around t=0 is always kept at full resolution. Do not read meaning into a coarser sampling rate far from the transition.
+
+Reference Terms:
+The written report places your narrative next to a table of calculated metrics. Use the same ideas in plain words so the two agree:
+- Starting power: typical wattage in the period before t=0.
+- Target power: the new commanded setting after t=0.
+- Entering the target band: wattage first comes within a few percent of the new target (never closer than 50 W) after the action.
+- Hitting the setpoint: wattage comes within about 30 W of the target.
+- Stable plateau: wattage stays within about 20 W of the target for at least 30 seconds.
+- Sharp drop or sharp rise: wattage changes by 15% or more of its current level within about 5 seconds.
+- Overshoot or undershoot: wattage moves past the new target (above it on an UP-STEP, below it on a DOWN-STEP) before settling back.
+
+Analysis Rubric:
+Work through the timeline in order and note, in your own words:
+1. Before the transition: was power steady near the starting target, drifting, or noisy? Were there dips, spikes or outages before anything was commanded?
+2. At the transition: how quickly did wattage start to move after t=0? Was there a delay, an immediate jump, or a move in the wrong direction first?
+3. Response: did power ramp smoothly, climb or fall in steps, oscillate, or stall part of the way? Did it overshoot or undershoot the new target?
+4. Settling: did power reach the new target and stay there? Roughly how long after t=0 did it settle, and how steady was it once settled? If it never settled, say where it ended up relative to the target.
+5. Anomalies: describe sharp drops, sharp rises, outages, gaps in the data, or readings that do not fit the rest of the test, and when they happened.
+6. Overall: in one sentence, did the miner follow the command as expected, follow it with problems, or fail to follow it?
 
 Task:
 Write a brief narrative describing what happened during this test. Focus on the power profile behavior:
@@ -45,8 +81,60 @@ Write a brief narrative describing what happened during this test. Focus on the
 - How did power respond after the transition?
 - Were there any anomalies, drops, spikes, or instabilities?
 
+Output Format:
+- Plain prose only: three to five short paragraphs separated by a single blank line, about 150 to 300 words in total.
+- Roughly one paragraph per phase: before the transition, the transition and response, the settled period, then anomalies and the overall verdict if there is anything to add.
+- No headings, titles, bullet points, numbered lists, tables, code blocks, Markdown formatting or JSON. The text is inserted directly into an HTML report, where each blank-line-separated block becomes one paragraph.
+- Refer to times as seconds relative to the transition (for example "about 40 seconds after the change") and to power in whole watts, rounded to sensible values such as "roughly 3,480 W".
+- Do not restate the column definitions, these instructions or the test information header, and do not speculate about causes that the data cannot show.
+
 Be concise and observational. Describe what you see in the data timeline. Avoid calculations or technical jargon - just tell the story of what the miner did."""
 
+# Per-test portion of the prompt with required placeholders
+DYNAMIC_TEMPLATE = """Test Information:
+- Test: {test_id}
+- Miner: {miner_number}
+- Test Type: {step_direction}
+- Power Transition: {power_range}
+
+Raw Test Data (CSV):
+{csv_content}"""
+
+# Hardcoded prompt template with required placeholders
+ANALYSIS_PROMPT_TEMPLATE = STATIC_PREAMBLE + "\n\n" + DYNAMIC_TEMPLATE
+
+# Placeholders present in the template, scanned once
+_FOUND_PLACEHOLDERS = frozenset(_PLACEHOLDER_RE.findall(ANALYSIS_PROMPT_TEMPLATE))
+
+
+def _split_template(template: str) -> Tuple[Tuple[str, Optional[str]], ...]:
+    """
+    Pre-split a format template into (literal, field_name) pairs.
+    
+    Args:
+        template: str.format-style template
+    
+    Returns:
+        Tuple of (literal text, placeholder name or None) pairs
+    """
+    return tuple(
+        (literal, field_name)
+        for literal, field_name, _, _ in Formatter().parse(template)
+    )
+
+
+def _render(parts: Tuple[Tuple[str, Optional[str]], ...], values: dict) -> str:
+    """Join pre-split template parts with their placeholder values."""
+    return ''.join(
+        literal + values[field_name] if field_name is not None else literal
+        for literal, field_name in parts
+    )
+
+
+# Templates pre-split once so formatting is a plain join
+_PROMPT_PARTS = _split_template(ANALYSIS_PROMPT_TEMPLATE)
+_DYNAMIC_PARTS = _split_template(DYNAMIC_TEMPLATE)
+
 
 def get_required_placeholders() -> set[str]:
     """
@@ -75,10 +163,7 @@ def validate_template() -> bool:
         ValueError: If required placeholders are missing
     """
     required = get_required_placeholders()
-    
-    # Extract placeholders from template
-    import re
-    found_placeholders = set(re.findall(r'\{(\w+)\}', ANALYSIS_PROMPT_TEMPLATE))
+    found_placeholders = _FOUND_PLACEHOLDERS
     
     # Check for missing placeholders
     missing = required - found_placeholders
@@ -98,6 +183,29 @@ def validate_template() -> bool:
     return True
 
 
+def _validate_prompt_args(step_direction: str, power_range: str) -> None:
+    """
+    Validate the per-test arguments shared by the prompt formatters.
+    
+    Raises:
+        ValueError: If step_direction is invalid
+    """
+    # Validate step_direction
+    valid_directions = {'UP-STEP', 'DOWN-STEP'}
+    if step_direction not in valid_directions:
+        raise ValueError(
+            f"Invalid step_direction: {step_direction}. "
+            f"Must be one of: {', '.join(sorted(valid_directions))}"
+        )
+    
+    # Validate power_range format (basic check)
+    if '→' not in power_range and '->' not in power_range:
+        logger.warning(
+            f"power_range '{power_range}' may not be properly formatted. "
+            "Expected format: 'X → Y' or 'X -> Y'"
+        )
+
+
 def format_prompt(
     test_id: str,
     miner_number: str,
@@ -121,32 +229,86 @@ def format_prompt(
     Raises:
         ValueError: If step_direction is invalid
     """
-    # Validate step_direction
-    valid_directions = {'UP-STEP', 'DOWN-STEP'}
-    if step_direction not in valid_directions:
-        raise ValueError(
-            f"Invalid step_direction: {step_direction}. "
-            f"Must be one of: {', '.join(sorted(valid_directions))}"
-        )
-    
-    # Validate power_range format (basic check)
-    if '→' not in power_range and '->' not in power_range:
-        import warnings
-        warnings.warn(
-            f"power_range '{power_range}' may not be properly formatted. "
-            "Expected format: 'X → Y' or 'X -> Y'"
-        )
+    _validate_prompt_args(step_direction, power_range)
     
-    # Format the template
-    return ANALYSIS_PROMPT_TEMPLATE.format(
-        test_id=test_id,
-        miner_number=miner_number,
-        step_direction=step_direction,
-        power_range=power_range,
-        csv_content=csv_content
+    return _format_prompt_cached(
+        str(test_id),
+        str(miner_number),
+        step_direction,
+        power_range,
+        csv_content
     )
 
 
-# Validate template on module import
-validate_template()
+@lru_cache(maxsize=256)
+def _format_prompt_cached(
+    test_id: str,
+    miner_number: str,
+    step_direction: str,
+    power_range: str,
+    csv_content: str
+) -> str:
+    """Render the full prompt; memoized so re-runs of a test skip the rebuild."""
+    return _render(_PROMPT_PARTS, {
+        'test_id': test_id,
+        'miner_number': miner_number,
+        'step_direction': step_direction,
+        'power_range': power_range,
+        'csv_content': csv_content
+    })
+
+
+def format_prompt_blocks(
+    test_id: str,
+    miner_number: str,
+    step_direction: str,
+    power_range: str,
+    csv_content: str
+) -> list[dict]:
+    """
+    Format the prompt as Anthropic content blocks with a cacheable prefix.
+    
+    The static preamble is marked with ``cache_control`` so repeated calls
+    only pay full price for the per-test block. The preamble is sized above
+    the model's minimum cacheable prefix length.
+    
+    Args:
+        test_id: Test identifier (e.g., "r2_39")
+        miner_number: Miner unit number (e.g., "39")
+        step_direction: UP-STEP or DOWN-STEP
+        power_range: Power transition range (e.g., "1000W → 3500W")
+        csv_content: Raw CSV data as compact string
+    
+    Returns:
+        List of two text content blocks: cached preamble, then per-test data
+    
+    Raises:
+        ValueError: If step_direction is invalid
+    """
+    _validate_prompt_args(step_direction, power_range)
+    
+    dynamic_text = _render(_DYNAMIC_PARTS, {
+        'test_id': str(test_id),
+        'miner_number': str(miner_number),
+        'step_direction': step_direction,
+        'power_range': power_range,
+        'csv_content': csv_content
+    })
+    
+    return [
+        {
+            'type': 'text',
+            'text': STATIC_PREAMBLE,
+            'cache_control': {'type': 'ephemeral'}
+        },
+        {
+            'type': 'text',
+            'text': dynamic_text
+        }
+    ]
+
+
+# Validate template on module import (skipped under python -O)
+if __debug__:
+    validate_template()
 
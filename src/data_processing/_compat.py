@@ -0,0 +1,16 @@
+"""Optional-dependency shims shared by the data processing and metric modules"""
+
+# Numba is optional; without it each module dispatches its kernels to their
+# NumPy counterparts (check NUMBA_AVAILABLE), and njit leaves functions as
+# plain Python
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+    
+    def njit(*args, **kwargs):
+        """No-op stand-in for numba.njit when numba is not installed."""
+        def decorator(func):
+            return func
+        return decorator
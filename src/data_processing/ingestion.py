@@ -1,11 +1,30 @@
 """CSV data ingestion module with validation and preprocessing"""
 import pandas as pd
+import numpy as np
+import json
 import logging
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, Tuple, List
+from typing import Dict, Any, Tuple, List, Iterator, Optional
+
+# Parquet side-cache support is optional
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
 
 logger = logging.getLogger(__name__)
 
+# Parquet schema metadata key holding action_idx and warnings
+_CACHE_METADATA_KEY = b'report_generator.ingestion'
+
+# Bump when preprocessing changes so stale side-caches are ignored
+_CACHE_VERSION = 1
+
 
 class DataIngestionError(Exception):
     """Base exception for data ingestion errors"""
@@ -49,9 +68,20 @@ class DataIngestion:
         'outage'
     ]
     
-    def __init__(self):
-        """Initialize DataIngestion instance"""
+    def __init__(self, use_parquet_cache: bool = False):
+        """
+        Initialize DataIngestion instance
+        
+        Args:
+            use_parquet_cache: Store each processed DataFrame as a Parquet
+                file next to its CSV and reuse it while it is newer than the
+                CSV (requires pyarrow; ignored if it is not installed)
+        """
         self.warnings: List[str] = []
+        self.use_parquet_cache = use_parquet_cache and pq is not None
+        
+        if use_parquet_cache and pq is None:
+            logger.warning("pyarrow is not installed; Parquet cache disabled")
     
     def load_csv(self, filepath: Path) -> Tuple[pd.DataFrame, int, List[str]]:
         """
@@ -73,9 +103,23 @@ class DataIngestion:
         """
         self.warnings = []
         
+        cache_path = None
+        if self.use_parquet_cache:
+            cache_path = Path(filepath).with_suffix('.parquet')
+            cached = self._read_parquet_cache(Path(filepath), cache_path)
+            if cached is not None:
+                return cached
+        
         try:
             logger.info(f"Loading CSV file: {filepath}")
-            df = pd.read_csv(filepath)
+            # Only parse the columns we use; missing ones are reported by
+            # _validate_columns rather than failing inside the parser
+            required = set(self.REQUIRED_COLUMNS)
+            df = pd.read_csv(
+                filepath,
+                usecols=lambda col: col in required,
+                engine='c'
+            )
             logger.info(f"Successfully loaded {len(df)} rows from CSV")
         except FileNotFoundError:
             error_msg = f"File not found: {filepath}"
@@ -115,8 +159,193 @@ class DataIngestion:
         self._log_data_quality(df)
         
         logger.info(f"Data ingestion complete. Action time at index {action_idx}")
+        
+        if cache_path is not None:
+            self._write_parquet_cache(cache_path, df, action_idx)
+        
         return df, action_idx, self.warnings
     
+    def _read_parquet_cache(
+        self,
+        filepath: Path,
+        cache_path: Path
+    ) -> Optional[Tuple[pd.DataFrame, int, List[str]]]:
+        """
+        Load a processed DataFrame from its Parquet side-cache.
+        
+        Args:
+            filepath: Source CSV path
+            cache_path: Parquet cache path
+            
+        Returns:
+            Tuple of (dataframe, action_idx, warnings), or None if the cache
+            is missing, older than the CSV, or unreadable
+        """
+        try:
+            if cache_path.stat().st_mtime <= filepath.stat().st_mtime:
+                return None
+            table = pq.read_table(cache_path)
+            metadata = json.loads((table.schema.metadata or {})[_CACHE_METADATA_KEY])
+        except (OSError, KeyError, ValueError, pa.ArrowException) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"Ignoring unreadable Parquet cache {cache_path}: {e}")
+            return None
+        
+        if metadata.get('version') != _CACHE_VERSION:
+            return None
+        
+        self.warnings = list(metadata['warnings'])
+        logger.info(f"Loaded {table.num_rows} rows from Parquet cache: {cache_path}")
+        return table.to_pandas(), int(metadata['action_idx']), self.warnings
+    
+    def _write_parquet_cache(self, cache_path: Path, df: pd.DataFrame, action_idx: int) -> None:
+        """
+        Write a processed DataFrame to its Parquet side-cache.
+        
+        Failures are logged and otherwise ignored; the cache is an optimization.
+        
+        Args:
+            cache_path: Parquet cache path
+            df: Processed DataFrame
+            action_idx: Action time index
+        """
+        metadata = json.dumps({
+            'version': _CACHE_VERSION,
+            'action_idx': action_idx,
+            'warnings': self.warnings
+        })
+        
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=False)
+            table = table.replace_schema_metadata({
+                **(table.schema.metadata or {}),
+                _CACHE_METADATA_KEY: metadata.encode('utf-8')
+            })
+            pq.write_table(table, cache_path, compression='zstd')
+        except (OSError, pa.ArrowException) as e:
+            logger.warning(f"Could not write Parquet cache {cache_path}: {e}")
+    
+    def load_csv_chunked(
+        self,
+        filepath: Path,
+        chunksize: int = 200_000
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Stream a large CSV file as standardized, type-converted chunks.
+        
+        Chunks are yielded in file order and are not sorted; use this for
+        logs that are already written in time order. Conversion warnings
+        accumulate in ``self.warnings``.
+        
+        Args:
+            filepath: Path to the CSV file
+            chunksize: Number of rows per chunk (default: 200,000)
+            
+        Yields:
+            DataFrame chunks with standardized column names and types
+            
+        Raises:
+            FileFormatError: If file cannot be read or is invalid format
+            MissingColumnsError: If required columns are missing
+        """
+        self.warnings = []
+        required = set(self.REQUIRED_COLUMNS)
+        
+        try:
+            logger.info(f"Streaming CSV file in chunks of {chunksize} rows: {filepath}")
+            reader = pd.read_csv(
+                filepath,
+                usecols=lambda col: col in required,
+                engine='c',
+                chunksize=chunksize
+            )
+        except FileNotFoundError:
+            error_msg = f"File not found: {filepath}"
+            logger.error(error_msg)
+            raise FileFormatError(error_msg)
+        except pd.errors.EmptyDataError:
+            error_msg = f"File is empty: {filepath}"
+            logger.error(error_msg)
+            raise FileFormatError(error_msg)
+        except Exception as e:
+            error_msg = f"Failed to read CSV file: {e}"
+            logger.error(error_msg)
+            raise FileFormatError(error_msg)
+        
+        with reader:
+            for chunk_number, chunk in enumerate(reader):
+                if chunk_number == 0:
+                    self._validate_columns(chunk)
+                
+                chunk = self._standardize_column_names(chunk)
+                yield self._convert_types(chunk)
+    
+    def find_action_chunk(
+        self,
+        filepath: Path,
+        chunksize: int = 200_000,
+        lookback_chunks: int = 1,
+        lookahead_chunks: int = 0
+    ) -> Tuple[pd.DataFrame, int]:
+        """
+        Load only the rows around the action time of a large, time-ordered CSV.
+        
+        Reads chunks until the first row with seconds >= 0 is found, then
+        reads ``lookahead_chunks`` more and stops without touching the rest
+        of the file.
+        
+        Args:
+            filepath: Path to the CSV file
+            chunksize: Number of rows per chunk (default: 200,000)
+            lookback_chunks: Chunks to keep before the action chunk (default: 1)
+            lookahead_chunks: Chunks to read after the action chunk (default: 0)
+            
+        Returns:
+            Tuple of (dataframe, action_idx)
+            - dataframe: Concatenated window with a fresh RangeIndex
+            - action_idx: Row index of the action time within the window
+            
+        Raises:
+            FileFormatError: If file cannot be read or is invalid format
+            MissingColumnsError: If required columns are missing
+            DataValidationError: If no action time is found
+        """
+        window: deque = deque(maxlen=lookback_chunks + 1)
+        rows_before_chunk = 0
+        action_idx = None
+        remaining_lookahead = lookahead_chunks
+        
+        for chunk in self.load_csv_chunked(filepath, chunksize=chunksize):
+            if action_idx is not None:
+                window.append(chunk)
+                remaining_lookahead -= 1
+                if remaining_lookahead == 0:
+                    break
+                continue
+            
+            if len(window) == window.maxlen:
+                rows_before_chunk -= len(window[0])
+            window.append(chunk)
+            
+            at_or_after = chunk['seconds'].to_numpy() >= 0
+            if at_or_after.any():
+                action_idx = rows_before_chunk + int(at_or_after.argmax())
+                if remaining_lookahead == 0:
+                    break
+                # Lookahead chunks must not evict the action chunk
+                window = deque(window)
+            else:
+                rows_before_chunk += len(chunk)
+        
+        if action_idx is None:
+            error_msg = "No action time found (no rows with seconds >= 0)"
+            logger.error(error_msg)
+            raise DataValidationError(error_msg)
+        
+        df = pd.concat(list(window), ignore_index=True)
+        logger.info(f"Action window loaded: {len(df)} rows, action at index {action_idx}")
+        return df, action_idx
+    
     def _validate_columns(self, df: pd.DataFrame) -> None:
         """
         Validate that all required columns are present.
@@ -189,14 +418,15 @@ class DataIngestion:
         """
         Convert columns to appropriate data types with robust error handling.
         
+        Columns are replaced in place on ``df``, which is expected to be the
+        fresh frame produced by ``_standardize_column_names``.
+        
         Args:
             df: DataFrame with standardized column names
             
         Returns:
             DataFrame with converted types
         """
-        df = df.copy()
-        
         # Convert numeric columns
         numeric_cols = ['seconds', 'mode_power', 'summary_wattage', 
                        'temp_hash_board_max', 'psu_temp_max']
@@ -220,7 +450,19 @@ class DataIngestion:
             }
             
             try:
-                df['outage'] = df['outage'].map(lambda x: bool_map.get(x, bool(x)) if pd.notna(x) else False)
+                outage = df['outage']
+                
+                # Vectorized lookup; unrecognized values fall back to truthiness
+                mapped = outage.map(bool_map)
+                known = mapped.notna().to_numpy()
+                converted = np.zeros(len(outage), dtype=bool)
+                converted[known] = mapped.to_numpy()[known].astype(bool)
+                
+                fallback = ~known & outage.notna().to_numpy()
+                if fallback.any():
+                    converted[fallback] = outage.to_numpy()[fallback].astype(bool)
+                
+                df['outage'] = converted
             except Exception as e:
                 logger.warning(f"Failed to convert outage column to boolean: {e}. Defaulting to False.")
                 df['outage'] = False
@@ -239,7 +481,7 @@ class DataIngestion:
             Sorted DataFrame with reset index
         """
         df_sorted = df.sort_values('seconds').reset_index(drop=True)
-        logger.debug(f"DataFrame sorted by time: {len(df_sorted)} rows")
+        logger.debug("DataFrame sorted by time: %d rows", len(df_sorted))
         return df_sorted
     
     def _find_action_time(self, df: pd.DataFrame) -> int:
@@ -247,7 +489,7 @@ class DataIngestion:
         Find the action time index where time crosses from negative to non-negative.
         
         Args:
-            df: Sorted DataFrame
+            df: DataFrame already sorted by ``_sort_by_time``
             
         Returns:
             Integer index where seconds >= 0
@@ -255,15 +497,17 @@ class DataIngestion:
         Raises:
             DataValidationError: If no action time is found
         """
-        action_indices = df[df['seconds'] >= 0].index
+        # Requires _sort_by_time to have run: seconds ascending with NaN last
+        seconds = df['seconds'].to_numpy()
+        action_idx = int(np.searchsorted(seconds, 0.0, side='left'))
         
-        if len(action_indices) == 0:
+        # searchsorted lands on the first NaN when every valid time is negative
+        if action_idx >= len(seconds) or np.isnan(seconds[action_idx]):
             error_msg = "No action time found (no rows with seconds >= 0)"
             logger.error(error_msg)
             raise DataValidationError(error_msg)
         
-        action_idx = action_indices[0]
-        action_time = df.at[action_idx, 'seconds']
+        action_time = seconds[action_idx]
         
         logger.info(f"Action time found at index {action_idx}, t={action_time:.2f}s")
         return action_idx
@@ -282,10 +526,12 @@ class DataIngestion:
             self.warnings.append(warning)
             return
         
-        target_before = df.at[action_idx - 1, 'mode_power']
-        target_after = df.at[action_idx, 'mode_power']
+        # Positional array access; the frame has a RangeIndex after sorting
+        mode_power = df['mode_power'].to_numpy()
+        target_before = mode_power[action_idx - 1]
+        target_after = mode_power[action_idx]
         
-        if pd.notna(target_before) and pd.notna(target_after):
+        if not (np.isnan(target_before) or np.isnan(target_after)):
             if abs(target_before - target_after) < 0.1:  # Allow small floating point differences
                 warning = (
                     f"Target power did not change at action time: "
@@ -338,3 +584,46 @@ class DataIngestion:
             f"Data quality summary: {total_rows} total rows, "
             f"{nan_wattage_count} NaN wattage, {outage_count} outages"
         )
+
+
+def _load_one(path: str) -> Tuple[pd.DataFrame, int, List[str]]:
+    """Load a single CSV in a worker process (module-level so it pickles)."""
+    return DataIngestion().load_csv(Path(path))
+
+
+def load_many(
+    paths: List[str],
+    workers: Optional[int] = None
+) -> List[Tuple[pd.DataFrame, int, List[str]]]:
+    """
+    Load several CSV files in parallel using a process pool.
+    
+    DataIngestion keeps no state between files, so each file is parsed in
+    its own worker. Workers run the full load_csv() pipeline (conversion,
+    sorting, action detection) before returning, so only the final compact
+    DataFrame is pickled back to the parent process.
+    
+    Args:
+        paths: CSV file paths to load
+        workers: Number of worker processes (default: os.cpu_count())
+        
+    Returns:
+        One (dataframe, action_idx, warnings) tuple per path, in input order
+        
+    Raises:
+        DataIngestionError: If any file fails to load (the first failure is
+            re-raised from the worker)
+    """
+    paths = [str(path) for path in paths]
+    if not paths:
+        return []
+    
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    
+    # A pool costs more than it saves for a single worker
+    if workers == 1:
+        return [_load_one(path) for path in paths]
+    
+    logger.info(f"Loading {len(paths)} CSV files with {workers} worker processes")
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_load_one, paths, chunksize=4))
@@ -1,12 +1,172 @@
 """Data preprocessing utilities for metric calculations"""
 import pandas as pd
 import numpy as np
+from types import SimpleNamespace
 from typing import Dict, Tuple, Any, List, Optional
 import logging
+import math
+
+from src.data_processing._compat import NUMBA_AVAILABLE, njit
 
 logger = logging.getLogger(__name__)
 
 
+@njit(cache=True, nogil=True)
+def _scan_time_gaps(seconds, threshold):
+    """
+    Scan consecutive time differences for the largest gap and all large gaps.
+    
+    Gap k is seconds[k + 1] - seconds[k]. NaN gaps are ignored, and equal
+    maxima resolve to the earliest gap, like np.argmax.
+    
+    Args:
+        seconds: Sample times (float64)
+        threshold: Gaps strictly above this are reported
+    
+    Returns:
+        Tuple of (max_gap, max_pos, gap_positions, gap_sizes); max_pos is -1
+        and max_gap NaN when there is no valid gap
+    """
+    n = seconds.shape[0] - 1
+    max_gap = np.nan
+    max_pos = -1
+    count = 0
+    
+    # First pass: maximum and number of large gaps
+    for k in range(max(n, 0)):
+        gap = seconds[k + 1] - seconds[k]
+        if gap != gap:
+            continue
+        if max_pos < 0 or gap > max_gap:
+            max_gap = gap
+            max_pos = k
+        if gap > threshold:
+            count += 1
+    
+    # Second pass: fill the large-gap arrays
+    gap_positions = np.empty(count, dtype=np.int64)
+    gap_sizes = np.empty(count, dtype=np.float64)
+    j = 0
+    for k in range(max(n, 0)):
+        gap = seconds[k + 1] - seconds[k]
+        if gap > threshold:
+            gap_positions[j] = k
+            gap_sizes[j] = gap
+            j += 1
+    
+    return max_gap, max_pos, gap_positions, gap_sizes
+
+
+def _scan_time_gaps_numpy(
+    seconds: np.ndarray,
+    threshold: float
+) -> Tuple[float, int, np.ndarray, np.ndarray]:
+    """
+    NumPy counterpart of _scan_time_gaps for use without numba.
+    
+    Args:
+        seconds: Sample times (float64)
+        threshold: Gaps strictly above this are reported
+    
+    Returns:
+        Tuple of (max_gap, max_pos, gap_positions, gap_sizes), as for
+        _scan_time_gaps
+    """
+    time_diffs = np.diff(seconds)
+    
+    valid_diffs = ~np.isnan(time_diffs)
+    if valid_diffs.any():
+        max_pos = int(np.argmax(np.where(valid_diffs, time_diffs, -np.inf)))
+        max_gap = time_diffs[max_pos]
+    else:
+        max_pos = -1
+        max_gap = np.nan
+    
+    gap_positions = np.flatnonzero(time_diffs > threshold)
+    return max_gap, max_pos, gap_positions, time_diffs[gap_positions]
+
+
+def _column_array(series: pd.Series, dtype: Any = None, na_value: Any = None) -> np.ndarray:
+    """
+    Return a column as a NumPy array for the array-based preprocessing steps.
+    
+    NumPy-backed columns are returned without a copy. Arrow-backed columns
+    (pd.ArrowDtype, e.g. from dtype_backend='pyarrow') are converted once,
+    with missing values replaced by na_value, so the same NumPy code paths
+    handle both backends.
+    
+    Args:
+        series: Column to convert
+        dtype: Target dtype for Arrow-backed columns (default float)
+        na_value: Replacement for missing values in Arrow-backed columns
+            (default NaN)
+        
+    Returns:
+        NumPy array of the column values
+    """
+    if isinstance(series.dtype, pd.ArrowDtype):
+        return series.to_numpy(
+            dtype=float if dtype is None else dtype,
+            na_value=np.nan if na_value is None else na_value
+        )
+    if dtype is None:
+        return series.to_numpy()
+    return series.to_numpy(dtype=dtype)
+
+
+# Columns read by the metric calculators
+METRIC_COLUMNS = (
+    'seconds', 'summary_wattage', 'mode_power', 'psu_temp_max', 'temp_hash_board_max'
+)
+
+
+def column_arrays(df: pd.DataFrame, columns: Tuple[str, ...] = METRIC_COLUMNS) -> SimpleNamespace:
+    """
+    Convert columns to NumPy arrays once for sharing between metric classes.
+    
+    Args:
+        df: Preprocessed DataFrame
+        columns: Column names to convert; names missing from df are skipped
+        
+    Returns:
+        Namespace with one array attribute per column, named after it
+    """
+    return SimpleNamespace(**{
+        column: _column_array(df[column]) for column in columns if column in df.columns
+    })
+
+
+def post_action_arrays(
+    df: pd.DataFrame,
+    action_idx: int,
+    arrays: Optional[SimpleNamespace] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Post-action time and wattage arrays shared by the metric classes.
+    
+    Post-action rows are those with index >= action_idx. On a sorted index
+    (ingestion resets it to a RangeIndex) they are a contiguous tail, so the
+    arrays are slice views instead of boolean-mask copies.
+    
+    Args:
+        df: Preprocessed DataFrame
+        action_idx: Row index where time crosses 0
+        arrays: Column arrays of df from column_arrays() (built from df if
+            omitted)
+    
+    Returns:
+        Tuple of (seconds, summary_wattage) arrays for the post-action rows
+    """
+    if arrays is None:
+        arrays = column_arrays(df, ('seconds', 'summary_wattage'))
+    
+    if df.index.is_monotonic_increasing:
+        post_action = slice(int(df.index.searchsorted(action_idx)), None)
+    else:
+        post_action = df.index >= action_idx
+    return arrays.seconds[post_action], arrays.summary_wattage[post_action]
+
+
 class DataPreprocessor:
     """
     Preprocessing utilities for preparing ingested data for metric calculations.
@@ -15,19 +175,35 @@ class DataPreprocessor:
     already been loaded and validated by DataIngestion.
     """
     
-    def __init__(self, df: pd.DataFrame, action_idx: int):
+    def __init__(self, df: pd.DataFrame, action_idx: int, copy: bool = False):
         """
         Initialize preprocessor with ingested data.
         
+        The frame is used by reference; preprocessing only reads it. Callers
+        must not modify df afterwards unless they pass copy=True.
+        
         Args:
             df: DataFrame from DataIngestion (already sorted, validated, standardized)
             action_idx: Action time index from DataIngestion
+            copy: If True, work on a private copy of df
         """
-        self.df = df.copy()
+        self.df = df.copy() if copy else df
         self.action_idx = action_idx
+        
+        # Column arrays reused by the preprocessing steps and accessors;
+        # self.df is not modified after this point
+        self._seconds = _column_array(self.df['seconds'])
+        self._watt_nan = (
+            self.df['summary_wattage'].isna().to_numpy()
+            if 'summary_wattage' in self.df.columns else None
+        )
+        self._outage = (
+            _column_array(self.df['outage'], dtype=bool, na_value=False)
+            if 'outage' in self.df.columns else None
+        )
         self.metadata: Dict[str, Any] = {
             'action_index': action_idx,
-            'action_time': df.at[action_idx, 'seconds'] if action_idx < len(df) else None,
+            'action_time': self._seconds[action_idx] if action_idx < len(df) else None,
             'total_rows': len(df)
         }
     
@@ -49,19 +225,43 @@ class DataPreprocessor:
     
     def _analyze_data_quality(self) -> None:
         """Analyze data quality and store statistics in metadata."""
-        # NaN counts per column
-        nan_counts = self.df.isnull().sum()
-        for col in nan_counts.index:
-            if nan_counts[col] > 0:
-                pct = (nan_counts[col] / len(self.df)) * 100
-                self.metadata[f'{col}_nan_count'] = int(nan_counts[col])
+        total_rows = len(self.df)
+        
+        # NaN counts per column, straight from the column arrays
+        nan_cols: List[str] = []
+        nan_counts: List[int] = []
+        for col in self.df.columns:
+            if col == 'summary_wattage' and self._watt_nan is not None:
+                nan_count = int(np.count_nonzero(self._watt_nan))
+            else:
+                values = self.df[col].to_numpy()
+                if values.dtype.kind in 'biu':
+                    continue  # bool/int columns cannot hold NaN
+                if values.dtype.kind == 'f':
+                    # min() propagates NaN, so NaN-free columns are ruled out
+                    # without allocating a mask
+                    if values.size == 0 or not np.isnan(values.min()):
+                        continue
+                    nan_count = int(np.count_nonzero(np.isnan(values)))
+                else:
+                    nan_count = int(np.count_nonzero(pd.isna(values)))
+            
+            if nan_count > 0:
+                nan_cols.append(col)
+                nan_counts.append(nan_count)
+        
+        # Percentages for all columns with NaNs in one array operation
+        if nan_counts:
+            pcts = np.asarray(nan_counts, dtype=np.float64) * (100.0 / total_rows)
+            for col, nan_count, pct in zip(nan_cols, nan_counts, pcts.tolist()):
+                self.metadata[f'{col}_nan_count'] = nan_count
                 self.metadata[f'{col}_nan_pct'] = round(pct, 2)
-                logger.debug(f"Column '{col}': {nan_counts[col]} NaN ({pct:.1f}%)")
+                logger.debug("Column '%s': %d NaN (%.1f%%)", col, nan_count, pct)
         
         # Outage statistics
-        if 'outage' in self.df.columns:
-            outage_count = self.df['outage'].sum()
-            outage_pct = (outage_count / len(self.df)) * 100
+        if self._outage is not None:
+            outage_count = int(np.count_nonzero(self._outage))
+            outage_pct = (outage_count / total_rows) * 100
             self.metadata['outage_count'] = int(outage_count)
             self.metadata['outage_pct'] = round(outage_pct, 2)
             
@@ -74,78 +274,67 @@ class DataPreprocessor:
         
         Stores list of (start_idx, end_idx) tuples in metadata.
         """
-        if 'summary_wattage' not in self.df.columns:
+        if self._watt_nan is None:
             return
         
-        wattage_nan_mask = self.df['summary_wattage'].isna()
+        wattage_nan_mask = self._watt_nan
         
         if not wattage_nan_mask.any():
             self.metadata['wattage_nan_segments'] = []
             return
         
-        # Find continuous NaN segments
-        segments = []
-        in_segment = False
-        start_idx = None
-        
-        for idx, is_nan in enumerate(wattage_nan_mask):
-            if is_nan and not in_segment:
-                # Start of new NaN segment
-                start_idx = idx
-                in_segment = True
-            elif not is_nan and in_segment:
-                # End of NaN segment
-                segments.append((start_idx, idx - 1))
-                in_segment = False
-        
-        # Handle segment that extends to end
-        if in_segment:
-            segments.append((start_idx, len(self.df) - 1))
+        # Find continuous NaN segments from the rising/falling edges of the
+        # mask; padding with False closes segments at either end
+        padded = np.concatenate(([False], wattage_nan_mask, [False]))
+        edges = np.diff(padded.view(np.int8))
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1) - 1
+        segments = list(zip(starts.tolist(), ends.tolist()))
         
         self.metadata['wattage_nan_segments'] = segments
         self.metadata['nan_segment_count'] = len(segments)
         
         if segments:
-            total_nan_rows = sum(end - start + 1 for start, end in segments)
+            total_nan_rows = int(np.count_nonzero(wattage_nan_mask))
             logger.info(f"Found {len(segments)} NaN segments totaling {total_nan_rows} rows")
     
     def _detect_time_gaps(self) -> None:
         """Detect large gaps in time series data."""
-        time_diffs = self.df['seconds'].diff()
+        gap_threshold = 10.0
         
-        # Find maximum gap
-        max_gap = time_diffs.max()
-        max_gap_idx = time_diffs.idxmax()
+        # Gap k ends at row k + 1
+        scan_time_gaps = _scan_time_gaps if NUMBA_AVAILABLE else _scan_time_gaps_numpy
+        max_gap, max_pos, gap_positions, gap_sizes = scan_time_gaps(
+            np.ascontiguousarray(self._seconds, dtype=np.float64), gap_threshold
+        )
         
+        # Maximum gap
+        max_gap_idx = self.df.index[max_pos + 1] if max_pos >= 0 else None
         self.metadata['max_time_gap'] = float(max_gap)
-        self.metadata['max_time_gap_at_index'] = int(max_gap_idx) if pd.notna(max_gap_idx) else None
+        self.metadata['max_time_gap_at_index'] = int(max_gap_idx) if max_gap_idx is not None else None
         
-        # Find gaps > threshold (10 seconds)
-        gap_threshold = 10.0
-        large_gaps = time_diffs[time_diffs > gap_threshold]
-        
-        if len(large_gaps) > 0:
-            gap_locations = [(int(idx), float(gap)) for idx, gap in large_gaps.items()]
+        # Gaps > threshold (10 seconds)
+        if len(gap_positions) > 0:
+            gap_rows = self.df.index[gap_positions + 1].tolist()
+            gap_locations = [(int(row), gap) for row, gap in zip(gap_rows, gap_sizes.tolist())]
             self.metadata['large_time_gaps'] = gap_locations
-            logger.warning(f"Detected {len(large_gaps)} time gaps > {gap_threshold}s (max: {max_gap:.1f}s)")
+            logger.warning(f"Detected {len(gap_locations)} time gaps > {gap_threshold}s (max: {max_gap:.1f}s)")
         else:
             self.metadata['large_time_gaps'] = []
     
     def _calculate_durations(self) -> None:
         """Calculate pre-action and post-action data durations."""
+        seconds = self._seconds
+        
         if self.action_idx == 0:
             pre_duration = 0.0
         else:
-            first_time = self.df.at[0, 'seconds']
-            action_time = self.df.at[self.action_idx, 'seconds']
-            pre_duration = abs(action_time - first_time)
+            pre_duration = abs(seconds[self.action_idx] - seconds[0])
         
         if self.action_idx >= len(self.df) - 1:
             post_duration = 0.0
         else:
-            action_time = self.df.at[self.action_idx, 'seconds']
-            last_time = self.df.at[len(self.df) - 1, 'seconds']
-            post_duration = abs(last_time - action_time)
+            post_duration = abs(seconds[-1] - seconds[self.action_idx])
         
         self.metadata['pre_action_duration'] = round(pre_duration, 2)
         self.metadata['post_action_duration'] = round(post_duration, 2)
@@ -162,16 +351,18 @@ class DataPreprocessor:
         if 'mode_power' not in self.df.columns:
             return
         
+        mode_power = _column_array(self.df['mode_power'])
+        
         # Get power before action (if exists)
         if self.action_idx > 0:
-            pre_action_power = self.df.at[self.action_idx - 1, 'mode_power']
-            self.metadata['target_power_before'] = float(pre_action_power) if pd.notna(pre_action_power) else None
+            pre_action_power = float(mode_power[self.action_idx - 1])
+            self.metadata['target_power_before'] = None if math.isnan(pre_action_power) else pre_action_power
         else:
             self.metadata['target_power_before'] = None
         
         # Get power at/after action
-        post_action_power = self.df.at[self.action_idx, 'mode_power']
-        self.metadata['target_power_after'] = float(post_action_power) if pd.notna(post_action_power) else None
+        post_action_power = float(mode_power[self.action_idx])
+        self.metadata['target_power_after'] = None if math.isnan(post_action_power) else post_action_power
         
         # Calculate power change
         if self.metadata['target_power_before'] is not None and self.metadata['target_power_after'] is not None:
@@ -192,47 +383,58 @@ class DataPreprocessor:
             self.metadata['power_change'] = None
             self.metadata['transition_direction'] = 'unknown'
     
+    def _select(self, mask: np.ndarray, exclude_outages: bool, context: str) -> pd.DataFrame:
+        """
+        Select rows with one combined boolean mask.
+        
+        Args:
+            mask: Boolean row mask over self.df
+            exclude_outages: If True, also drop rows where outage=True
+            context: Description used in the debug log message
+            
+        Returns:
+            DataFrame with the selected rows
+        """
+        if exclude_outages and self._outage is not None:
+            outage_mask = self._outage
+            filtered = int(np.count_nonzero(mask & outage_mask))
+            mask = mask & ~outage_mask
+            if filtered > 0:
+                logger.debug("Filtered %d outage rows from %s", filtered, context)
+        
+        return self.df.loc[mask]
+    
     def get_pre_action_data(self, exclude_outages: bool = False) -> pd.DataFrame:
         """
         Get data before action time (t < 0).
         
+        The rows are selected once and not copied again; call .copy()
+        before modifying the result.
+        
         Args:
             exclude_outages: If True, filter out rows where outage=True
             
         Returns:
             DataFrame with pre-action data
         """
-        pre_data = self.df[self.df['seconds'] < 0].copy()
-        
-        if exclude_outages and 'outage' in pre_data.columns:
-            original_len = len(pre_data)
-            pre_data = pre_data[~pre_data['outage']].copy()
-            filtered = original_len - len(pre_data)
-            if filtered > 0:
-                logger.debug(f"Filtered {filtered} outage rows from pre-action data")
-        
-        return pre_data
+        mask = self._seconds < 0
+        return self._select(mask, exclude_outages, "pre-action data")
     
     def get_post_action_data(self, exclude_outages: bool = False) -> pd.DataFrame:
         """
         Get data at and after action time (t >= 0).
         
+        The rows are selected once and not copied again; call .copy()
+        before modifying the result.
+        
         Args:
             exclude_outages: If True, filter out rows where outage=True
             
         Returns:
             DataFrame with post-action data
         """
-        post_data = self.df[self.df['seconds'] >= 0].copy()
-        
-        if exclude_outages and 'outage' in post_data.columns:
-            original_len = len(post_data)
-            post_data = post_data[~post_data['outage']].copy()
-            filtered = original_len - len(post_data)
-            if filtered > 0:
-                logger.debug(f"Filtered {filtered} outage rows from post-action data")
-        
-        return post_data
+        mask = self._seconds >= 0
+        return self._select(mask, exclude_outages, "post-action data")
     
     def get_time_window(
         self,
@@ -243,6 +445,9 @@ class DataPreprocessor:
         """
         Get data within a specific time window.
         
+        The rows are selected once and not copied again; call .copy()
+        before modifying the result.
+        
         Args:
             start_time: Start time in seconds (inclusive)
             end_time: End time in seconds (inclusive)
@@ -251,17 +456,19 @@ class DataPreprocessor:
         Returns:
             DataFrame with data in time window
         """
-        window_mask = (self.df['seconds'] >= start_time) & (self.df['seconds'] <= end_time)
-        window_data = self.df[window_mask].copy()
-        
-        if exclude_outages and 'outage' in window_data.columns:
-            original_len = len(window_data)
-            window_data = window_data[~window_data['outage']].copy()
-            filtered = original_len - len(window_data)
-            if filtered > 0:
-                logger.debug(f"Filtered {filtered} outage rows from time window [{start_time}, {end_time}]")
+        mask = (self._seconds >= start_time) & (self._seconds <= end_time)
+        return self._select(mask, exclude_outages, f"time window [{start_time}, {end_time}]")
+    
+    def get_column_arrays(self) -> SimpleNamespace:
+        """
+        Get the metric columns as NumPy arrays (see column_arrays).
         
-        return window_data
+        Returns:
+            Namespace with one array attribute per metric column
+        """
+        arrays = column_arrays(self.df, tuple(c for c in METRIC_COLUMNS if c != 'seconds'))
+        arrays.seconds = self._seconds
+        return arrays
     
     def get_valid_wattage_data(
         self,
@@ -271,6 +478,9 @@ class DataPreprocessor:
         """
         Get data with valid wattage readings.
         
+        The rows are selected once and not copied again; call .copy()
+        before modifying the result.
+        
         Args:
             exclude_outages: If True, filter out outage rows
             exclude_nan: If True, filter out NaN wattage rows
@@ -278,23 +488,16 @@ class DataPreprocessor:
         Returns:
             DataFrame with valid wattage data
         """
-        data = self.df.copy()
-        
-        if exclude_nan and 'summary_wattage' in data.columns:
-            original_len = len(data)
-            data = data[data['summary_wattage'].notna()].copy()
-            filtered = original_len - len(data)
+        if exclude_nan and self._watt_nan is not None:
+            # Start from the inverted NaN mask rather than an all-True array
+            mask = ~self._watt_nan
+            filtered = len(mask) - int(np.count_nonzero(mask))
             if filtered > 0:
-                logger.debug(f"Filtered {filtered} NaN wattage rows")
-        
-        if exclude_outages and 'outage' in data.columns:
-            original_len = len(data)
-            data = data[~data['outage']].copy()
-            filtered = original_len - len(data)
-            if filtered > 0:
-                logger.debug(f"Filtered {filtered} outage rows")
+                logger.debug("Filtered %d NaN wattage rows", filtered)
+        else:
+            mask = np.ones(len(self.df), dtype=bool)
         
-        return data
+        return self._select(mask, exclude_outages, "valid wattage data")
     
     def get_metadata_summary(self) -> str:
         """
@@ -1,6 +1,7 @@
 """Data validation module using Pydantic for configuration and constraints"""
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional, List
+from typing import Dict, Optional, List, Tuple
+import numpy as np
 import pandas as pd
 
 
@@ -111,6 +112,36 @@ class ValidationConfig(BaseModel):
     )
 
 
+# Column range checks: (columns, min field, max field, quantity, unit), with
+# the bounds read from ColumnConstraints by field name
+_RANGE_SPECS = (
+    (('seconds',), 'min_seconds', 'max_seconds', None, ''),
+    (('mode_power', 'summary_wattage'), 'min_power', 'max_power', 'power', 'W'),
+    (('temp_hash_board_max', 'psu_temp_max'), 'min_temperature', 'max_temperature', 'temp', '°C'),
+)
+
+
+def _count_out_of_range(
+    values: np.ndarray,
+    lo: Optional[float],
+    hi: Optional[float]
+) -> Tuple[int, int]:
+    """
+    Count values below lo and above hi in one float array.
+    
+    Args:
+        values: Column values as float64 (NaN is never counted)
+        lo: Minimum bound, or None to skip the check
+        hi: Maximum bound, or None to skip the check
+        
+    Returns:
+        Tuple of (below_min, above_max) counts
+    """
+    below_min = int(np.count_nonzero(values < lo)) if lo is not None else 0
+    above_max = int(np.count_nonzero(values > hi)) if hi is not None else 0
+    return below_min, above_max
+
+
 class DataFrameValidator:
     """Validates pandas DataFrames against defined constraints"""
     
@@ -123,13 +154,22 @@ class DataFrameValidator:
         """
         self.config = config or ValidationConfig()
     
-    def validate_data_quality(self, df: pd.DataFrame, warnings: List[str]) -> List[str]:
+    def validate_data_quality(
+        self,
+        df: pd.DataFrame,
+        warnings: List[str],
+        precomputed: Optional[Dict[str, int]] = None
+    ) -> List[str]:
         """
         Validate data quality against thresholds.
         
         Args:
             df: DataFrame to validate
             warnings: Existing warnings list to append to
+            precomputed: Optional counts already computed for df, keyed by
+                'nan_wattage' and/or 'outage' (e.g. from DataPreprocessor
+                metadata 'summary_wattage_nan_count' and 'outage_count').
+                Columns with a precomputed count are not rescanned.
             
         Returns:
             Updated warnings list
@@ -139,10 +179,13 @@ class DataFrameValidator:
         """
         total_rows = len(df)
         issues = []
+        precomputed = precomputed or {}
         
         # Check NaN wattage percentage
         if 'summary_wattage' in df.columns:
-            nan_count = df['summary_wattage'].isna().sum()
+            nan_count = precomputed.get('nan_wattage')
+            if nan_count is None:
+                nan_count = df['summary_wattage'].isna().sum()
             nan_pct = (nan_count / total_rows) * 100
             
             if nan_pct > self.config.quality_thresholds.max_nan_wattage_pct:
@@ -154,7 +197,9 @@ class DataFrameValidator:
         
         # Check outage percentage
         if 'outage' in df.columns:
-            outage_count = df['outage'].sum()
+            outage_count = precomputed.get('outage')
+            if outage_count is None:
+                outage_count = df['outage'].sum()
             outage_pct = (outage_count / total_rows) * 100
             
             if outage_pct > self.config.quality_thresholds.max_outage_pct:
@@ -186,56 +231,32 @@ class DataFrameValidator:
         warnings = []
         constraints = self.config.column_constraints
         
-        # Validate seconds range
-        if 'seconds' in df.columns:
-            if constraints.min_seconds is not None:
-                below_min = (df['seconds'] < constraints.min_seconds).sum()
-                if below_min > 0:
-                    warnings.append(
-                        f"{below_min} rows have seconds below minimum ({constraints.min_seconds})"
-                    )
+        for columns, min_field, max_field, quantity, unit in _RANGE_SPECS:
+            lo = getattr(constraints, min_field)
+            hi = getattr(constraints, max_field)
             
-            if constraints.max_seconds is not None:
-                above_max = (df['seconds'] > constraints.max_seconds).sum()
-                if above_max > 0:
-                    warnings.append(
-                        f"{above_max} rows have seconds above maximum ({constraints.max_seconds})"
-                    )
-        
-        # Validate power ranges
-        power_cols = ['mode_power', 'summary_wattage']
-        for col in power_cols:
-            if col in df.columns:
-                valid_values = df[col].dropna()
+            for col in columns:
+                if col not in df.columns:
+                    continue
                 
-                below_min = (valid_values < constraints.min_power).sum()
-                if below_min > 0:
-                    warnings.append(
-                        f"{below_min} rows in '{col}' below minimum power ({constraints.min_power}W)"
-                    )
+                # NaN compares False against either bound, so no dropna() is needed
+                values = df[col].to_numpy(dtype=float, na_value=np.nan)
+                below_min, above_max = _count_out_of_range(values, lo, hi)
                 
-                above_max = (valid_values > constraints.max_power).sum()
-                if above_max > 0:
-                    warnings.append(
-                        f"{above_max} rows in '{col}' above maximum power ({constraints.max_power}W)"
-                    )
-        
-        # Validate temperature ranges
-        temp_cols = ['temp_hash_board_max', 'psu_temp_max']
-        for col in temp_cols:
-            if col in df.columns:
-                valid_values = df[col].dropna()
+                if quantity is None:
+                    subject = f"have {col}"
+                    suffix = ""
+                else:
+                    subject = f"in '{col}'"
+                    suffix = f" {quantity}"
                 
-                below_min = (valid_values < constraints.min_temperature).sum()
                 if below_min > 0:
                     warnings.append(
-                        f"{below_min} rows in '{col}' below minimum temp ({constraints.min_temperature}°C)"
+                        f"{below_min} rows {subject} below minimum{suffix} ({lo}{unit})"
                     )
-                
-                above_max = (valid_values > constraints.max_temperature).sum()
                 if above_max > 0:
                     warnings.append(
-                        f"{above_max} rows in '{col}' above maximum temp ({constraints.max_temperature}°C)"
+                        f"{above_max} rows {subject} above maximum{suffix} ({hi}{unit})"
                     )
         
         return warnings
@@ -262,8 +283,10 @@ class DataFrameValidator:
             warnings.append("No pre-action data available")
             return warnings
         
+        seconds = df['seconds'].to_numpy()
+        
         # Check pre-action duration
-        pre_action_time = abs(df.at[0, 'seconds'])
+        pre_action_time = abs(seconds[0])
         if pre_action_time < thresholds.min_pre_action_duration:
             warnings.append(
                 f"Pre-action duration ({pre_action_time:.1f}s) is less than "
@@ -272,7 +295,7 @@ class DataFrameValidator:
         
         # Check post-action duration
         if action_idx < len(df) - 1:
-            post_action_time = df.at[len(df) - 1, 'seconds']
+            post_action_time = seconds[-1]
             if post_action_time < thresholds.min_post_action_duration:
                 warnings.append(
                     f"Post-action duration ({post_action_time:.1f}s) is less than "
@@ -2,11 +2,25 @@
 Metrics Module
 
 Deterministic metric calculations for power profile analysis.
+
+The calculator classes are imported on first access, so importing the
+package (or src.metrics.orchestrator) does not load pandas and numba.
 """
 
-from .basic_metrics import BasicMetrics
-from .time_metrics import TimeMetrics
-from .anomaly_metrics import AnomalyMetrics
-from .orchestrator import MetricOrchestrator
+import importlib
+
+_EXPORTS = {
+    'BasicMetrics': '.basic_metrics',
+    'TimeMetrics': '.time_metrics',
+    'AnomalyMetrics': '.anomaly_metrics',
+    'MetricOrchestrator': '.orchestrator',
+}
 
 __all__ = ['BasicMetrics', 'TimeMetrics', 'AnomalyMetrics', 'MetricOrchestrator']
+
+
+def __getattr__(name):
+    """Import exported classes lazily (PEP 562)."""
+    if name in _EXPORTS:
+        return getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -10,11 +10,361 @@ in R_Test_Metrics_Complete_Pseudocode_v3.md:
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from functools import cached_property
+from numpy.lib.stride_tricks import sliding_window_view
+from types import SimpleNamespace
+from typing import Dict, Any, List, Optional, Tuple
 import logging
 
+from src.data_processing._compat import NUMBA_AVAILABLE, njit
+from src.data_processing.preprocessing import post_action_arrays
+
 logger = logging.getLogger(__name__)
 
+# Sharp drop/rise criteria (METRICS 8 and 9)
+SHARP_CHANGE_THRESHOLD_PCT = 0.15  # 15% of current power
+SHARP_CHANGE_WINDOW = 5.0  # seconds
+
+# Most window cells the NumPy scan materialises at once (8 MB of float64)
+_WINDOW_BLOCK_CELLS = 1 << 20
+
+
+@njit(cache=True, nogil=True)
+def _scan_drops_and_rises(times, wattages, threshold, window):
+    """
+    Scan for sharp drops and sharp rises in one pass over sorted, NaN-free
+    samples.
+    
+    For each sample i the window is (times[i], times[i] + window]. Window
+    edges only move forward, so the window minimum and maximum are tracked
+    with two monotonic queues held in preallocated index arrays. Equal
+    extremes resolve to the earliest sample, like np.argmin/np.argmax.
+    Drops and rises keep separate skip intervals, so each matches a
+    standalone scan. Samples with non-positive wattage cannot start an
+    event (the percentage change is undefined).
+    The compiled kernel releases the GIL, so scans for independent test
+    runs can execute on separate threads.
+    
+    Args:
+        times: Sorted sample times (float64)
+        wattages: Wattage per sample (float64)
+        threshold: Minimum change as a fraction of the starting wattage
+        window: Look-ahead window in seconds
+    
+    Returns:
+        Tuple of (drop_starts, drop_mins, rise_starts, rise_maxes) index
+        arrays, one entry per event
+    """
+    n = times.shape[0]
+    drop_starts = np.empty(n, dtype=np.int64)
+    drop_mins = np.empty(n, dtype=np.int64)
+    rise_starts = np.empty(n, dtype=np.int64)
+    rise_maxes = np.empty(n, dtype=np.int64)
+    drop_count = 0
+    rise_count = 0
+    
+    min_queue = np.empty(n, dtype=np.int64)  # increasing wattage; head is the minimum
+    max_queue = np.empty(n, dtype=np.int64)  # decreasing wattage; head is the maximum
+    min_head = 0
+    min_tail = 0
+    max_head = 0
+    max_tail = 0
+    lo = 0
+    hi = 0
+    
+    # Times in (skip_from, skip_until] belong to a detected drop / rise
+    drop_skip_from = -np.inf
+    drop_skip_until = -np.inf
+    rise_skip_from = -np.inf
+    rise_skip_until = -np.inf
+    
+    for i in range(n):
+        current_time = times[i]
+        
+        while lo < n and times[lo] <= current_time:
+            lo += 1
+        while hi < n and times[hi] <= current_time + window:
+            # Strict comparisons keep the earliest of equal extremes at the head
+            while min_tail > min_head and wattages[min_queue[min_tail - 1]] > wattages[hi]:
+                min_tail -= 1
+            min_queue[min_tail] = hi
+            min_tail += 1
+            while max_tail > max_head and wattages[max_queue[max_tail - 1]] < wattages[hi]:
+                max_tail -= 1
+            max_queue[max_tail] = hi
+            max_tail += 1
+            hi += 1
+        while min_tail > min_head and min_queue[min_head] < lo:
+            min_head += 1
+        while max_tail > max_head and max_queue[max_head] < lo:
+            max_head += 1
+        
+        if lo >= hi:
+            continue
+        
+        # Percentage change needs a positive starting wattage
+        if wattages[i] <= 0:
+            continue
+        
+        # Skip if this time already processed in a previous drop
+        if not (drop_skip_from < current_time <= drop_skip_until):
+            min_idx = min_queue[min_head]
+            if (wattages[i] - wattages[min_idx]) / wattages[i] >= threshold:
+                drop_starts[drop_count] = i
+                drop_mins[drop_count] = min_idx
+                drop_count += 1
+                # A repeated timestamp can still start another drop
+                drop_skip_from = current_time
+                drop_skip_until = max(drop_skip_until, times[min_idx])
+        
+        # Skip if this time already processed in a previous rise
+        if not (rise_skip_from < current_time <= rise_skip_until):
+            max_idx = max_queue[max_head]
+            if (wattages[max_idx] - wattages[i]) / wattages[i] >= threshold:
+                rise_starts[rise_count] = i
+                rise_maxes[rise_count] = max_idx
+                rise_count += 1
+                rise_skip_from = current_time
+                rise_skip_until = max(rise_skip_until, times[max_idx])
+    
+    return (
+        drop_starts[:drop_count], drop_mins[:drop_count],
+        rise_starts[:rise_count], rise_maxes[:rise_count]
+    )
+
+
+def _scan_drops_and_rises_numpy(times, wattages, threshold, window):
+    """
+    NumPy counterpart of _scan_drops_and_rises for use without numba.
+    
+    Window bounds come from searchsorted, and the window extremes for every
+    sample from _window_extremes. Only samples that pass the threshold are
+    visited in Python to apply the skip intervals, so the result matches the
+    kernel exactly.
+    
+    Args:
+        times: Sorted sample times (float64)
+        wattages: Wattage per sample (float64)
+        threshold: Minimum change as a fraction of the starting wattage
+        window: Look-ahead window in seconds
+    
+    Returns:
+        Tuple of (drop_starts, drop_mins, rise_starts, rise_maxes) index
+        arrays, one entry per event
+    """
+    n = times.shape[0]
+    lo = np.searchsorted(times, times, side='right')
+    widths = np.searchsorted(times, times + window, side='right') - lo
+    
+    if n == 0 or widths.max() == 0:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, empty, empty
+    
+    has_window = widths > 0
+    min_idx, max_idx = _window_extremes(wattages, lo, widths)
+    
+    # Percentage change needs a positive starting wattage
+    can_start = has_window & (wattages > 0)
+    drop_pct = np.divide(
+        wattages - wattages[min_idx], wattages, out=np.zeros(n), where=can_start
+    )
+    rise_pct = np.divide(
+        wattages[max_idx] - wattages, wattages, out=np.zeros(n), where=can_start
+    )
+    drop_hits = np.flatnonzero(can_start & (drop_pct >= threshold))
+    rise_hits = np.flatnonzero(can_start & (rise_pct >= threshold))
+    
+    drop_starts = _apply_skip_intervals(times, drop_hits, min_idx)
+    rise_starts = _apply_skip_intervals(times, rise_hits, max_idx)
+    return drop_starts, min_idx[drop_starts], rise_starts, max_idx[rise_starts]
+
+
+def _window_extremes(
+    wattages: np.ndarray,
+    lo: np.ndarray,
+    widths: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Positions of the first minimum and first maximum in each sample's window.
+    
+    Window i covers wattages[lo[i]:lo[i] + widths[i]]. Rows are gathered from
+    a sliding_window_view in blocks of at most _WINDOW_BLOCK_CELLS cells, so
+    memory stays bounded however many samples share a window (dense or
+    duplicated timestamps). Ties resolve to the earliest sample, as in the
+    kernel's monotonic queues.
+    
+    Args:
+        wattages: Wattage per sample (float64)
+        lo: Index of the first sample in each window
+        widths: Number of samples in each window (0 = empty window)
+    
+    Returns:
+        Tuple of (min_idx, max_idx); samples with an empty window point at
+        themselves
+    """
+    n = wattages.shape[0]
+    width = int(widths.max())
+    min_idx = np.arange(n)
+    max_idx = np.arange(n)
+    
+    # Padded so rows starting near the end (lo up to n) stay in bounds;
+    # cells beyond each window's width are masked out per block
+    rows_view = sliding_window_view(np.concatenate((wattages, np.zeros(width))), width)
+    offsets = np.arange(width)
+    block = max(_WINDOW_BLOCK_CELLS // width, 1)
+    
+    for start in range(0, n, block):
+        stop = min(start + block, n)
+        block_lo = lo[start:stop]
+        block_widths = widths[start:stop]
+        beyond = offsets >= block_widths[:, None]
+        own_idx = min_idx[start:stop].copy()
+        has_window = block_widths > 0
+        
+        # One gathered copy per block, re-masked for the max pass
+        rows = rows_view[block_lo]
+        rows[beyond] = np.inf
+        min_idx[start:stop] = np.where(has_window, block_lo + rows.argmin(axis=1), own_idx)
+        rows[beyond] = -np.inf
+        max_idx[start:stop] = np.where(has_window, block_lo + rows.argmax(axis=1), own_idx)
+    
+    return min_idx, max_idx
+
+
+def _apply_skip_intervals(
+    times: np.ndarray,
+    hits: np.ndarray,
+    extreme_idx: np.ndarray
+) -> np.ndarray:
+    """
+    Drop threshold hits that fall inside an earlier event.
+    
+    Args:
+        times: Scanned sample times
+        hits: Sample indices meeting the threshold, in order
+        extreme_idx: Window extreme sample index per sample
+    
+    Returns:
+        Index array of accepted event starts
+    """
+    starts = []
+    # Times in (skip_from, skip_until] belong to an accepted event
+    skip_from = -np.inf
+    skip_until = -np.inf
+    
+    for i in hits.tolist():
+        current_time = times[i]
+        if skip_from < current_time <= skip_until:
+            continue
+        starts.append(i)
+        skip_from = current_time
+        skip_until = max(skip_until, times[extreme_idx[i]])
+    
+    return np.array(starts, dtype=np.int64)
+
+
+def _build_events(
+    times: np.ndarray,
+    wattages: np.ndarray,
+    start_indices: np.ndarray,
+    end_indices: np.ndarray,
+    sign: int
+) -> Tuple[List[Dict[str, float]], np.ndarray, np.ndarray]:
+    """
+    Build the per-event dictionaries for detected drops or rises.
+    
+    Args:
+        times: Scanned sample times (float64)
+        wattages: Scanned wattages (float64)
+        start_indices: Event start sample indices
+        end_indices: Window extreme sample index per event
+        sign: 1 for sharp drops, -1 for sharp rises
+    
+    Returns:
+        Tuple of (events, magnitudes, rates); events is a list of dicts with
+        time, start_wattage, end_wattage, magnitude, duration and rate
+    """
+    # Event fields for all events at once, gathered by index
+    event_times = times[start_indices]
+    start_wattages = wattages[start_indices]
+    end_wattages = wattages[end_indices]
+    magnitudes = sign * (start_wattages - end_wattages)
+    durations = times[end_indices] - event_times
+    rates = np.zeros(len(start_indices))
+    np.divide(-sign * magnitudes, durations, out=rates, where=durations > 0)
+    
+    events = [
+        {
+            'time': time,
+            'start_wattage': start_wattage,
+            'end_wattage': end_wattage,
+            'magnitude': magnitude,
+            'duration': duration,
+            'rate': rate
+        }
+        for time, start_wattage, end_wattage, magnitude, duration, rate in zip(
+            event_times.tolist(),
+            start_wattages.tolist(),
+            end_wattages.tolist(),
+            magnitudes.tolist(),
+            durations.tolist(),
+            rates.tolist()
+        )
+    ]
+    return events, magnitudes, rates
+
+
+def _threshold_excursion(
+    seconds: np.ndarray,
+    wattages: np.ndarray,
+    bound: float,
+    sign: int
+) -> Optional[Tuple[int, int, float]]:
+    """
+    Locate an excursion beyond a threshold bound.
+    
+    Works on the signed excess sign * (wattage - bound), so one code path
+    serves overshoot (sign=1, above an upper bound) and undershoot
+    (sign=-1, below a lower bound). NaN samples are never beyond the
+    bound and never count as a return.
+    
+    Args:
+        seconds: Sample times
+        wattages: Wattage per sample (may contain NaN)
+        bound: Threshold wattage
+        sign: 1 for overshoot, -1 for undershoot
+    
+    Returns:
+        Tuple of (first_cross_pos, extreme_pos, duration), or None if the
+        bound is never crossed
+    """
+    excess = sign * (wattages - bound)
+    beyond = excess > 0
+    
+    if not beyond.any():
+        return None
+    
+    # Extreme point (first occurrence) and first crossing
+    extreme_pos = int(np.nanargmax(excess))
+    first_cross_pos = int(beyond.argmax())
+    first_cross_time = seconds[first_cross_pos]
+    
+    # Duration until the first return inside the bound after the extreme
+    if extreme_pos < len(excess) - 1:
+        returned = excess[extreme_pos + 1:] <= 0
+        
+        if returned.any():
+            return_pos = extreme_pos + 1 + int(returned.argmax())
+            duration = seconds[return_pos] - first_cross_time
+        else:
+            # Never returned inside the bound
+            duration = seconds[-1] - first_cross_time
+    else:
+        # Extreme at end of test
+        duration = seconds[extreme_pos] - first_cross_time
+    
+    return first_cross_pos, extreme_pos, duration
+
 
 class AnomalyMetrics:
     """
@@ -26,17 +376,75 @@ class AnomalyMetrics:
     - METRIC 10: Overshoot/Undershoot (direction-specific transient detection)
     """
     
-    def __init__(self, df: pd.DataFrame, action_idx: int):
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        action_idx: int,
+        arrays: Optional[SimpleNamespace] = None
+    ):
         """
         Initialize AnomalyMetrics calculator.
         
         Args:
             df: Preprocessed DataFrame with required columns
             action_idx: Row index where time crosses 0
+            arrays: Column arrays of df from column_arrays(), shared between
+                metric classes (built from df if omitted)
         """
         self.df = df
         self.action_idx = action_idx
         self.logger = logging.getLogger(self.__class__.__name__)
+        
+        # Post-action time/wattage arrays shared by all metrics
+        self._post_sec, self._post_watt = post_action_arrays(df, action_idx, arrays)
+    
+    @cached_property
+    def _post_valid(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Post-action (times, wattages) with NaN wattage samples removed.
+        
+        Computed on first use and reused by the drop/rise scan; overshoot
+        works on the unfiltered arrays and never builds it.
+        """
+        times = self._post_sec
+        wattages = self._post_watt
+        nan_mask = np.isnan(wattages)
+        
+        # Without NaN gaps the tail views are used as-is (no copy when the
+        # columns are already float64)
+        if nan_mask.any():
+            times = times[~nan_mask]
+            wattages = wattages[~nan_mask]
+        
+        return (
+            np.ascontiguousarray(times, dtype=np.float64),
+            np.ascontiguousarray(wattages, dtype=np.float64)
+        )
+    
+    @cached_property
+    def _scan_result(self) -> Tuple:
+        """
+        Sharp drops and rises detected together in one scan.
+        
+        Both metrics use the same 15% threshold and 5-second window, so one
+        pass over the valid samples serves both; the first of
+        calculate_sharp_drops / calculate_sharp_rises runs it.
+        
+        Returns:
+            Tuple of (drops, drop_magnitudes, drop_rates, rises,
+            rise_magnitudes, rise_rates)
+        """
+        times, wattages = self._post_valid
+        
+        scan = _scan_drops_and_rises if NUMBA_AVAILABLE else _scan_drops_and_rises_numpy
+        drop_starts, drop_mins, rise_starts, rise_maxes = scan(
+            times, wattages, SHARP_CHANGE_THRESHOLD_PCT, SHARP_CHANGE_WINDOW
+        )
+        
+        return (
+            _build_events(times, wattages, drop_starts, drop_mins, sign=1)
+            + _build_events(times, wattages, rise_starts, rise_maxes, sign=-1)
+        )
     
     def calculate_sharp_drops(self) -> Dict[str, Any]:
         """
@@ -51,27 +459,15 @@ class AnomalyMetrics:
         Returns:
             Dictionary with sharp_drops list and summary statistics
         """
-        # 1. Define detection criteria
-        drop_threshold_pct = 0.15  # 15% of current power
-        detection_window = 5.0  # seconds
-        
-        # 2. Extract post-action data
-        post_action_mask = self.df.index >= self.action_idx
-        post_action = self.df[post_action_mask].copy()
+        # 1. Detection criteria: SHARP_CHANGE_THRESHOLD_PCT (15% of current
+        # power) within SHARP_CHANGE_WINDOW (5 seconds)
         
-        if post_action.empty:
+        # 2. Post-action data (extracted once in __init__)
+        if len(self._post_sec) == 0:
             raise ValueError("No post-action data available")
         
-        # 3. Get valid wattage data
-        times = post_action['seconds'].values
-        wattages = post_action['summary_wattage'].values
-        
-        # Filter out NaN values
-        valid_mask = ~np.isnan(wattages)
-        valid_times = times[valid_mask]
-        valid_wattages = wattages[valid_mask]
-        
-        if len(valid_wattages) < 2:
+        # 3. Valid (non-NaN) wattage data
+        if len(self._post_valid[1]) < 2:
             return {
                 'sharp_drops': [],
                 'summary': {
@@ -81,61 +477,14 @@ class AnomalyMetrics:
                 }
             }
         
-        # 4. Scan for sharp drops using rolling window
-        sharp_drops = []
-        processed_times = set()  # Avoid duplicate detection
-        
-        for i in range(len(valid_times)):
-            current_time = valid_times[i]
-            current_wattage = valid_wattages[i]
-            
-            # Skip if this time already processed in a previous drop
-            if current_time in processed_times:
-                continue
-            
-            # Define search window
-            window_end_time = current_time + detection_window
-            
-            # Find all points within window
-            window_mask = (valid_times > current_time) & (valid_times <= window_end_time)
-            window_times = valid_times[window_mask]
-            window_wattages = valid_wattages[window_mask]
-            
-            if len(window_wattages) == 0:
-                continue
-            
-            # Find minimum wattage in window
-            min_wattage = np.min(window_wattages)
-            min_idx = np.argmin(window_wattages)
-            min_time = window_times[min_idx]
-            
-            # Calculate drop
-            drop_magnitude = current_wattage - min_wattage
-            drop_percentage = drop_magnitude / current_wattage
-            
-            # Check if drop exceeds threshold
-            if drop_percentage >= drop_threshold_pct:
-                # Sharp drop detected
-                drop_duration = min_time - current_time
-                drop_rate = -drop_magnitude / drop_duration if drop_duration > 0 else 0
-                
-                sharp_drops.append({
-                    'time': float(current_time),
-                    'start_wattage': float(current_wattage),
-                    'end_wattage': float(min_wattage),
-                    'magnitude': float(drop_magnitude),
-                    'duration': float(drop_duration),
-                    'rate': float(drop_rate)
-                })
-                
-                # Mark all times in this drop as processed
-                for t in window_times[:min_idx + 1]:
-                    processed_times.add(t)
+        # 4. Scan for sharp drops using rolling window (times are sorted by
+        # ingestion); shared with sharp rises
+        sharp_drops, drop_magnitudes, drop_rates = self._scan_result[:3]
         
         # 5. Calculate summary statistics
         if sharp_drops:
-            worst_magnitude = max(d['magnitude'] for d in sharp_drops)
-            worst_rate = min(d['rate'] for d in sharp_drops)  # Most negative
+            worst_magnitude = float(drop_magnitudes.max())
+            worst_rate = float(drop_rates.min())  # Most negative
         else:
             worst_magnitude = None
             worst_rate = None
@@ -162,27 +511,15 @@ class AnomalyMetrics:
         Returns:
             Dictionary with sharp_rises list and summary statistics
         """
-        # 1. Define detection criteria
-        spike_threshold_pct = 0.15  # 15% of current power
-        detection_window = 5.0  # seconds
+        # 1. Detection criteria: SHARP_CHANGE_THRESHOLD_PCT (15% of current
+        # power) within SHARP_CHANGE_WINDOW (5 seconds)
         
-        # 2. Extract post-action data
-        post_action_mask = self.df.index >= self.action_idx
-        post_action = self.df[post_action_mask].copy()
-        
-        if post_action.empty:
+        # 2. Post-action data (extracted once in __init__)
+        if len(self._post_sec) == 0:
             raise ValueError("No post-action data available")
         
-        # 3. Get valid wattage data
-        times = post_action['seconds'].values
-        wattages = post_action['summary_wattage'].values
-        
-        # Filter out NaN values
-        valid_mask = ~np.isnan(wattages)
-        valid_times = times[valid_mask]
-        valid_wattages = wattages[valid_mask]
-        
-        if len(valid_wattages) < 2:
+        # 3. Valid (non-NaN) wattage data
+        if len(self._post_valid[1]) < 2:
             return {
                 'sharp_rises': [],
                 'summary': {
@@ -192,61 +529,14 @@ class AnomalyMetrics:
                 }
             }
         
-        # 4. Scan for sharp rises using rolling window
-        sharp_rises = []
-        processed_times = set()  # Avoid duplicate detection
-        
-        for i in range(len(valid_times)):
-            current_time = valid_times[i]
-            current_wattage = valid_wattages[i]
-            
-            # Skip if this time already processed in a previous sharp rise
-            if current_time in processed_times:
-                continue
-            
-            # Define search window
-            window_end_time = current_time + detection_window
-            
-            # Find all points within window
-            window_mask = (valid_times > current_time) & (valid_times <= window_end_time)
-            window_times = valid_times[window_mask]
-            window_wattages = valid_wattages[window_mask]
-            
-            if len(window_wattages) == 0:
-                continue
-            
-            # Find maximum wattage in window
-            max_wattage = np.max(window_wattages)
-            max_idx = np.argmax(window_wattages)
-            max_time = window_times[max_idx]
-            
-            # Calculate rise
-            rise_magnitude = max_wattage - current_wattage
-            rise_percentage = rise_magnitude / current_wattage
-            
-            # Check if rise exceeds threshold
-            if rise_percentage >= spike_threshold_pct:
-                # Sharp rise detected
-                rise_duration = max_time - current_time
-                rise_rate = rise_magnitude / rise_duration if rise_duration > 0 else 0
-                
-                sharp_rises.append({
-                    'time': float(current_time),
-                    'start_wattage': float(current_wattage),
-                    'end_wattage': float(max_wattage),
-                    'magnitude': float(rise_magnitude),
-                    'duration': float(rise_duration),
-                    'rate': float(rise_rate)
-                })
-                
-                # Mark all times in this sharp rise as processed
-                for t in window_times[:max_idx + 1]:
-                    processed_times.add(t)
+        # 4. Scan for sharp rises using rolling window (times are sorted by
+        # ingestion); shared with sharp drops
+        sharp_rises, rise_magnitudes, rise_rates = self._scan_result[3:]
         
         # 5. Calculate summary statistics
         if sharp_rises:
-            worst_magnitude = max(s['magnitude'] for s in sharp_rises)
-            worst_rate = max(s['rate'] for s in sharp_rises)  # Most positive
+            worst_magnitude = float(rise_magnitudes.max())
+            worst_rate = float(rise_rates.max())  # Most positive
         else:
             worst_magnitude = None
             worst_rate = None
@@ -290,11 +580,11 @@ class AnomalyMetrics:
         threshold_percentage = 0.04  # 4%
         threshold = max(threshold_absolute, target * threshold_percentage)
         
-        # 3. Extract post-action data
-        post_action_mask = self.df.index >= self.action_idx
-        post_action = self.df[post_action_mask].copy()
+        # 3. Post-action data (extracted once in __init__)
+        seconds = self._post_sec
+        wattage = self._post_watt
         
-        if post_action.empty:
+        if len(seconds) == 0:
             raise ValueError("No post-action data available")
         
         # 4. Determine which anomaly to check based on direction
@@ -306,41 +596,15 @@ class AnomalyMetrics:
         
         if check_overshoot:
             upper_threshold = target + threshold
-            wattage = post_action['summary_wattage']
             
-            # Find where wattage exceeds upper threshold
-            overshoot_mask = wattage > upper_threshold
+            excursion = _threshold_excursion(seconds, wattage, upper_threshold, sign=1)
             
-            if overshoot_mask.any():
+            if excursion is not None:
                 # Overshoot detected
-                
-                # Find peak overshoot
-                peak_idx = wattage.idxmax()
-                peak_wattage = wattage.loc[peak_idx]
-                peak_time = post_action.loc[peak_idx, 'seconds']
-                
-                # Find when first crossed threshold
-                first_cross_idx = overshoot_mask.idxmax()
-                first_cross_time = post_action.loc[first_cross_idx, 'seconds']
-                
-                # Calculate duration above threshold
-                # Find when it drops back below threshold (if it does)
-                post_peak_mask = post_action.index > peak_idx
-                post_peak_data = post_action[post_peak_mask]
-                
-                if not post_peak_data.empty:
-                    below_threshold_mask = post_peak_data['summary_wattage'] <= upper_threshold
-                    
-                    if below_threshold_mask.any():
-                        return_idx = post_peak_data[below_threshold_mask].index[0]
-                        return_time = post_peak_data.loc[return_idx, 'seconds']
-                        duration = return_time - first_cross_time
-                    else:
-                        # Never returned below threshold
-                        duration = post_action['seconds'].iloc[-1] - first_cross_time
-                else:
-                    # Peaked at end of test
-                    duration = peak_time - first_cross_time
+                first_cross_pos, peak_pos, duration = excursion
+                peak_wattage = wattage[peak_pos]
+                peak_time = seconds[peak_pos]
+                first_cross_time = seconds[first_cross_pos]
                 
                 magnitude = peak_wattage - target
                 
@@ -362,41 +626,15 @@ class AnomalyMetrics:
         
         if check_undershoot:
             lower_threshold = target - threshold
-            wattage = post_action['summary_wattage']
             
-            # Find where wattage drops below lower threshold
-            undershoot_mask = wattage < lower_threshold
+            excursion = _threshold_excursion(seconds, wattage, lower_threshold, sign=-1)
             
-            if undershoot_mask.any():
+            if excursion is not None:
                 # Undershoot detected
-                
-                # Find lowest point
-                lowest_idx = wattage.idxmin()
-                lowest_wattage = wattage.loc[lowest_idx]
-                lowest_time = post_action.loc[lowest_idx, 'seconds']
-                
-                # Find when first crossed threshold
-                first_cross_idx = undershoot_mask.idxmax()
-                first_cross_time = post_action.loc[first_cross_idx, 'seconds']
-                
-                # Calculate duration below threshold
-                # Find when it rises back above threshold (if it does)
-                post_lowest_mask = post_action.index > lowest_idx
-                post_lowest_data = post_action[post_lowest_mask]
-                
-                if not post_lowest_data.empty:
-                    above_threshold_mask = post_lowest_data['summary_wattage'] >= lower_threshold
-                    
-                    if above_threshold_mask.any():
-                        return_idx = post_lowest_data[above_threshold_mask].index[0]
-                        return_time = post_lowest_data.loc[return_idx, 'seconds']
-                        duration = return_time - first_cross_time
-                    else:
-                        # Never returned above threshold
-                        duration = post_action['seconds'].iloc[-1] - first_cross_time
-                else:
-                    # Bottomed at end of test
-                    duration = lowest_time - first_cross_time
+                first_cross_pos, lowest_pos, duration = excursion
+                lowest_wattage = wattage[lowest_pos]
+                lowest_time = seconds[lowest_pos]
+                first_cross_time = seconds[first_cross_pos]
                 
                 magnitude = target - lowest_wattage
                 
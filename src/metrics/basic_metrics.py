@@ -7,12 +7,97 @@ following the pseudocode specification in R_Test_Metrics_Complete_Pseudocode_v3.
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional
+from types import SimpleNamespace
+from typing import Dict, Any, Optional, Tuple
 import logging
 
+from src.data_processing._compat import NUMBA_AVAILABLE, njit
+from src.data_processing.preprocessing import column_arrays
+
+# Bottleneck is optional; when present it backs the NumPy fallback median
+try:
+    import bottleneck
+    BOTTLENECK_AVAILABLE = True
+except ImportError:
+    BOTTLENECK_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
 
+@njit(cache=True, nogil=True)
+def _nan_median(values):
+    """
+    Median of the non-NaN values in an array.
+    
+    Valid values are compacted into one preallocated buffer in a single
+    pass and the median is selected from that buffer, instead of building
+    a boolean mask and a filtered copy.
+    
+    Args:
+        values: Wattage values (may contain NaN)
+    
+    Returns:
+        Median as float64, or NaN if every value is NaN
+    """
+    buffer = np.empty(values.shape[0], dtype=np.float64)
+    count = 0
+    for i in range(values.shape[0]):
+        value = values[i]
+        if value == value:  # False only for NaN
+            buffer[count] = value
+            count += 1
+    
+    if count == 0:
+        return np.nan
+    return np.median(buffer[:count])
+
+
+def _nan_median_numpy(values: np.ndarray) -> float:
+    """
+    NumPy counterpart of _nan_median for use without numba.
+    
+    Uses bottleneck.nanmedian when bottleneck is installed, which selects
+    the median without building a filtered copy.
+    
+    Args:
+        values: Wattage values (may contain NaN)
+    
+    Returns:
+        Median as float64, or NaN if every value is NaN
+    """
+    if BOTTLENECK_AVAILABLE:
+        return float(bottleneck.nanmedian(values))
+    
+    valid = values[~np.isnan(values)]
+    if valid.size == 0:
+        return np.nan
+    return np.median(valid)
+
+
+def _nan_extremes(values: np.ndarray) -> Optional[Tuple[float, float]]:
+    """
+    Min and max of an array, ignoring NaN.
+    
+    np.fmin/np.fmax skip NaN operands, so each extreme is one reduction
+    over the raw array with no filtered copy; the result is NaN only when
+    every value is NaN.
+    
+    Args:
+        values: Column values
+    
+    Returns:
+        Tuple of (min, max), or None if there are no non-NaN values
+    """
+    if values.size == 0:
+        return None
+    
+    lowest = np.fmin.reduce(values)
+    if np.isnan(lowest):
+        return None
+    
+    return float(lowest), float(np.fmax.reduce(values))
+
+
 class BasicMetrics:
     """
     Calculates basic foundational metrics for power profile analysis.
@@ -22,16 +107,28 @@ class BasicMetrics:
     - METRIC 2: Target Power - Target power settings before/after action
     """
     
-    def __init__(self, df: pd.DataFrame, action_idx: int):
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        action_idx: int,
+        arrays: Optional[SimpleNamespace] = None
+    ):
         """
         Initialize BasicMetrics calculator.
         
         Args:
             df: Preprocessed DataFrame with required columns
             action_idx: Row index where t crosses 0
+            arrays: Column arrays of df from column_arrays(), shared between
+                metric classes (built from df if omitted)
         """
         self.df = df
         self.action_idx = action_idx
+        self.arrays = arrays if arrays is not None else column_arrays(df)
+        
+        # Column arrays for positional scalar reads around action_idx
+        self._watt_arr = self.arrays.summary_wattage
+        self._mode_arr = self.arrays.mode_power
     
     def calculate_start_power(self) -> Dict[str, Any]:
         """
@@ -53,31 +150,27 @@ class BasicMetrics:
         Raises:
             ValueError: If no pre-action data or all values are NaN
         """
-        # Step 1: Extract pre-action data
-        pre_action_mask = self.df['seconds'] < 0
-        pre_action_data = self.df[pre_action_mask]
+        # Step 1: Extract pre-action wattage values (t < 0). Rows are sorted
+        # by time and action_idx is the first row with t >= 0, so these are
+        # exactly the rows before action_idx.
+        pre_action_wattage = self._watt_arr[:self.action_idx]
         
-        if pre_action_data.empty:
+        if pre_action_wattage.size == 0:
             raise ValueError("No pre-action data available (all times >= 0)")
         
-        # Step 2: Extract wattage values
-        wattage_series = pre_action_data['summary_wattage']
+        # Steps 2-3: Median of valid (non-NaN) values
+        nan_median = _nan_median if NUMBA_AVAILABLE else _nan_median_numpy
+        median_power = nan_median(pre_action_wattage)
         
-        # Step 3: Filter valid (non-NaN) values
-        valid_wattage = wattage_series.dropna()
-        
-        if valid_wattage.empty:
+        if np.isnan(median_power):
             raise ValueError("All pre-action wattage values are NaN")
         
-        # Step 4: Calculate median
-        median_power = valid_wattage.median()
-        
-        # Step 5: Get last value before action
+        # Step 4: Get last value before action
         last_row_idx = self.action_idx - 1
-        last_value = self.df.at[last_row_idx, 'summary_wattage']
+        last_value = self._watt_arr[last_row_idx] if last_row_idx >= 0 else np.nan
         
-        # Step 6: Compare median vs last value
-        if pd.isna(last_value):
+        # Step 5: Compare median vs last value
+        if np.isnan(last_value):
             difference = None
             note = "Last value unavailable (NaN)"
         else:
@@ -90,7 +183,7 @@ class BasicMetrics:
         
         return {
             'median': float(median_power),
-            'last_value': float(last_value) if pd.notna(last_value) else None,
+            'last_value': None if np.isnan(last_value) else float(last_value),
             'difference': float(difference) if difference is not None else None,
             'note': note
         }
@@ -116,13 +209,15 @@ class BasicMetrics:
         """
         # Step 1: Get target before action
         before_idx = self.action_idx - 1
-        target_before = self.df.at[before_idx, 'mode_power']
+        if before_idx < 0:
+            raise ValueError("No target power before action (action at first row)")
+        target_before = self._mode_arr[before_idx]
         
         # Step 2: Get target after action
-        target_after = self.df.at[self.action_idx, 'mode_power']
+        target_after = self._mode_arr[self.action_idx]
         
         # Validate targets are not NaN
-        if pd.isna(target_before) or pd.isna(target_after):
+        if np.isnan(target_before) or np.isnan(target_after):
             raise ValueError("Target power values are NaN (data corruption)")
         
         # Step 3: Calculate change
@@ -133,13 +228,17 @@ class BasicMetrics:
             logger.warning("Target power did not change at action time")
         
         # Step 5: Validate target remains constant after action
-        post_action_mask = self.df.index >= self.action_idx
-        post_action_targets = self.df[post_action_mask]['mode_power']
-        unique_targets = post_action_targets.dropna().unique()
-        
-        if len(unique_targets) > 1:
-            logger.warning(f"Target changed during test: {unique_targets}")
-            # Use first target (at action time) as canonical
+        post_action_targets = self._mode_arr[self.action_idx:]
+        post_action_targets = post_action_targets[~np.isnan(post_action_targets)]
+        
+        if post_action_targets.size:
+            lowest_target = post_action_targets.min()
+            highest_target = post_action_targets.max()
+            if lowest_target != highest_target:
+                logger.warning(
+                    f"Target changed during test: min={lowest_target}, max={highest_target}"
+                )
+                # Use first target (at action time) as canonical
         
         # Step 6: Validate values are reasonable
         if target_before < 0 or target_after < 0:
@@ -227,31 +326,27 @@ class BasicMetrics:
             - board: dict with min, max, range (or None if no data)
         """
         # Step 1: Extract PSU temperatures
-        psu_temps = self.df['psu_temp_max']
-        valid_psu = psu_temps.dropna()
+        psu_extremes = _nan_extremes(self.arrays.psu_temp_max)
         
-        if valid_psu.empty:
+        if psu_extremes is None:
             psu_min = None
             psu_max = None
             psu_range = None
             logger.warning("All PSU temperature values are NaN")
         else:
-            psu_min = float(valid_psu.min())
-            psu_max = float(valid_psu.max())
+            psu_min, psu_max = psu_extremes
             psu_range = float(psu_max - psu_min)
         
         # Step 2: Extract hash board temperatures
-        board_temps = self.df['temp_hash_board_max']
-        valid_board = board_temps.dropna()
+        board_extremes = _nan_extremes(self.arrays.temp_hash_board_max)
         
-        if valid_board.empty:
+        if board_extremes is None:
             board_min = None
             board_max = None
             board_range = None
             logger.warning("All hash board temperature values are NaN")
         else:
-            board_min = float(valid_board.min())
-            board_max = float(valid_board.max())
+            board_min, board_max = board_extremes
             board_range = float(board_max - board_min)
         
         # Step 3: Validate temperature ranges
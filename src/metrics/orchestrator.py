@@ -5,19 +5,28 @@ This module coordinates the execution of all metrics in proper dependency order,
 aggregates results, and provides validation and error handling.
 """
 
-import pandas as pd
-from typing import Dict, Any, List, Optional
+from typing import TYPE_CHECKING, Dict, Any, List, Optional, Tuple
+import importlib.util
 import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 
-from src.data_processing.ingestion import DataIngestion
-from src.data_processing.preprocessing import DataPreprocessor
-from src.metrics.basic_metrics import BasicMetrics
-from src.metrics.time_metrics import TimeMetrics
-from src.metrics.anomaly_metrics import AnomalyMetrics
+# The data processing and metric modules pull in pandas and numba; they are
+# imported in process_file() so that importing this module stays cheap
+if TYPE_CHECKING:
+    import pandas as pd
+    from src.metrics.basic_metrics import BasicMetrics
+    from src.metrics.time_metrics import TimeMetrics
+    from src.metrics.anomaly_metrics import AnomalyMetrics
 
 logger = logging.getLogger(__name__)
 
+# Accepted values for process_file(raw_data_format=...)
+RAW_DATA_FORMATS = ('records', 'frame', 'arrow', None)
+
 
 class MetricOrchestrator:
     """
@@ -49,29 +58,58 @@ class MetricOrchestrator:
             'overshoot_undershoot'   # METRIC 10 (depends on target_power, step_direction)
         ]
     
-    def process_file(self, filepath: str) -> Dict[str, Any]:
+    def process_file(
+        self,
+        filepath: str,
+        raw_data_format: Optional[str] = 'records'
+    ) -> Dict[str, Any]:
         """
         Process a CSV file and calculate all metrics.
         
         Args:
             filepath: Path to the CSV file containing power profile data
+            raw_data_format: How to return the preprocessed data:
+                'records' for a list of dicts, 'frame' for the DataFrame
+                itself, 'arrow' for a pyarrow.Table (column buffers, no
+                per-row objects), or None to skip it for metrics-only callers
             
         Returns:
             Dictionary containing:
                 - success: Boolean indicating if processing succeeded
                 - metrics: Dictionary of all calculated metrics
                 - metadata: Processing metadata (timing, file info, etc.)
-                - raw_data: Preprocessed dataframe as list of dicts (for visualization)
+                - raw_data: Preprocessed data in raw_data_format (for
+                  visualization); None if raw_data_format is None
                 - error: Error message (only if success=False)
                 - error_type: Type of error (only if success=False)
+        
+        Raises:
+            ValueError: If raw_data_format is not one of RAW_DATA_FORMATS, or
+                is 'arrow' without pyarrow installed
         """
+        if raw_data_format not in RAW_DATA_FORMATS:
+            raise ValueError(
+                f"raw_data_format must be one of {RAW_DATA_FORMATS}, got {raw_data_format!r}"
+            )
+        # Arrow output for raw_data is optional
+        if raw_data_format == 'arrow' and importlib.util.find_spec('pyarrow') is None:
+            raise ValueError("raw_data_format='arrow' requires pyarrow")
+        
         start_time = datetime.now()
+        start_counter = time.perf_counter()  # monotonic, for the duration
         
         # CRITICAL: Reset state for each file to avoid caching between calls
         self.results = {}
         self.metadata = {}
         
         try:
+            # Deferred imports (see top of module); cached after the first file
+            from src.data_processing.ingestion import DataIngestion
+            from src.data_processing.preprocessing import DataPreprocessor
+            from src.metrics.basic_metrics import BasicMetrics
+            from src.metrics.time_metrics import TimeMetrics
+            from src.metrics.anomaly_metrics import AnomalyMetrics
+            
             # Step 1: Data ingestion
             logger.info(f"Loading file: {filepath}")
             ingestion = DataIngestion()
@@ -91,9 +129,10 @@ class MetricOrchestrator:
             
             # Step 3: Initialize metric calculators
             logger.info("Initializing metric calculators")
-            basic_metrics = BasicMetrics(processed_df, action_idx)
-            time_metrics = TimeMetrics(processed_df, action_idx)
-            anomaly_metrics = AnomalyMetrics(processed_df, action_idx)
+            arrays = preprocessor.get_column_arrays()
+            basic_metrics = BasicMetrics(processed_df, action_idx, arrays)
+            time_metrics = TimeMetrics(processed_df, action_idx, arrays)
+            anomaly_metrics = AnomalyMetrics(processed_df, action_idx, arrays)
             
             # Step 4: Calculate metrics in dependency order
             logger.info("Calculating metrics in dependency order")
@@ -104,8 +143,8 @@ class MetricOrchestrator:
             validation_results = self.validate_results()
             
             # Step 6: Calculate processing time
+            processing_time = time.perf_counter() - start_counter
             end_time = datetime.now()
-            processing_time = (end_time - start_time).total_seconds()
             
             # Step 7: Compile final results
             final_result = {
@@ -117,7 +156,7 @@ class MetricOrchestrator:
                     'end_time': end_time.isoformat(),
                     'validation': validation_results
                 },
-                'raw_data': processed_df.to_dict('records')
+                'raw_data': _format_raw_data(processed_df, raw_data_format)
             }
             
             logger.info(f"Processing completed successfully in {processing_time:.3f}s")
@@ -125,8 +164,8 @@ class MetricOrchestrator:
             
         except Exception as e:
             # Handle any errors during processing
+            processing_time = time.perf_counter() - start_counter
             end_time = datetime.now()
-            processing_time = (end_time - start_time).total_seconds()
             
             error_result = {
                 'success': False,
@@ -142,11 +181,47 @@ class MetricOrchestrator:
             logger.error(f"Error processing file: {e}", exc_info=True)
             return error_result
     
+    @staticmethod
+    def process_files(
+        filepaths: List[str],
+        workers: Optional[int] = None,
+        raw_data_format: Optional[str] = 'records'
+    ) -> List[Dict[str, Any]]:
+        """
+        Process several CSV files in parallel using a process pool.
+        
+        Each file gets a fresh orchestrator in a worker process, so no
+        per-file state is shared. Failures are reported per file in the
+        result dictionaries, as with process_file().
+        
+        Args:
+            filepaths: Paths to the CSV files
+            workers: Number of worker processes (default: os.cpu_count())
+            raw_data_format: Passed to process_file()
+            
+        Returns:
+            One process_file() result per path, in input order
+        """
+        filepaths = [str(path) for path in filepaths]
+        if not filepaths:
+            return []
+        
+        process_one = partial(_process_one, raw_data_format=raw_data_format)
+        workers = min(workers or os.cpu_count() or 1, len(filepaths))
+        
+        # A pool costs more than it saves for a single worker
+        if workers == 1:
+            return [process_one(path) for path in filepaths]
+        
+        logger.info(f"Processing {len(filepaths)} files with {workers} worker processes")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(process_one, filepaths))
+    
     def _calculate_metrics(
         self,
-        basic_metrics: BasicMetrics,
-        time_metrics: TimeMetrics,
-        anomaly_metrics: AnomalyMetrics
+        basic_metrics: 'BasicMetrics',
+        time_metrics: 'TimeMetrics',
+        anomaly_metrics: 'AnomalyMetrics'
     ) -> None:
         """
         Calculate all metrics in proper dependency order.
@@ -156,59 +231,81 @@ class MetricOrchestrator:
             time_metrics: TimeMetrics calculator instance
             anomaly_metrics: AnomalyMetrics calculator instance
         """
-        # METRIC 1: Start Power (independent)
-        logger.debug("Calculating METRIC 1: Start Power")
-        self.results['start_power'] = basic_metrics.calculate_start_power()
-        
-        # METRIC 2: Target Power (independent)
-        logger.debug("Calculating METRIC 2: Target Power")
-        self.results['target_power'] = basic_metrics.calculate_target_power()
-        
-        # METRIC 3: Step Direction (depends on start_power, target_power)
-        logger.debug("Calculating METRIC 3: Step Direction")
-        self.results['step_direction'] = basic_metrics.calculate_step_direction(
-            self.results['start_power'],
-            self.results['target_power']
-        )
-        
-        # METRIC 4: Temperature Ranges (independent)
-        logger.debug("Calculating METRIC 4: Temperature Ranges")
-        self.results['temperature_ranges'] = basic_metrics.calculate_temperature_ranges()
+        # METRICS 8-9 are independent and share one scan whose compiled kernel
+        # releases the GIL, so they run on a worker thread alongside METRICS 1-7.
+        # Results are stored in the usual order once the scan has finished.
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            sharp_changes = executor.submit(self._calculate_sharp_changes, anomaly_metrics)
+            
+            # METRIC 1: Start Power (independent)
+            logger.debug("Calculating METRIC 1: Start Power")
+            self.results['start_power'] = basic_metrics.calculate_start_power()
+            
+            # METRIC 2: Target Power (independent)
+            logger.debug("Calculating METRIC 2: Target Power")
+            self.results['target_power'] = basic_metrics.calculate_target_power()
+            
+            # METRIC 3: Step Direction (depends on start_power, target_power)
+            logger.debug("Calculating METRIC 3: Step Direction")
+            self.results['step_direction'] = basic_metrics.calculate_step_direction(
+                self.results['start_power'],
+                self.results['target_power']
+            )
+            
+            # METRIC 4: Temperature Ranges (independent)
+            logger.debug("Calculating METRIC 4: Temperature Ranges")
+            self.results['temperature_ranges'] = basic_metrics.calculate_temperature_ranges()
+            
+            # METRIC 5: Band Entry (depends on target_power, start_power, step_direction)
+            logger.debug("Calculating METRIC 5: Band Entry")
+            self.results['band_entry'] = time_metrics.calculate_band_entry(
+                self.results['target_power'],
+                self.results['start_power'],
+                self.results['step_direction']
+            )
+            
+            # METRIC 6: Setpoint Hit (depends on target_power)
+            logger.debug("Calculating METRIC 6: Setpoint Hit")
+            self.results['setpoint_hit'] = time_metrics.calculate_setpoint_hit(
+                self.results['target_power']
+            )
+            
+            # METRIC 7: Stable Plateau Duration (depends on target_power)
+            logger.debug("Calculating METRIC 7: Stable Plateau Duration")
+            self.results['stable_plateau'] = time_metrics.calculate_plateau_duration(
+                self.results['target_power']
+            )
+            
+            # METRICS 8-9: Sharp Drops and Sharp Rises (independent)
+            self.results['sharp_drops'], self.results['sharp_rises'] = sharp_changes.result()
         
-        # METRIC 5: Band Entry (depends on target_power, start_power, step_direction)
-        logger.debug("Calculating METRIC 5: Band Entry")
-        self.results['band_entry'] = time_metrics.calculate_band_entry(
+        # METRIC 10: Overshoot/Undershoot (depends on target_power, step_direction)
+        logger.debug("Calculating METRIC 10: Overshoot/Undershoot")
+        self.results['overshoot_undershoot'] = anomaly_metrics.calculate_overshoot_undershoot(
             self.results['target_power'],
-            self.results['start_power'],
             self.results['step_direction']
         )
+    
+    @staticmethod
+    def _calculate_sharp_changes(
+        anomaly_metrics: 'AnomalyMetrics'
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Calculate METRIC 8 (Sharp Drops) and METRIC 9 (Sharp Rises).
         
-        # METRIC 6: Setpoint Hit (depends on target_power)
-        logger.debug("Calculating METRIC 6: Setpoint Hit")
-        self.results['setpoint_hit'] = time_metrics.calculate_setpoint_hit(
-            self.results['target_power']
-        )
-        
-        # METRIC 7: Stable Plateau Duration (depends on target_power)
-        logger.debug("Calculating METRIC 7: Stable Plateau Duration")
-        self.results['stable_plateau'] = time_metrics.calculate_plateau_duration(
-            self.results['target_power']
-        )
-        
-        # METRIC 8: Sharp Drops (independent)
+        Args:
+            anomaly_metrics: AnomalyMetrics calculator instance
+            
+        Returns:
+            Tuple of (sharp_drops, sharp_rises) results
+        """
         logger.debug("Calculating METRIC 8: Sharp Drops")
-        self.results['sharp_drops'] = anomaly_metrics.calculate_sharp_drops()
+        sharp_drops = anomaly_metrics.calculate_sharp_drops()
         
-        # METRIC 9: Sharp Rises (independent)
         logger.debug("Calculating METRIC 9: Sharp Rises")
-        self.results['sharp_rises'] = anomaly_metrics.calculate_sharp_rises()
+        sharp_rises = anomaly_metrics.calculate_sharp_rises()
         
-        # METRIC 10: Overshoot/Undershoot (depends on target_power, step_direction)
-        logger.debug("Calculating METRIC 10: Overshoot/Undershoot")
-        self.results['overshoot_undershoot'] = anomaly_metrics.calculate_overshoot_undershoot(
-            self.results['target_power'],
-            self.results['step_direction']
-        )
+        return sharp_drops, sharp_rises
     
     def validate_results(self) -> Dict[str, Any]:
         """
@@ -255,6 +352,7 @@ class MetricOrchestrator:
         start_median = start_power.get('median')
         target_before = target_power.get('before')
         target_after = target_power.get('after')
+        target_change = target_power.get('change')  # target_after - target_before
         
         # Check start power vs target before power
         if start_median and target_before:
@@ -266,8 +364,8 @@ class MetricOrchestrator:
                 )
         
         # Check if target power changed appropriately
-        if target_before and target_after:
-            if abs(target_after - target_before) < 50:
+        if target_before and target_after and target_change is not None:
+            if abs(target_change) < 50:
                 warnings.append(
                     f"Small power change detected: {target_before:.0f}W → {target_after:.0f}W "
                     "(may be MINIMAL-STEP or data quality issue)"
@@ -299,10 +397,10 @@ class MetricOrchestrator:
         delta = step_direction.get('delta')
         target_before = target_power.get('before')
         target_after = target_power.get('after')
+        expected_delta = target_power.get('change')  # target_after - target_before
         
         # Verify delta calculation
-        if target_before and target_after and delta is not None:
-            expected_delta = target_after - target_before
+        if target_before and target_after and delta is not None and expected_delta is not None:
             if abs(expected_delta - delta) > 1:  # Allow 1W tolerance
                 warnings.append(
                     f"Step direction delta mismatch: expected {expected_delta:.0f}W, "
@@ -356,3 +454,19 @@ class MetricOrchestrator:
         
         return summary
 
+
+def _format_raw_data(df: 'pd.DataFrame', raw_data_format: Optional[str]) -> Any:
+    """Convert the preprocessed DataFrame to the requested raw_data format."""
+    if raw_data_format is None:
+        return None
+    if raw_data_format == 'frame':
+        return df
+    if raw_data_format == 'arrow':
+        import pyarrow as pa
+        return pa.Table.from_pandas(df, preserve_index=False)
+    return df.to_dict('records')
+
+
+def _process_one(filepath: str, raw_data_format: Optional[str] = 'records') -> Dict[str, Any]:
+    """Process a single file in a worker process (module-level so it pickles)."""
+    return MetricOrchestrator().process_file(filepath, raw_data_format=raw_data_format)
@@ -7,12 +7,145 @@ pseudocode specification in R_Test_Metrics_Complete_Pseudocode_v3.md
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Any, Optional
+from types import SimpleNamespace
+from typing import Dict, Any, Optional, Tuple
 import logging
 
+from src.data_processing._compat import NUMBA_AVAILABLE, njit
+from src.data_processing.preprocessing import post_action_arrays
+
 logger = logging.getLogger(__name__)
 
 
+@njit(cache=True, nogil=True)
+def _scan_segments(wattage, in_band):
+    """
+    Locate in-band segments and their mean wattage in a single pass.
+    
+    Compiled counterpart of _scan_segments_numpy: run boundaries and
+    running sums are tracked as scalars and written to preallocated
+    outputs, with no intermediate edge, label or bincount arrays.
+    
+    Args:
+        wattage: Wattage per sample
+        in_band: Boolean in-band mask
+    
+    Returns:
+        Tuple of (starts, ends, averages); segment k covers
+        starts[k]:ends[k] and ends[k] equals len(in_band) when the segment
+        lasts to the end
+    """
+    n = in_band.shape[0]
+    max_segments = n // 2 + 1
+    starts = np.empty(max_segments, dtype=np.int64)
+    ends = np.empty(max_segments, dtype=np.int64)
+    averages = np.empty(max_segments, dtype=np.float64)
+    count = 0
+    total = 0.0
+    
+    for i in range(n):
+        if in_band[i]:
+            if i == 0 or not in_band[i - 1]:
+                starts[count] = i
+                total = 0.0
+            total += wattage[i]
+        elif i > 0 and in_band[i - 1]:
+            ends[count] = i
+            averages[count] = total / (i - starts[count])
+            count += 1
+    
+    # Segment still open at the end of the test
+    if n > 0 and in_band[n - 1]:
+        ends[count] = n
+        averages[count] = total / (n - starts[count])
+        count += 1
+    
+    return starts[:count], ends[:count], averages[:count]
+
+
+def _find_segments(in_band: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Locate runs of consecutive in-band samples.
+    
+    The mask is padded with an out-of-band sample on each side so that
+    np.diff marks every run start with +1 and every run end with -1.
+    
+    Args:
+        in_band: Boolean in-band mask
+    
+    Returns:
+        Tuple of (starts, ends) positions; run k covers starts[k]:ends[k],
+        and ends[k] equals len(in_band) when the run lasts to the end
+    """
+    edges = np.diff(np.concatenate(([0], in_band.view(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def _segment_means(
+    wattage: np.ndarray,
+    in_band: np.ndarray,
+    starts: np.ndarray,
+    ends: np.ndarray
+) -> np.ndarray:
+    """
+    Mean wattage of every in-band segment in one pass.
+    
+    The in-band samples, taken in order, are the segments laid end to end,
+    so labelling each with its segment number lets a single weighted
+    bincount sum all segments. In-band samples are never NaN.
+    
+    Args:
+        wattage: Wattage per sample
+        in_band: Boolean in-band mask
+        starts: Segment start positions from _find_segments
+        ends: Segment end positions from _find_segments
+    
+    Returns:
+        Mean wattage per segment
+    """
+    lengths = ends - starts
+    labels = np.repeat(np.arange(len(starts)), lengths)
+    sums = np.bincount(labels, weights=wattage[in_band], minlength=len(starts))
+    return sums / lengths
+
+
+def _scan_segments_numpy(
+    wattage: np.ndarray,
+    in_band: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    NumPy counterpart of _scan_segments for use without numba.
+    
+    Args:
+        wattage: Wattage per sample
+        in_band: Boolean in-band mask
+    
+    Returns:
+        Tuple of (starts, ends, averages), as for _scan_segments
+    """
+    starts, ends = _find_segments(in_band)
+    return starts, ends, _segment_means(wattage, in_band, starts, ends)
+
+
+def _exit_reason(wattage: float, lower_bound: float, upper_bound: float) -> str:
+    """
+    Classify why a segment ended from its first out-of-band sample.
+    
+    Args:
+        wattage: Wattage of the first sample after the segment (may be NaN)
+        lower_bound: Lower band limit
+        upper_bound: Upper band limit
+    
+    Returns:
+        "dropped_below", "exceeded_above", or "unknown" (NaN wattage)
+    """
+    if wattage < lower_bound:
+        return "dropped_below"
+    if wattage > upper_bound:
+        return "exceeded_above"
+    return "unknown"
+
+
 class TimeMetrics:
     """
     Time-based metrics for power profile analysis.
@@ -22,17 +155,109 @@ class TimeMetrics:
     - METRIC 6: Setpoint Hit (±30W tolerance with event tracking)
     """
     
-    def __init__(self, df: pd.DataFrame, action_idx: int):
+    def __init__(
+        self,
+        df: pd.DataFrame,
+        action_idx: int,
+        arrays: Optional[SimpleNamespace] = None
+    ):
         """
         Initialize TimeMetrics calculator.
         
         Args:
             df: Preprocessed DataFrame with required columns
             action_idx: Row index where time crosses 0
+            arrays: Column arrays of df from column_arrays(), shared between
+                metric classes (built from df if omitted)
         """
         self.df = df
         self.action_idx = action_idx
         self.logger = logging.getLogger(self.__class__.__name__)
+        
+        # Post-action time/wattage arrays shared by all metrics
+        self._post_sec, self._post_watt = post_action_arrays(df, action_idx, arrays)
+        
+        # |wattage - target| per post-action sample, keyed on target, and
+        # scanned segments, keyed on (target, tolerance)
+        self._target_distances: Dict[float, np.ndarray] = {}
+        self._segment_cache: Dict[Tuple[float, float], SimpleNamespace] = {}
+    
+    def _distance_to_target(self, target: float) -> np.ndarray:
+        """
+        Absolute distance of each post-action sample from the target.
+        
+        METRICS 5-7 all use bands centred on the same target, so the
+        distances are computed once per target and each band reduces to a
+        single comparison against its tolerance. NaN samples give NaN.
+        
+        Args:
+            target: Target wattage
+            
+        Returns:
+            Array of |wattage - target| for the post-action samples
+        """
+        distances = self._target_distances.get(target)
+        if distances is None:
+            distances = np.abs(self._post_watt - target)
+            self._target_distances[target] = distances
+        return distances
+    
+    def _segments(self, target: float, tolerance: float) -> SimpleNamespace:
+        """
+        In-band segments of the post-action data for a band around target.
+        
+        Shared scanner for METRICS 5-7, which differ only in tolerance,
+        minimum duration and result shape. A sample is in-band when
+        |wattage - target| <= tolerance; NaN samples never are. A segment
+        exits at its first out-of-band sample, or at the last sample if
+        the test ends in-band. Scans are cached per (target, tolerance), so
+        a repeated metric call or another metric with the same band reuses
+        the result; the returned arrays are shared and must not be modified.
+        
+        Args:
+            target: Band centre wattage
+            tolerance: Band half-width in watts
+            
+        Returns:
+            Namespace of per-segment start_times, start_wattages, durations,
+            averages and exit_times arrays, and exit_reasons list
+            
+        Raises:
+            ValueError: If there is no post-action data
+        """
+        seconds = self._post_sec
+        wattage = self._post_watt
+        
+        if len(seconds) == 0:
+            raise ValueError("No post-action data available")
+        
+        key = (target, tolerance)
+        segments = self._segment_cache.get(key)
+        if segments is None:
+            in_band = self._distance_to_target(target) <= tolerance
+            scan_segments = _scan_segments if NUMBA_AVAILABLE else _scan_segments_numpy
+            starts, ends, averages = scan_segments(wattage, in_band)
+            
+            exits = np.minimum(ends, len(seconds) - 1)
+            start_times = seconds[starts]
+            exit_times = seconds[exits]
+            lower_bound = target - tolerance
+            upper_bound = target + tolerance
+            
+            segments = SimpleNamespace(
+                start_times=start_times,
+                start_wattages=wattage[starts],
+                durations=exit_times - start_times,
+                averages=averages,
+                exit_times=exit_times,
+                exit_reasons=[
+                    _exit_reason(wattage[end], lower_bound, upper_bound)
+                    if end < len(seconds) else 'test_ended'
+                    for end in ends
+                ]
+            )
+            self._segment_cache[key] = segments
+        return segments
     
     def calculate_band_entry(
         self, 
@@ -75,105 +300,57 @@ class TimeMetrics:
         lower_bound = target - tolerance
         upper_bound = target + tolerance
         
-        # 2. Extract post-action data
-        post_action_mask = self.df.index >= self.action_idx
-        post_action = self.df[post_action_mask].copy()
-        
-        if post_action.empty:
-            raise ValueError("No post-action data available")
-        
-        # 3. Create in-band boolean mask (NaN treated as out-of-band)
-        wattage = post_action['summary_wattage']
-        in_band = (wattage >= lower_bound) & (wattage <= upper_bound)
-        in_band = in_band.fillna(False)
-        
-        # 4. Find continuous in-band segments
-        segments = []
-        current_segment_start = None
-        current_segment_start_idx = None
+        # 2. Find continuous in-band segments of the post-action data
+        segments = self._segments(target, tolerance)
+        start_times = segments.start_times
+        start_wattages = segments.start_wattages
+        durations = segments.durations
         
-        for idx, row in post_action.iterrows():
-            time = row['seconds']
-            is_in_band = in_band.loc[idx]
-            
-            if is_in_band and current_segment_start is None:
-                # Entering band
-                current_segment_start = time
-                current_segment_start_idx = idx
+        # 3. Find first sustained entry (≥15 seconds)
+        min_dwell = 15.0  # seconds
+        sustained = np.flatnonzero(durations >= min_dwell)
+        
+        if sustained.size > 0:
+            # Found first sustained entry
+            first = sustained[0]
+            entry_time = start_times[first]
+            entry_wattage = start_wattages[first]
+            entry_percentage = (entry_wattage / target) * 100
             
-            elif not is_in_band and current_segment_start is not None:
-                # Exiting band
-                segment_duration = time - current_segment_start
-                start_wattage = post_action.loc[current_segment_start_idx, 'summary_wattage']
-                
-                segments.append({
-                    'start_time': current_segment_start,
-                    'start_wattage': start_wattage,
-                    'duration': segment_duration
-                })
-                
-                current_segment_start = None
-                current_segment_start_idx = None
-        
-        # Handle case where test ends while in-band
-        if current_segment_start is not None:
-            last_idx = post_action.index[-1]
-            last_time = post_action.loc[last_idx, 'seconds']
-            segment_duration = last_time - current_segment_start
-            start_wattage = post_action.loc[current_segment_start_idx, 'summary_wattage']
+            # Optional: Determine entry method
+            entry_method = None
+            if step_direction is not None:
+                delta = step_direction['delta']
+                if delta > 0 and entry_wattage > target:
+                    entry_method = "via_overshoot"
+                elif delta < 0 and entry_wattage < target:
+                    entry_method = "via_undershoot"
+                else:
+                    entry_method = "normal"
             
-            segments.append({
-                'start_time': current_segment_start,
-                'start_wattage': start_wattage,
-                'duration': segment_duration
-            })
-        
-        # 5. Find first sustained entry (≥15 seconds)
-        min_dwell = 15.0  # seconds
-        
-        for segment in segments:
-            if segment['duration'] >= min_dwell:
-                # Found first sustained entry
-                entry_time = segment['start_time']
-                entry_wattage = segment['start_wattage']
-                entry_percentage = (entry_wattage / target) * 100
-                
-                # Optional: Determine entry method
-                entry_method = None
-                if step_direction is not None:
-                    delta = step_direction['delta']
-                    if delta > 0 and entry_wattage > target:
-                        entry_method = "via_overshoot"
-                    elif delta < 0 and entry_wattage < target:
-                        entry_method = "via_undershoot"
-                    else:
-                        entry_method = "normal"
-                
-                return {
-                    'status': 'ENTERED',
-                    'time': float(entry_time),
-                    'wattage': float(entry_wattage),
-                    'percentage': float(entry_percentage),
-                    'band_limits': {
-                        'lower': float(lower_bound),
-                        'upper': float(upper_bound),
-                        'tolerance': float(tolerance)
-                    },
-                    'entry_method': entry_method
-                }
+            return {
+                'status': 'ENTERED',
+                'time': float(entry_time),
+                'wattage': float(entry_wattage),
+                'percentage': float(entry_percentage),
+                'band_limits': {
+                    'lower': float(lower_bound),
+                    'upper': float(upper_bound),
+                    'tolerance': float(tolerance)
+                },
+                'entry_method': entry_method
+            }
         
-        # 6. Handle failure cases
+        # 4. Handle failure cases
         
         # Case A: Started in-band at t=0
-        if segments and segments[0]['start_time'] < 1.0:
-            first_segment = segments[0]
-            
-            if first_segment['duration'] >= min_dwell:
+        if len(durations) > 0 and start_times[0] < 1.0:
+            if durations[0] >= min_dwell:
                 return {
                     'status': 'INITIALLY_IN_BAND',
                     'time': 0.0,
-                    'wattage': float(first_segment['start_wattage']),
-                    'percentage': float((first_segment['start_wattage'] / target) * 100),
+                    'wattage': float(start_wattages[0]),
+                    'percentage': float((start_wattages[0] / target) * 100),
                     'band_limits': {
                         'lower': float(lower_bound),
                         'upper': float(upper_bound),
@@ -185,9 +362,9 @@ class TimeMetrics:
                 return {
                     'status': 'BRIEFLY_IN_BAND_AT_START',
                     'time': 0.0,
-                    'wattage': float(first_segment['start_wattage']),
-                    'left_at': float(first_segment['start_time'] + first_segment['duration']),
-                    'duration': float(first_segment['duration']),
+                    'wattage': float(start_wattages[0]),
+                    'left_at': float(start_times[0] + durations[0]),
+                    'duration': float(durations[0]),
                     'band_limits': {
                         'lower': float(lower_bound),
                         'upper': float(upper_bound),
@@ -196,14 +373,14 @@ class TimeMetrics:
                 }
         
         # Case B: Brief entries only (all < 15s)
-        if segments:
-            longest_segment = max(segments, key=lambda s: s['duration'])
+        if len(durations) > 0:
+            longest = int(np.argmax(durations))
             
             return {
                 'status': 'BRIEF_ENTRY_NOT_SUSTAINED',
-                'time': float(longest_segment['start_time']),
-                'wattage': float(longest_segment['start_wattage']),
-                'duration': float(longest_segment['duration']),
+                'time': float(start_times[longest]),
+                'wattage': float(start_wattages[longest]),
+                'duration': float(durations[longest]),
                 'band_limits': {
                     'lower': float(lower_bound),
                     'upper': float(upper_bound),
@@ -212,9 +389,9 @@ class TimeMetrics:
             }
         
         # Case C: Never entered band - find closest approach
-        valid_wattage = post_action['summary_wattage'].dropna()
+        distances = self._distance_to_target(target)
         
-        if valid_wattage.empty:
+        if np.isnan(distances).all():
             return {
                 'status': 'NO_VALID_DATA',
                 'band_limits': {
@@ -224,10 +401,9 @@ class TimeMetrics:
                 }
             }
         
-        distances = abs(valid_wattage - target)
-        closest_idx = distances.idxmin()
-        closest_wattage = valid_wattage.loc[closest_idx]
-        closest_time = post_action.loc[closest_idx, 'seconds']
+        closest_pos = int(np.nanargmin(distances))
+        closest_wattage = self._post_watt[closest_pos]
+        closest_time = self._post_sec[closest_pos]
         
         return {
             'status': 'NOT_ENTERED',
@@ -263,119 +439,35 @@ class TimeMetrics:
         tolerance = 30  # watts (±30W band)
         min_sustained_duration = 25  # seconds
         
-        # 2. Calculate setpoint band
+        # 2. Find ALL continuous in-band segments of the post-action data
         target = target_power['after']
-        lower_bound = target - tolerance
-        upper_bound = target + tolerance
-        
-        # 3. Extract post-action data
-        post_action_mask = self.df.index >= self.action_idx
-        post_action = self.df[post_action_mask].copy()
+        segments = self._segments(target, tolerance)
         
-        if post_action.empty:
-            raise ValueError("No post-action data available")
-        
-        # 4. Create in-band boolean mask (NaN treated as out-of-band)
-        wattage = post_action['summary_wattage']
-        in_band = (wattage >= lower_bound) & (wattage <= upper_bound)
-        in_band = in_band.fillna(False)
-        
-        # 5. Find ALL continuous in-band segments
-        segments = []
-        current_segment_start = None
-        current_segment_start_idx = None
-        
-        for idx, row in post_action.iterrows():
-            time = row['seconds']
-            is_in_band = in_band.loc[idx]
-            current_wattage = row['summary_wattage']
-            
-            if is_in_band and current_segment_start is None:
-                # Entering band
-                current_segment_start = time
-                current_segment_start_idx = idx
-            
-            elif not is_in_band and current_segment_start is not None:
-                # Exiting band - determine exit reason
-                exit_time = time
-                
-                if pd.notna(current_wattage):
-                    if current_wattage < lower_bound:
-                        exit_reason = "dropped_below"
-                    elif current_wattage > upper_bound:
-                        exit_reason = "exceeded_above"
-                    else:
-                        exit_reason = "unknown"
-                else:
-                    exit_reason = "unknown"
-                
-                segment_duration = exit_time - current_segment_start
-                start_wattage = post_action.loc[current_segment_start_idx, 'summary_wattage']
-                
-                # Calculate average wattage during segment
-                segment_mask = (post_action['seconds'] >= current_segment_start) & \
-                              (post_action['seconds'] < exit_time)
-                segment_wattages = post_action.loc[segment_mask, 'summary_wattage'].dropna()
-                avg_wattage = segment_wattages.mean() if not segment_wattages.empty else start_wattage
-                
-                segments.append({
-                    'start_time': current_segment_start,
-                    'start_wattage': start_wattage,
-                    'duration': segment_duration,
-                    'avg_wattage': avg_wattage,
-                    'exit_time': exit_time,
-                    'exit_reason': exit_reason
-                })
-                
-                current_segment_start = None
-                current_segment_start_idx = None
-        
-        # Handle case where test ends while in-band
-        if current_segment_start is not None:
-            last_idx = post_action.index[-1]
-            last_time = post_action.loc[last_idx, 'seconds']
-            segment_duration = last_time - current_segment_start
-            start_wattage = post_action.loc[current_segment_start_idx, 'summary_wattage']
-            
-            # Calculate average wattage during segment
-            segment_mask = post_action['seconds'] >= current_segment_start
-            segment_wattages = post_action.loc[segment_mask, 'summary_wattage'].dropna()
-            avg_wattage = segment_wattages.mean() if not segment_wattages.empty else start_wattage
-            
-            segments.append({
-                'start_time': current_segment_start,
-                'start_wattage': start_wattage,
-                'duration': segment_duration,
-                'avg_wattage': avg_wattage,
-                'exit_time': last_time,
-                'exit_reason': 'test_ended'
-            })
-        
-        # 6. Classify segments as brief touches or sustained hits
+        # 3. Classify segments as brief touches or sustained hits
         brief_touches = []
         sustained_hits = []
         
-        for segment in segments:
-            if segment['duration'] < min_sustained_duration:
+        for k, duration in enumerate(segments.durations):
+            if duration < min_sustained_duration:
                 # Brief touch
                 brief_touches.append({
-                    'time': float(segment['start_time']),
-                    'wattage': float(segment['start_wattage']),
-                    'duration': float(segment['duration']),
-                    'exit_reason': segment['exit_reason']
+                    'time': float(segments.start_times[k]),
+                    'wattage': float(segments.start_wattages[k]),
+                    'duration': float(duration),
+                    'exit_reason': segments.exit_reasons[k]
                 })
             else:
                 # Sustained hit
                 sustained_hits.append({
-                    'time': float(segment['start_time']),
-                    'wattage': float(segment['start_wattage']),
-                    'duration': float(segment['duration']),
-                    'avg_wattage': float(segment['avg_wattage']),
-                    'exit_time': float(segment['exit_time']),
-                    'exit_reason': segment['exit_reason']
+                    'time': float(segments.start_times[k]),
+                    'wattage': float(segments.start_wattages[k]),
+                    'duration': float(duration),
+                    'avg_wattage': float(segments.averages[k]),
+                    'exit_time': float(segments.exit_times[k]),
+                    'exit_reason': segments.exit_reasons[k]
                 })
         
-        # 7. Create summary
+        # 4. Create summary
         first_sustained_hit_time = None
         never_sustained = True
         
@@ -414,122 +506,34 @@ class TimeMetrics:
         tolerance = 20  # watts (±20W band, tighter than setpoint hit)
         min_plateau_duration = 30  # seconds
         
-        # 2. Calculate plateau band
+        # 2. Find ALL continuous in-band segments of the post-action data
         target = target_power['after']
-        lower_bound = target - tolerance
-        upper_bound = target + tolerance
-        
-        # 3. Extract post-action data
-        post_action_mask = self.df.index >= self.action_idx
-        post_action = self.df[post_action_mask].copy()
-        
-        if post_action.empty:
-            raise ValueError("No post-action data available")
-        
-        # 4. Create in-band boolean mask (NaN treated as out-of-band)
-        wattage = post_action['summary_wattage']
-        in_band = (wattage >= lower_bound) & (wattage <= upper_bound)
-        in_band = in_band.fillna(False)
-        
-        # 5. Find ALL continuous in-band segments
-        segments = []
-        current_segment_start = None
-        current_segment_start_idx = None
-        
-        for idx, row in post_action.iterrows():
-            time = row['seconds']
-            is_in_band = in_band.loc[idx]
-            current_wattage = row['summary_wattage']
-            
-            if is_in_band and current_segment_start is None:
-                # Entering plateau band
-                current_segment_start = time
-                current_segment_start_idx = idx
-            
-            elif not is_in_band and current_segment_start is not None:
-                # Exiting plateau band - determine exit reason
-                exit_time = time
-                
-                if pd.notna(current_wattage):
-                    if current_wattage < lower_bound:
-                        exit_reason = "dropped_below"
-                    elif current_wattage > upper_bound:
-                        exit_reason = "exceeded_above"
-                    else:
-                        exit_reason = "unknown"
-                else:
-                    exit_reason = "unknown"
-                
-                segment_duration = exit_time - current_segment_start
-                
-                # Calculate average wattage during segment
-                segment_mask = (post_action['seconds'] >= current_segment_start) & \
-                              (post_action['seconds'] < exit_time)
-                segment_wattages = post_action.loc[segment_mask, 'summary_wattage'].dropna()
-                
-                if not segment_wattages.empty:
-                    avg_wattage = segment_wattages.mean()
-                else:
-                    avg_wattage = post_action.loc[current_segment_start_idx, 'summary_wattage']
-                
-                segments.append({
-                    'start_time': current_segment_start,
-                    'duration': segment_duration,
-                    'avg_wattage': avg_wattage,
-                    'exit_time': exit_time,
-                    'exit_reason': exit_reason
-                })
-                
-                current_segment_start = None
-                current_segment_start_idx = None
-        
-        # Handle case where test ends while in plateau
-        if current_segment_start is not None:
-            last_idx = post_action.index[-1]
-            last_time = post_action.loc[last_idx, 'seconds']
-            segment_duration = last_time - current_segment_start
-            
-            # Calculate average wattage during segment
-            segment_mask = post_action['seconds'] >= current_segment_start
-            segment_wattages = post_action.loc[segment_mask, 'summary_wattage'].dropna()
-            
-            if not segment_wattages.empty:
-                avg_wattage = segment_wattages.mean()
-            else:
-                avg_wattage = post_action.loc[current_segment_start_idx, 'summary_wattage']
-            
-            segments.append({
-                'start_time': current_segment_start,
-                'duration': segment_duration,
-                'avg_wattage': avg_wattage,
-                'exit_time': last_time,
-                'exit_reason': 'test_ended'
-            })
-        
-        # 6. Filter for qualifying plateaus (≥30 seconds)
-        plateaus = []
-        
-        for segment in segments:
-            if segment['duration'] >= min_plateau_duration:
-                plateaus.append({
-                    'start_time': float(segment['start_time']),
-                    'duration': float(segment['duration']),
-                    'avg_wattage': float(segment['avg_wattage']),
-                    'exit_time': float(segment['exit_time']),
-                    'exit_reason': segment['exit_reason']
-                })
+        segments = self._segments(target, tolerance)
+        durations = segments.durations
+        
+        # 3. Filter for qualifying plateaus (≥30 seconds)
+        qualifying = np.flatnonzero(durations >= min_plateau_duration)
+        plateaus = [
+            {
+                'start_time': float(segments.start_times[k]),
+                'duration': float(durations[k]),
+                'avg_wattage': float(segments.averages[k]),
+                'exit_time': float(segments.exit_times[k]),
+                'exit_reason': segments.exit_reasons[k]
+            }
+            for k in qualifying
+        ]
         
-        # 7. Calculate summary statistics
+        # 4. Calculate summary statistics
         if plateaus:
-            longest_plateau = max(plateaus, key=lambda p: p['duration'])
-            total_stable_time = sum(p['duration'] for p in plateaus)
+            plateau_durations = durations[qualifying]
             
             return {
                 'plateaus': plateaus,
                 'summary': {
                     'total_count': len(plateaus),
-                    'longest_duration': float(longest_plateau['duration']),
-                    'total_stable_time': float(total_stable_time)
+                    'longest_duration': float(plateau_durations.max()),
+                    'total_stable_time': float(plateau_durations.sum())
                 }
             }
         else:
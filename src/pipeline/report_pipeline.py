@@ -18,10 +18,11 @@ from datetime import datetime
 from src.metrics.orchestrator import MetricOrchestrator
 from src.visualization.plotter import create_power_timeline, figure_to_html
 from src.analysis.claude_client import (
-    format_csv_for_llm,
+    format_csv_for_llm_fast,
     extract_test_info,
-    build_prompt,
-    get_analysis
+    build_prompt_blocks,
+    get_analysis,
+    get_analysis_batch
 )
 from src.reporting import generate_html_report, save_report
 
@@ -252,17 +253,7 @@ class ReportPipeline:
         self.logger.info(f"Starting report generation for: {csv_filepath}")
         
         try:
-            # Stage 1: Validate input file
-            self.logger.info("Stage 1/5: Validating input file...")
-            self._validate_input_file(csv_filepath)
-            
-            # Stage 2: Calculate metrics (Phase 1)
-            self.logger.info("Stage 2/5: Calculating metrics...")
-            orchestrator_result = self._calculate_metrics(csv_filepath)
-            
-            # Stage 3: Generate visualization (Task 12)
-            self.logger.info("Stage 3/5: Generating visualization...")
-            chart_html = self._generate_visualization(orchestrator_result)
+            orchestrator_result, chart_html = self._prepare_report(csv_filepath)
             
             # Stage 4: Generate AI analysis (Task 13, optional)
             analysis_text = None
@@ -272,53 +263,192 @@ class ReportPipeline:
             else:
                 self.logger.info("Stage 4/5: Skipping AI analysis (disabled)")
             
-            # Stage 5: Assemble and save report (Task 14)
-            self.logger.info("Stage 5/5: Assembling and saving report...")
-            report_path = self._save_report(
+            return self._finish_report(
                 orchestrator_result,
                 chart_html,
                 analysis_text,
-                output_dir or str(self.output_dir)
+                output_dir,
+                start_time
             )
             
-            # Success!
-            duration = (datetime.now() - start_time).total_seconds()
-            self.stats['successful'] += 1
-            
-            self.logger.info(
-                f"Report generated successfully in {duration:.2f}s: {report_path}"
-            )
-            
-            return {
-                'success': True,
-                'report_path': report_path,
-                'metrics': orchestrator_result['metrics'],
-                'metadata': orchestrator_result['metadata'],
-                'analysis_included': analysis_text is not None,
-                'duration_seconds': duration
-            }
-            
         except Exception as e:
-            # Handle any errors
-            duration = (datetime.now() - start_time).total_seconds()
-            self.stats['failed'] += 1
-            error_msg = f"{type(e).__name__}: {str(e)}"
-            self.stats['errors'].append({
-                'file': csv_filepath,
-                'error': error_msg,
-                'timestamp': datetime.now().isoformat()
-            })
+            return self._record_failure(csv_filepath, e, start_time)
+    
+    def _prepare_report(self, csv_filepath: str) -> Tuple[Dict[str, Any], str]:
+        """
+        Run stages 1-3: validate input, calculate metrics, build the chart.
+        
+        Returns:
+            Tuple of (orchestrator_result, chart_html)
+        """
+        # Stage 1: Validate input file
+        self.logger.info("Stage 1/5: Validating input file...")
+        self._validate_input_file(csv_filepath)
+        
+        # Stage 2: Calculate metrics (Phase 1)
+        self.logger.info("Stage 2/5: Calculating metrics...")
+        orchestrator_result = self._calculate_metrics(csv_filepath)
+        
+        # Stage 3: Generate visualization (Task 12)
+        self.logger.info("Stage 3/5: Generating visualization...")
+        chart_html = self._generate_visualization(orchestrator_result)
+        
+        return orchestrator_result, chart_html
+    
+    def _finish_report(
+        self,
+        orchestrator_result: Dict[str, Any],
+        chart_html: str,
+        analysis_text: Optional[str],
+        output_dir: Optional[str],
+        start_time: datetime,
+        prior_seconds: float = 0.0
+    ) -> Dict[str, Any]:
+        """
+        Run stage 5 (assemble and save) and record the success.
+        
+        The reported duration is the time since start_time plus
+        prior_seconds (file work done before a shared batch analysis wait).
+        """
+        # Stage 5: Assemble and save report (Task 14)
+        self.logger.info("Stage 5/5: Assembling and saving report...")
+        report_path = self._save_report(
+            orchestrator_result,
+            chart_html,
+            analysis_text,
+            output_dir or str(self.output_dir)
+        )
+        
+        # Success!
+        duration = prior_seconds + (datetime.now() - start_time).total_seconds()
+        self.stats['successful'] += 1
+        
+        self.logger.info(
+            f"Report generated successfully in {duration:.2f}s: {report_path}"
+        )
+        
+        return {
+            'success': True,
+            'report_path': report_path,
+            'metrics': orchestrator_result['metrics'],
+            'metadata': orchestrator_result['metadata'],
+            'analysis_included': analysis_text is not None,
+            'duration_seconds': duration
+        }
+    
+    def _record_failure(
+        self,
+        csv_filepath: str,
+        error: Exception,
+        start_time: datetime,
+        prior_seconds: float = 0.0
+    ) -> Dict[str, Any]:
+        """Record a failed report in pipeline stats and build the result dict."""
+        duration = prior_seconds + (datetime.now() - start_time).total_seconds()
+        self.stats['failed'] += 1
+        error_msg = f"{type(error).__name__}: {str(error)}"
+        self.stats['errors'].append({
+            'file': csv_filepath,
+            'error': error_msg,
+            'timestamp': datetime.now().isoformat()
+        })
+        
+        self.logger.error(
+            f"Report generation failed after {duration:.2f}s: {error_msg}"
+        )
+        
+        return {
+            'success': False,
+            'error': error_msg,
+            'file': csv_filepath,
+            'duration_seconds': duration
+        }
+    
+    def _process_batch_with_batched_analysis(
+        self,
+        csv_files: List[Path],
+        output_dir: Optional[str],
+        continue_on_error: bool,
+        batch_results: Dict[str, Any],
+        max_wait: float
+    ) -> None:
+        """
+        Process files in three passes: prepare all, analyze in one batch, save all.
+        
+        Each file's duration covers only its own prepare and save stages;
+        the shared analysis wait is recorded once in
+        batch_results['analysis_wait_seconds'].
+        
+        Args:
+            csv_files: CSV files to process
+            output_dir: Optional custom output directory
+            continue_on_error: Continue processing if individual files fail
+            batch_results: Batch result dictionary, updated in place
+            max_wait: Maximum seconds to wait for the Message Batches request
+        """
+        prepared = []
+        prepare_seconds = {}
+        
+        for idx, csv_file in enumerate(csv_files, 1):
+            self.logger.info(f"Preparing file {idx}/{len(csv_files)}: {csv_file.name}")
+            csv_filepath = str(csv_file)
+            start_time = datetime.now()
+            self.stats['total_processed'] += 1
             
-            self.logger.error(
-                f"Report generation failed after {duration:.2f}s: {error_msg}"
-            )
+            try:
+                orchestrator_result, chart_html = self._prepare_report(csv_filepath)
+                prepared.append((csv_filepath, orchestrator_result, chart_html))
+                prepare_seconds[csv_filepath] = (datetime.now() - start_time).total_seconds()
+            except Exception as e:
+                result = self._record_failure(csv_filepath, e, start_time)
+                self._record_batch_result(batch_results, csv_file, result)
+                if not continue_on_error:
+                    return
+        
+        self.logger.info(f"Stage 4/5: Generating AI analysis for {len(prepared)} files in one batch...")
+        analysis_start = datetime.now()
+        analyses = self._generate_analyses_batched(prepared, max_wait)
+        batch_results['analysis_wait_seconds'] = (datetime.now() - analysis_start).total_seconds()
+        
+        for csv_filepath, orchestrator_result, chart_html in prepared:
+            start_time = datetime.now()
+            try:
+                result = self._finish_report(
+                    orchestrator_result,
+                    chart_html,
+                    analyses[csv_filepath],
+                    output_dir,
+                    start_time,
+                    prepare_seconds[csv_filepath]
+                )
+            except Exception as e:
+                result = self._record_failure(
+                    csv_filepath, e, start_time, prepare_seconds[csv_filepath]
+                )
             
-            return {
-                'success': False,
-                'error': error_msg,
-                'file': csv_filepath,
-                'duration_seconds': duration
-            }
+            if not self._record_batch_result(batch_results, Path(csv_filepath), result) and not continue_on_error:
+                return
+    
+    def _record_batch_result(
+        self,
+        batch_results: Dict[str, Any],
+        csv_file: Path,
+        result: Dict[str, Any]
+    ) -> bool:
+        """Add one file's result to the batch summary; returns result['success']."""
+        if result['success']:
+            batch_results['successful'] += 1
+            batch_results['reports'].append(result['report_path'])
+            self.logger.info(f"✓ Success: {csv_file.name}")
+            return True
+        
+        batch_results['failed'] += 1
+        batch_results['errors'].append({
+            'file': str(csv_file),
+            'error': result.get('error', 'Unknown error')
+        })
+        self.logger.error(f"✗ Failed: {csv_file.name}")
+        return False
     
     def _validate_input_file(self, filepath: str) -> None:
         """Validate input CSV file exists and is readable."""
@@ -351,7 +481,8 @@ class ReportPipeline:
         """Calculate metrics using Phase 1 MetricOrchestrator."""
         try:
             orchestrator = MetricOrchestrator()
-            result = orchestrator.process_file(filepath)
+            # The plotter takes the DataFrame directly; no per-row dicts needed
+            result = orchestrator.process_file(filepath, raw_data_format='frame')
             
             self.logger.debug(
                 f"Metrics calculated: {len(result['metrics'])} metrics, "
@@ -387,6 +518,38 @@ class ReportPipeline:
                 f"Failed to generate visualization: {e}"
             ) from e
     
+    def _build_analysis_prompt(
+        self,
+        orchestrator_result: Dict[str, Any],
+        filepath: str
+    ) -> List[Dict[str, Any]]:
+        """Build the Claude prompt content blocks for one CSV file."""
+        # Format the already-ingested frame for the LLM; no second CSV parse
+        csv_content, csv_warnings = format_csv_for_llm_fast(orchestrator_result['raw_data'])
+        for warning in csv_warnings:
+            self.logger.warning(f"{Path(filepath).name}: {warning}")
+        
+        # Extract test info
+        test_info = extract_test_info(filepath)
+        
+        # Determine step direction
+        step_direction = orchestrator_result['metrics'].get('step_direction', {}).get('direction', 'UNKNOWN')
+        
+        # Format power range
+        target_power = orchestrator_result['metrics'].get('target_power', {})
+        power_before = target_power.get('before', 0)
+        power_after = target_power.get('after', 0)
+        power_range = f"{power_before:.0f}W → {power_after:.0f}W"
+        
+        # Build prompt
+        return build_prompt_blocks(
+            test_id=test_info['test_id'],
+            miner_number=test_info['miner_number'],
+            step_direction=step_direction,
+            power_range=power_range,
+            csv_content=csv_content
+        )
+    
     def _generate_analysis(
         self,
         orchestrator_result: Dict[str, Any],
@@ -394,33 +557,7 @@ class ReportPipeline:
     ) -> Optional[str]:
         """Generate AI analysis using Task 13 Claude API integration."""
         try:
-            # Read raw CSV data
-            import pandas as pd
-            raw_df = pd.read_csv(filepath)
-            
-            # Format CSV for LLM
-            csv_content = format_csv_for_llm(raw_df)
-            
-            # Extract test info
-            test_info = extract_test_info(filepath)
-            
-            # Determine step direction
-            step_direction = orchestrator_result['metrics'].get('step_direction', {}).get('direction', 'UNKNOWN')
-            
-            # Format power range
-            target_power = orchestrator_result['metrics'].get('target_power', {})
-            power_before = target_power.get('before', 0)
-            power_after = target_power.get('after', 0)
-            power_range = f"{power_before:.0f}W → {power_after:.0f}W"
-            
-            # Build prompt
-            prompt = build_prompt(
-                test_id=test_info['test_id'],
-                miner_number=test_info['miner_number'],
-                step_direction=step_direction,
-                power_range=power_range,
-                csv_content=csv_content
-            )
+            prompt = self._build_analysis_prompt(orchestrator_result, filepath)
             
             # Get analysis from Claude
             analysis_result = get_analysis(prompt)
@@ -436,6 +573,63 @@ class ReportPipeline:
             self.logger.warning(f"Failed to generate analysis: {e}")
             return None
     
+    def _generate_analyses_batched(
+        self,
+        prepared: List[Tuple[str, Dict[str, Any], str]],
+        max_wait: float
+    ) -> Dict[str, Optional[str]]:
+        """
+        Generate AI analyses for several files with one Message Batches request.
+        
+        Files the batch does not answer (the batch failed, did not finish
+        within max_wait, or returned an error for that request) fall back to
+        one synchronous get_analysis() call each.
+        
+        Args:
+            prepared: List of (csv_filepath, orchestrator_result, chart_html)
+            max_wait: Maximum seconds to wait for the batch
+        
+        Returns:
+            Mapping of csv_filepath to analysis text (None where it failed)
+        """
+        analyses: Dict[str, Optional[str]] = {path: None for path, _, _ in prepared}
+        
+        queued = []
+        for csv_filepath, orchestrator_result, _ in prepared:
+            try:
+                queued.append({
+                    'test_id': csv_filepath,
+                    'prompt': self._build_analysis_prompt(orchestrator_result, csv_filepath)
+                })
+            except Exception as e:
+                self.logger.warning(f"Failed to build analysis prompt for {csv_filepath}: {e}")
+        
+        if not queued:
+            return analyses
+        
+        try:
+            results = get_analysis_batch(queued, max_wait=max_wait)
+        except Exception as e:
+            # Log warning but don't fail the entire batch
+            self.logger.warning(f"Failed to generate batched analysis: {e}")
+            results = []
+        
+        for result in results:
+            if 'error' in result:
+                self.logger.warning(
+                    f"Failed to generate analysis for {result['test_id']}: {result['error']}"
+                )
+            else:
+                analyses[result['test_id']] = result['analysis']
+        
+        # Anything the batch did not answer is analyzed one file at a time
+        for csv_filepath, orchestrator_result, _ in prepared:
+            if analyses[csv_filepath] is None:
+                self.logger.info(f"Falling back to single analysis request for {csv_filepath}")
+                analyses[csv_filepath] = self._generate_analysis(orchestrator_result, csv_filepath)
+        
+        return analyses
+    
     def _save_report(
         self,
         orchestrator_result: Dict[str, Any],
@@ -474,7 +668,9 @@ class ReportPipeline:
         input_directory: str,
         output_dir: Optional[str] = None,
         pattern: str = '*.csv',
-        continue_on_error: bool = True
+        continue_on_error: bool = True,
+        use_batch_api: bool = False,
+        batch_max_wait: float = 3600.0
     ) -> Dict[str, Any]:
         """
         Generate reports for multiple CSV files in batch.
@@ -484,6 +680,12 @@ class ReportPipeline:
             output_dir: Optional custom output directory (overrides default)
             pattern: Glob pattern for finding CSV files (default: '*.csv')
             continue_on_error: Continue processing if individual files fail
+            use_batch_api: Send all analysis prompts as one Message Batches
+                           request (half price, but asynchronous) instead of
+                           one call per file (default: False)
+            batch_max_wait: Seconds to wait for the Message Batches request
+                            before falling back to per-file calls
+                            (default: 3600)
         
         Returns:
             Dictionary with batch results:
@@ -493,6 +695,8 @@ class ReportPipeline:
                 - 'reports': list (paths to generated reports)
                 - 'errors': list (error details for failed files)
                 - 'duration_seconds': float (total processing time)
+                - 'analysis_wait_seconds': float (time spent waiting on
+                  the Message Batches request; 0 unless use_batch_api)
         
         Example:
             >>> pipeline = ReportPipeline()
@@ -519,7 +723,8 @@ class ReportPipeline:
                 'failed': 0,
                 'reports': [],
                 'errors': [],
-                'duration_seconds': 0
+                'duration_seconds': 0,
+                'analysis_wait_seconds': 0
             }
         
         self.logger.info(f"Starting batch processing of {len(csv_files)} files")
@@ -531,44 +736,33 @@ class ReportPipeline:
             'failed': 0,
             'reports': [],
             'errors': [],
-            'duration_seconds': 0
+            'duration_seconds': 0,
+            'analysis_wait_seconds': 0
         }
         
-        # Process each file
-        for idx, csv_file in enumerate(csv_files, 1):
-            self.logger.info(f"Processing file {idx}/{len(csv_files)}: {csv_file.name}")
-            
-            try:
-                result = self.generate_report(
-                    csv_filepath=str(csv_file),
-                    output_dir=output_dir
-                )
+        # On request, send all prompts as one Message Batches request
+        # instead of one synchronous API call per file
+        if self.enable_analysis and use_batch_api and len(csv_files) >= 2:
+            self._process_batch_with_batched_analysis(
+                csv_files, output_dir, continue_on_error, batch_results, batch_max_wait
+            )
+        else:
+            # Process each file
+            for idx, csv_file in enumerate(csv_files, 1):
+                self.logger.info(f"Processing file {idx}/{len(csv_files)}: {csv_file.name}")
                 
-                if result['success']:
-                    batch_results['successful'] += 1
-                    batch_results['reports'].append(result['report_path'])
-                    self.logger.info(f"✓ Success: {csv_file.name}")
-                else:
-                    batch_results['failed'] += 1
-                    batch_results['errors'].append({
-                        'file': str(csv_file),
-                        'error': result.get('error', 'Unknown error')
-                    })
-                    self.logger.error(f"✗ Failed: {csv_file.name}")
-                    
-                    if not continue_on_error:
-                        break
-            
-            except Exception as e:
-                batch_results['failed'] += 1
-                error_msg = f"{type(e).__name__}: {str(e)}"
-                batch_results['errors'].append({
-                    'file': str(csv_file),
-                    'error': error_msg
-                })
-                self.logger.error(f"✗ Exception processing {csv_file.name}: {error_msg}")
+                try:
+                    result = self.generate_report(
+                        csv_filepath=str(csv_file),
+                        output_dir=output_dir
+                    )
+                except Exception as e:
+                    result = {
+                        'success': False,
+                        'error': f"{type(e).__name__}: {str(e)}"
+                    }
                 
-                if not continue_on_error:
+                if not self._record_batch_result(batch_results, csv_file, result) and not continue_on_error:
                     break
         
         # Calculate total duration
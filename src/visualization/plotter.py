@@ -7,7 +7,7 @@ over time with key thresholds, action markers, and zone overlays.
 
 import plotly.graph_objects as go
 from plotly.offline import plot
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 import logging
 import pandas as pd
 
@@ -26,12 +26,18 @@ class PowerTimelinePlotter:
     - Interactive hover tooltips
     """
     
-    def __init__(self, raw_data: List[Dict[str, Any]], metrics: Dict[str, Any], metadata: Dict[str, Any]):
+    def __init__(
+        self,
+        raw_data: Union[List[Dict[str, Any]], pd.DataFrame],
+        metrics: Dict[str, Any],
+        metadata: Dict[str, Any]
+    ):
         """
         Initialize plotter with data and metrics from Phase 1 orchestrator.
         
         Args:
-            raw_data: List of dictionaries containing preprocessed time-series data
+            raw_data: Preprocessed time-series data, as a list of dictionaries
+                or a DataFrame
             metrics: Dictionary of calculated metrics
             metadata: Processing metadata
         """
@@ -289,7 +295,7 @@ class PowerTimelinePlotter:
 
 
 def create_power_timeline(
-    raw_data: List[Dict[str, Any]],
+    raw_data: Union[List[Dict[str, Any]], pd.DataFrame],
     metrics: Dict[str, Any],
     metadata: Dict[str, Any]
 ) -> go.Figure:
@@ -299,7 +305,8 @@ def create_power_timeline(
     This is the main entry point for creating power timeline plots.
     
     Args:
-        raw_data: List of dictionaries containing preprocessed time-series data
+        raw_data: Preprocessed time-series data, as a list of dictionaries
+            or a DataFrame
         metrics: Dictionary of calculated metrics from Phase 1
         metadata: Processing metadata
     
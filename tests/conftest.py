@@ -265,6 +265,21 @@ def real_valid_profile_csv(real_fixtures_dir) -> str:
     return str(real_fixtures_dir / 'valid_power_profile.csv')
 
 
+# ============================================================================
+# Claude Client Isolation
+# ============================================================================
+
+@pytest.fixture(autouse=True)
+def clear_claude_client_cache(monkeypatch):
+    """Drop cached Anthropic clients so each test sees its own mock."""
+    from src.analysis import claude_client
+    # Never serve test calls from a developer's on-disk response cache
+    monkeypatch.delenv(claude_client.CACHE_DIR_ENV_VAR, raising=False)
+    claude_client._get_client.cache_clear()
+    yield
+    claude_client._get_client.cache_clear()
+
+
 # ============================================================================
 # Pytest Configuration
 # ============================================================================
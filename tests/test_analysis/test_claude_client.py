@@ -11,20 +11,23 @@ Tests cover:
 """
 
 import pytest
+import numpy as np
 import pandas as pd
-import warnings
 from pathlib import Path
 from io import StringIO
 
 from src.analysis.claude_client import (
     format_csv_for_llm,
+    format_csv_for_llm_fast,
     estimate_token_count,
     validate_csv_format,
     extract_test_info,
     determine_step_direction,
     format_power_range,
     build_prompt,
-    get_analysis
+    build_prompt_blocks,
+    get_analysis,
+    get_analysis_batch
 )
 
 
@@ -47,7 +50,7 @@ class TestFormatCSVForLLM:
     
     def test_format_csv_basic(self, sample_dataframe):
         """Should convert DataFrame to CSV string."""
-        result = format_csv_for_llm(sample_dataframe)
+        result, _ = format_csv_for_llm(sample_dataframe)
         
         assert isinstance(result, str)
         assert len(result) > 0
@@ -63,7 +66,7 @@ class TestFormatCSVForLLM:
     
     def test_format_csv_no_index(self, sample_dataframe):
         """CSV should not include DataFrame index."""
-        result = format_csv_for_llm(sample_dataframe)
+        result, _ = format_csv_for_llm(sample_dataframe)
         
         # Parse it back to check
         df = pd.read_csv(StringIO(result))
@@ -73,7 +76,7 @@ class TestFormatCSVForLLM:
     
     def test_format_csv_rounds_power(self, sample_dataframe):
         """Should round power values to nearest watt."""
-        result = format_csv_for_llm(sample_dataframe)
+        result, _ = format_csv_for_llm(sample_dataframe)
         
         # 998.5 should become 999, 1002.3 should become 1002
         assert '999' in result or '998' in result
@@ -82,7 +85,7 @@ class TestFormatCSVForLLM:
     
     def test_format_csv_rounds_temperature(self, sample_dataframe):
         """Should round temperature to 1 decimal place."""
-        result = format_csv_for_llm(sample_dataframe)
+        result, _ = format_csv_for_llm(sample_dataframe)
         
         # Should have temperatures like 65.2, not 65.23456
         lines = result.split('\n')
@@ -95,14 +98,37 @@ class TestFormatCSVForLLM:
                 assert '65.2' in result or '66.1' in result
     
     def test_format_csv_preserves_structure(self, sample_dataframe):
-        """Should preserve all rows and columns."""
-        result = format_csv_for_llm(sample_dataframe)
+        """Should preserve all rows and the columns the prompt defines."""
+        result, _ = format_csv_for_llm(sample_dataframe)
         
         # Parse back and check
         df = pd.read_csv(StringIO(result))
         
         assert len(df) == len(sample_dataframe)
-        assert list(df.columns) == list(sample_dataframe.columns)
+        assert list(df.columns) == [
+            'miner.seconds',
+            'miner.mode.power',
+            'miner.summary.wattage',
+            'miner.temp.hash_board_max',
+            'miner.psu.temp_max',
+            'miner.outage'
+        ]
+    
+    def test_format_csv_outage_as_digit(self, sample_dataframe):
+        """Should write boolean outage values as 0/1."""
+        sample_dataframe.loc[3, 'miner.outage'] = True
+        
+        result, _ = format_csv_for_llm(sample_dataframe)
+        
+        outage = [line.rsplit(',', 1)[1] for line in result.splitlines()[1:]]
+        assert outage == ['0', '0', '0', '1', '0']
+    
+    def test_format_csv_drops_unused_columns(self, sample_dataframe):
+        """Should not send columns the prompt never describes."""
+        result, _ = format_csv_for_llm(sample_dataframe)
+        
+        assert 'miner.collection' not in result
+        assert result.splitlines()[1] == '-60,1000,998,65.2,45.3,0'
     
     def test_format_csv_empty_dataframe(self):
         """Should raise ValueError for empty DataFrame."""
@@ -140,12 +166,53 @@ class TestFormatCSVForLLM:
             'miner.collection.mode_error': [0] * 10000
         })
         
-        with warnings.catch_warnings(record=True) as w:
-            warnings.simplefilter("always")
-            format_csv_for_llm(large_df, max_tokens=1000)
-            
-            assert len(w) == 1
-            assert "token limit" in str(w[0].message).lower()
+        _, csv_warnings = format_csv_for_llm(large_df, max_tokens=1000)
+        
+        assert len(csv_warnings) == 1
+        assert "token limit" in csv_warnings[0].lower()
+    
+    def test_format_csv_no_warnings_within_budget(self, sample_dataframe):
+        """Should return an empty warning list when data fits the budget."""
+        _, csv_warnings = format_csv_for_llm(sample_dataframe)
+        
+        assert csv_warnings == []
+    
+    def test_format_csv_downsamples_to_budget(self):
+        """Should downsample oversized data, keeping the transition window."""
+        large_df = pd.DataFrame({
+            'miner.seconds': range(-300, 9700),
+            'miner.mode.power': [1000] * 300 + [3500] * 9700,
+            'miner.summary.wattage': [998.5] * 10000
+        })
+        
+        result, _ = format_csv_for_llm(large_df, max_tokens=1000)
+        
+        df = pd.read_csv(StringIO(result))
+        assert estimate_token_count(result) <= 1000
+        assert df['miner.seconds'].is_monotonic_increasing
+        # Every row within ±60s of the transition is kept
+        assert (df['miner.seconds'].abs() <= 60).sum() == 121
+        # Tails are still represented
+        assert df['miner.seconds'].iloc[0] == -300
+        assert df['miner.seconds'].iloc[-1] == 9699
+    
+    def test_format_csv_nan_power_stays_blank(self):
+        """NaN in whole-number columns should serialize as empty cells."""
+        df = pd.DataFrame({
+            'miner.seconds': [-1.2, 0.4, 1.6],
+            'miner.mode.power': [1000, 3500, 3500],
+            'miner.summary.wattage': [998.6, float('nan'), 3480.2]
+        })
+        
+        result, _ = format_csv_for_llm(df)
+        
+        assert result.splitlines()[1:] == ['-1,1000,999', '0,3500,', '2,3500,3480']
+    
+    def test_format_csv_non_default_index(self, sample_dataframe):
+        """Should keep all rows when the input has a non-range index."""
+        shifted = sample_dataframe.set_index(sample_dataframe.index + 100)
+        
+        assert format_csv_for_llm(shifted) == format_csv_for_llm(sample_dataframe)
     
     def test_format_csv_doesnt_modify_original(self, sample_dataframe):
         """Should not modify the original DataFrame."""
@@ -156,6 +223,72 @@ class TestFormatCSVForLLM:
         pd.testing.assert_frame_equal(sample_dataframe, original_copy)
 
 
+class TestFormatCSVForLLMFast:
+    """Test suite for formatting already-ingested DataFrames."""
+    
+    @pytest.fixture
+    def standardized_dataframe(self):
+        """Standardized frame as produced by DataIngestion.load_csv."""
+        return pd.DataFrame({
+            'seconds': [-60.0, -30.0, 0.0, 30.0, 60.0],
+            'mode_power': [1000.0, 1000.0, 3500.0, 3500.0, 3500.0],
+            'summary_wattage': [998.456, 1002.789, 1005.123, 2800.5, 3480.2],
+            'temp_hash_board_max': [65.234, 65.567, 65.891, 70.123, 75.456],
+            'psu_temp_max': [45.678, 45.912, 46.234, 48.567, 50.891],
+            'outage': [False, False, False, True, False]
+        })
+    
+    def test_fast_matches_pandas_formatter(self, standardized_dataframe):
+        """Should produce the same CSV as format_csv_for_llm on renamed columns."""
+        result, csv_warnings = format_csv_for_llm_fast(standardized_dataframe)
+        
+        renamed = standardized_dataframe.rename(columns=lambda c: {
+            'seconds': 'miner.seconds',
+            'mode_power': 'miner.mode.power',
+            'summary_wattage': 'miner.summary.wattage',
+            'temp_hash_board_max': 'miner.temp.hash_board_max',
+            'psu_temp_max': 'miner.psu.temp_max',
+            'outage': 'miner.outage'
+        }[c])
+        expected, _ = format_csv_for_llm(renamed)
+        
+        assert result == expected
+        assert csv_warnings == []
+        assert result.splitlines()[1] == '-60,1000,998,65.2,45.7,0'
+    
+    def test_fast_nan_values_written_blank(self, standardized_dataframe):
+        """Should fall back to blank cells for NaN readings."""
+        standardized_dataframe.loc[2, 'summary_wattage'] = np.nan
+        
+        result, _ = format_csv_for_llm_fast(standardized_dataframe)
+        
+        assert result.splitlines()[3] == '0,3500,,65.9,46.2,0'
+    
+    def test_fast_downsamples_to_budget(self):
+        """Should downsample oversized data, keeping the transition window."""
+        n = 10000
+        df = pd.DataFrame({
+            'seconds': np.arange(-300, n - 300, dtype=float),
+            'mode_power': np.full(n, 3500.0),
+            'summary_wattage': np.full(n, 3480.0),
+            'temp_hash_board_max': np.full(n, 65.0),
+            'psu_temp_max': np.full(n, 45.0),
+            'outage': np.zeros(n, dtype=bool)
+        })
+        
+        result, csv_warnings = format_csv_for_llm_fast(df, max_tokens=1000)
+        
+        parsed = pd.read_csv(StringIO(result))
+        assert estimate_token_count(result) <= 1000
+        assert (parsed['miner.seconds'].abs() <= 60).sum() == 121
+        assert len(csv_warnings) == 1
+    
+    def test_fast_missing_columns(self, standardized_dataframe):
+        """Should raise ValueError when standardized columns are missing."""
+        with pytest.raises(ValueError, match="Missing required columns"):
+            format_csv_for_llm_fast(standardized_dataframe.drop(columns=['outage']))
+
+
 class TestEstimateTokenCount:
     """Test suite for token estimation."""
     
@@ -208,6 +341,16 @@ class TestValidateCSVFormat:
         
         with pytest.raises(ValueError, match="Invalid CSV format"):
             validate_csv_format(malformed)
+    
+    def test_validate_header_only(self):
+        """Should reject CSV with a header but no data rows."""
+        with pytest.raises(ValueError, match="Invalid CSV format"):
+            validate_csv_format("col1,col2\n")
+    
+    def test_validate_single_column_and_quoted_header(self):
+        """Should accept CSVs that need the row-level fallback."""
+        assert validate_csv_format("col1\nval1") is True
+        assert validate_csv_format('"col\n1",col2\nval1,val2') is True
 
 
 class TestExtractTestInfo:
@@ -326,6 +469,24 @@ class TestFormatPowerRange:
         result = format_power_range(df)
         assert result == "3500W → 1000W"
     
+    def test_format_uses_most_common_value(self):
+        """Should pick the most common setting, smallest on ties."""
+        df = pd.DataFrame({
+            'miner.seconds': [-90, -60, -30, 30, 60, 90, 120],
+            'miner.mode.power': [1000, 1000, 1200, 3500, 3400, 3400, 3500]
+        })
+        
+        assert format_power_range(df) == "1000W → 3400W"
+    
+    def test_format_non_integer_power(self):
+        """Should handle fractional and NaN power settings."""
+        df = pd.DataFrame({
+            'miner.seconds': [-60, -30, 0, 30, 60],
+            'miner.mode.power': [999.5, 999.5, float('nan'), 3500.25, float('nan')]
+        })
+        
+        assert format_power_range(df) == "1000W → 3500W"
+    
     def test_format_missing_column(self):
         """Should raise ValueError if power column missing."""
         df = pd.DataFrame({'miner.seconds': [1, 2, 3]})
@@ -353,6 +514,21 @@ class TestBuildPrompt:
         assert "r2_39" in result
         assert "UP-STEP" in result
         assert csv_content in result
+    
+    def test_build_prompt_blocks_marks_static_prefix_cacheable(self):
+        """Should return content blocks with cache_control on the preamble."""
+        csv_content = "col1,col2\n1,2"
+        
+        blocks = build_prompt_blocks(
+            test_id="r2_39",
+            miner_number="39",
+            step_direction="UP-STEP",
+            power_range="1000W → 3500W",
+            csv_content=csv_content
+        )
+        
+        assert blocks[0]['cache_control'] == {'type': 'ephemeral'}
+        assert csv_content in blocks[1]['text']
 
 
 class TestGetAnalysis:
@@ -380,7 +556,9 @@ class TestGetAnalysis:
             mock_response.usage = MagicMock(input_tokens=1000, output_tokens=200)
             mock_response.model = "claude-sonnet-4-20250514"
             mock_response.stop_reason = "end_turn"
-            mock_client.return_value.messages.create.return_value = mock_response
+            mock_stream = mock_client.return_value.messages.stream.return_value.__enter__.return_value
+            mock_stream.text_stream = [mock_response.content[0].text]
+            mock_stream.get_final_message.return_value = mock_response
             
             result = get_analysis("test prompt")
             
@@ -391,6 +569,297 @@ class TestGetAnalysis:
             assert result['tokens_used']['total'] == 1200
             assert result['model'] == "claude-sonnet-4-20250514"
             assert result['stop_reason'] == "end_turn"
+    
+    def test_get_analysis_reports_cache_usage(self, monkeypatch):
+        """Should pass content blocks through and report cache token counts."""
+        from unittest.mock import patch, MagicMock
+        
+        monkeypatch.setenv('ANTHROPIC_API_KEY', 'sk-ant-test-key-123')
+        blocks = [
+            {'type': 'text', 'text': 'static', 'cache_control': {'type': 'ephemeral'}},
+            {'type': 'text', 'text': 'dynamic'}
+        ]
+        
+        with patch('src.analysis.claude_client.anthropic.Anthropic') as mock_client:
+            mock_response = MagicMock()
+            mock_response.content = [MagicMock(text="Narrative")]
+            mock_response.usage = MagicMock(
+                input_tokens=300,
+                output_tokens=100,
+                cache_read_input_tokens=1200,
+                cache_creation_input_tokens=0
+            )
+            mock_stream_call = mock_client.return_value.messages.stream
+            mock_stream = mock_stream_call.return_value.__enter__.return_value
+            mock_stream.text_stream = ["Narrative"]
+            mock_stream.get_final_message.return_value = mock_response
+            
+            result = get_analysis(blocks)
+            
+            sent = mock_stream_call.call_args.kwargs['messages'][0]['content']
+            assert sent == blocks
+            assert result['tokens_used']['cache_read'] == 1200
+            assert result['tokens_used']['cache_creation'] == 0
+    
+    def test_get_analysis_joins_streamed_chunks(self, monkeypatch):
+        """Should assemble the narrative from streamed text chunks."""
+        from unittest.mock import patch, MagicMock
+        
+        monkeypatch.setenv('ANTHROPIC_API_KEY', 'sk-ant-test-key-123')
+        
+        with patch('src.analysis.claude_client.anthropic.Anthropic') as mock_client:
+            mock_response = MagicMock()
+            mock_response.usage = MagicMock(input_tokens=10, output_tokens=3)
+            mock_stream = mock_client.return_value.messages.stream.return_value.__enter__.return_value
+            mock_stream.text_stream = ["Power ", "ramped ", "up."]
+            mock_stream.get_final_message.return_value = mock_response
+            
+            result = get_analysis("test prompt")
+            
+            assert result['analysis'] == "Power ramped up."
+    
+    def test_get_analysis_reuses_client(self, monkeypatch):
+        """Should construct one client for repeated calls with the same config."""
+        from unittest.mock import patch, MagicMock
+        
+        monkeypatch.setenv('ANTHROPIC_API_KEY', 'sk-ant-test-key-123')
+        
+        with patch('src.analysis.claude_client.anthropic.Anthropic') as mock_client:
+            mock_response = MagicMock()
+            mock_response.usage = MagicMock(input_tokens=10, output_tokens=3)
+            mock_stream = mock_client.return_value.messages.stream.return_value.__enter__.return_value
+            mock_stream.get_final_message.return_value = mock_response
+            
+            for _ in range(3):
+                mock_stream.text_stream = ["ok"]
+                get_analysis("test prompt")
+            
+            mock_client.assert_called_once()
+    
+    def test_get_analysis_stall_timeout_is_read_timeout(self, monkeypatch):
+        """Should pass stall_timeout to the stream as its read timeout."""
+        from unittest.mock import patch, MagicMock
+        
+        monkeypatch.setenv('ANTHROPIC_API_KEY', 'sk-ant-test-key-123')
+        
+        with patch('src.analysis.claude_client.anthropic.Anthropic') as mock_client:
+            mock_response = MagicMock()
+            mock_response.usage = MagicMock(input_tokens=10, output_tokens=3)
+            mock_stream_call = mock_client.return_value.messages.stream
+            mock_stream = mock_stream_call.return_value.__enter__.return_value
+            mock_stream.text_stream = ["ok"]
+            mock_stream.get_final_message.return_value = mock_response
+            
+            get_analysis("test prompt", timeout=60, stall_timeout=15)
+            
+            request_timeout = mock_stream_call.call_args.kwargs['timeout']
+            assert request_timeout.read == 15
+            assert request_timeout.connect == 60
+    
+    def test_get_analysis_stalled_stream_times_out(self, monkeypatch):
+        """Should raise TimeoutError when the stream read timeout fires."""
+        from unittest.mock import patch, MagicMock
+        import anthropic
+        
+        monkeypatch.setenv('ANTHROPIC_API_KEY', 'sk-ant-test-key-123')
+        
+        def stalled_stream():
+            yield "first "
+            raise anthropic.APITimeoutError(request=MagicMock())
+        
+        with patch('src.analysis.claude_client.anthropic.Anthropic') as mock_client:
+            mock_stream = mock_client.return_value.messages.stream.return_value.__enter__.return_value
+            mock_stream.text_stream = stalled_stream()
+            
+            with pytest.raises(TimeoutError, match="stalled"):
+                get_analysis("test prompt")
+    
+    def test_get_analysis_caches_response_on_disk(self, monkeypatch, tmp_path):
+        """Should reuse a cached response for an identical prompt."""
+        from unittest.mock import patch, MagicMock
+        
+        monkeypatch.setenv('ANTHROPIC_API_KEY', 'sk-ant-test-key-123')
+        
+        with patch('src.analysis.claude_client.anthropic.Anthropic') as mock_client:
+            mock_response = MagicMock()
+            mock_response.usage = MagicMock(input_tokens=1000, output_tokens=200)
+            mock_response.model = "claude-sonnet-4-20250514"
+            mock_response.stop_reason = "end_turn"
+            mock_stream = mock_client.return_value.messages.stream.return_value.__enter__.return_value
+            mock_stream.text_stream = ["Cached narrative."]
+            mock_stream.get_final_message.return_value = mock_response
+            
+            first = get_analysis("test prompt", cache_dir=tmp_path)
+            
+            # A cache hit needs neither the API nor a key
+            monkeypatch.delenv('ANTHROPIC_API_KEY')
+            second = get_analysis("test prompt", cache_dir=tmp_path)
+        
+        assert second == first
+        assert mock_client.return_value.messages.stream.call_count == 1
+        assert len(list(tmp_path.glob('*.json'))) == 1
+    
+    def test_get_analysis_cache_key_includes_prompt(self, tmp_path):
+        """Should store different prompts under different cache entries."""
+        from src.analysis.claude_client import _response_cache_path
+        
+        model = "claude-sonnet-4-20250514"
+        path_a = _response_cache_path(tmp_path, "prompt a", model, 2000)
+        path_b = _response_cache_path(tmp_path, "prompt b", model, 2000)
+        path_blocks = _response_cache_path(tmp_path, [{'type': 'text', 'text': 'prompt a'}], model, 2000)
+        
+        assert len({path_a, path_b, path_blocks}) == 3
+        assert path_a == _response_cache_path(tmp_path, "prompt a", model, 2000)
+    
+    def test_get_analysis_does_not_cache_truncated_response(self, monkeypatch, tmp_path):
+        """Should not cache a response cut off at max_tokens."""
+        from unittest.mock import patch, MagicMock
+        
+        monkeypatch.setenv('ANTHROPIC_API_KEY', 'sk-ant-test-key-123')
+        
+        with patch('src.analysis.claude_client.anthropic.Anthropic') as mock_client:
+            mock_response = MagicMock()
+            mock_response.usage = MagicMock(input_tokens=1000, output_tokens=2000)
+            mock_response.model = "claude-sonnet-4-20250514"
+            mock_response.stop_reason = "max_tokens"
+            mock_stream = mock_client.return_value.messages.stream.return_value.__enter__.return_value
+            mock_stream.text_stream = ["Truncated narr"]
+            mock_stream.get_final_message.return_value = mock_response
+            
+            result = get_analysis("test prompt", cache_dir=tmp_path)
+        
+        assert result['stop_reason'] == "max_tokens"
+        assert list(tmp_path.iterdir()) == []
+    
+    def test_write_cached_response_leaves_no_temp_files(self, tmp_path):
+        """Should write through a unique temp file and rename it into place."""
+        from src.analysis.claude_client import _read_cached_response, _write_cached_response
+        
+        path = tmp_path / 'cache' / 'entry.json'
+        _write_cached_response(path, {'analysis': 'first'})
+        _write_cached_response(path, {'analysis': 'second'})
+        
+        assert _read_cached_response(path) == {'analysis': 'second'}
+        assert [p.name for p in path.parent.iterdir()] == ['entry.json']
+
+
+class TestGetAnalysisBatch:
+    """Test suite for Message Batches API analysis."""
+    
+    @staticmethod
+    def _succeeded(custom_id, text):
+        from unittest.mock import MagicMock
+        
+        entry = MagicMock()
+        entry.custom_id = custom_id
+        entry.result.type = 'succeeded'
+        entry.result.message.content = [MagicMock(type='text', text=text)]
+        entry.result.message.usage = MagicMock(
+            input_tokens=100,
+            output_tokens=20,
+            cache_read_input_tokens=0,
+            cache_creation_input_tokens=0
+        )
+        entry.result.message.model = "claude-sonnet-4-20250514"
+        entry.result.message.stop_reason = "end_turn"
+        return entry
+    
+    def test_batch_checks_api_key(self, monkeypatch):
+        """Should raise ValueError when API key is missing."""
+        monkeypatch.delenv('ANTHROPIC_API_KEY', raising=False)
+        
+        with pytest.raises(ValueError, match="ANTHROPIC_API_KEY"):
+            get_analysis_batch([{'test_id': 'a', 'prompt': 'p'}])
+    
+    def test_batch_results_follow_input_order(self, monkeypatch):
+        """Should map out-of-order results back to their prompts."""
+        from unittest.mock import patch, MagicMock
+        
+        monkeypatch.setenv('ANTHROPIC_API_KEY', 'sk-ant-test-key-123')
+        
+        with patch('src.analysis.claude_client.anthropic.Anthropic') as mock_client:
+            batches = mock_client.return_value.messages.batches
+            batches.create.return_value = MagicMock(id='batch_1', processing_status='ended')
+            batches.results.return_value = [
+                self._succeeded('prompt-1', 'second'),
+                self._succeeded('prompt-0', 'first'),
+            ]
+            
+            results = get_analysis_batch([
+                {'test_id': 'r1', 'prompt': 'p1'},
+                {'test_id': 'r2', 'prompt': 'p2'},
+            ])
+        
+        assert [r['test_id'] for r in results] == ['r1', 'r2']
+        assert [r['analysis'] for r in results] == ['first', 'second']
+        assert results[0]['tokens_used']['total'] == 120
+        
+        sent = batches.create.call_args.kwargs['requests']
+        assert [r['custom_id'] for r in sent] == ['prompt-0', 'prompt-1']
+    
+    def test_batch_reports_failed_and_missing_requests(self, monkeypatch):
+        """Should return error entries instead of raising for single requests."""
+        from unittest.mock import patch, MagicMock
+        
+        monkeypatch.setenv('ANTHROPIC_API_KEY', 'sk-ant-test-key-123')
+        
+        errored = MagicMock()
+        errored.custom_id = 'prompt-0'
+        errored.result.type = 'errored'
+        
+        with patch('src.analysis.claude_client.anthropic.Anthropic') as mock_client:
+            batches = mock_client.return_value.messages.batches
+            batches.create.return_value = MagicMock(id='batch_1', processing_status='ended')
+            batches.results.return_value = [errored]
+            
+            results = get_analysis_batch([
+                {'test_id': 'r1', 'prompt': 'p1'},
+                {'test_id': 'r2', 'prompt': 'p2'},
+            ])
+        
+        assert 'errored' in results[0]['error']
+        assert results[1]['test_id'] == 'r2'
+        assert 'error' in results[1]
+    
+    def test_batch_polls_until_ended(self, monkeypatch):
+        """Should poll the batch status until processing has ended."""
+        from unittest.mock import patch, MagicMock
+        
+        monkeypatch.setenv('ANTHROPIC_API_KEY', 'sk-ant-test-key-123')
+        
+        with patch('src.analysis.claude_client.anthropic.Anthropic') as mock_client, \
+                patch('src.analysis.claude_client.time.sleep') as mock_sleep:
+            batches = mock_client.return_value.messages.batches
+            batches.create.return_value = MagicMock(id='batch_1', processing_status='in_progress')
+            batches.retrieve.side_effect = [
+                MagicMock(id='batch_1', processing_status='in_progress'),
+                MagicMock(id='batch_1', processing_status='ended'),
+            ]
+            batches.results.return_value = [self._succeeded('prompt-0', 'done')]
+            
+            results = get_analysis_batch([{'test_id': 'r1', 'prompt': 'p1'}], poll_interval=5)
+        
+        assert results[0]['analysis'] == 'done'
+        assert batches.retrieve.call_count == 2
+        mock_sleep.assert_called_with(5)
+    
+    def test_batch_cancelled_after_max_wait(self, monkeypatch):
+        """Should cancel an unfinished batch and raise TimeoutError at max_wait."""
+        from unittest.mock import patch, MagicMock
+        
+        monkeypatch.setenv('ANTHROPIC_API_KEY', 'sk-ant-test-key-123')
+        
+        with patch('src.analysis.claude_client.anthropic.Anthropic') as mock_client, \
+                patch('src.analysis.claude_client.time.sleep'), \
+                patch('src.analysis.claude_client.time.monotonic', side_effect=[0.0, 5.0, 20.0]):
+            batches = mock_client.return_value.messages.batches
+            batches.create.return_value = MagicMock(id='batch_1', processing_status='in_progress')
+            batches.retrieve.return_value = MagicMock(id='batch_1', processing_status='in_progress')
+            
+            with pytest.raises(TimeoutError, match="did not finish"):
+                get_analysis_batch([{'test_id': 'r1', 'prompt': 'p1'}], max_wait=10)
+        
+        batches.cancel.assert_called_once_with('batch_1')
 
 
 class TestRealDataIntegration:
@@ -407,14 +876,14 @@ class TestRealDataIntegration:
             pytest.skip(f"Real CSV not found: {real_csv_path}")
         
         df = pd.read_csv(real_csv_path)
-        result = format_csv_for_llm(df)
+        result, _ = format_csv_for_llm(df)
         
         # Should be valid CSV
         assert validate_csv_format(result)
         
-        # Should be within reasonable token range
+        # Should be within reasonable token range (unused columns dropped)
         tokens = estimate_token_count(result)
-        assert 10000 <= tokens <= 20000
+        assert 8000 <= tokens <= 20000
     
     def test_extract_info_from_real_file(self, real_csv_path):
         """Should extract info from real filename."""
@@ -454,7 +923,7 @@ class TestRealDataIntegration:
         power_range = format_power_range(df)
         
         # Format CSV
-        csv_content = format_csv_for_llm(df)
+        csv_content, _ = format_csv_for_llm(df)
         
         # Build prompt
         prompt = build_prompt(
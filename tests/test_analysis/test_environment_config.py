@@ -41,7 +41,9 @@ class TestAPIKeyValidation:
             mock_response.usage = MagicMock(input_tokens=100, output_tokens=50)
             mock_response.model = "claude-sonnet-4"
             mock_response.stop_reason = "end_turn"
-            mock_client.return_value.messages.create.return_value = mock_response
+            mock_stream = mock_client.return_value.messages.stream.return_value.__enter__.return_value
+            mock_stream.text_stream = [mock_response.content[0].text]
+            mock_stream.get_final_message.return_value = mock_response
             
             result = get_analysis("test prompt")
             assert isinstance(result, dict)
@@ -119,7 +121,9 @@ class TestConfigurationSecurity:
             mock_response.usage = MagicMock(input_tokens=100, output_tokens=50)
             mock_response.model = "claude-sonnet-4"
             mock_response.stop_reason = "end_turn"
-            mock_client.return_value.messages.create.return_value = mock_response
+            mock_stream = mock_client.return_value.messages.stream.return_value.__enter__.return_value
+            mock_stream.text_stream = [mock_response.content[0].text]
+            mock_stream.get_final_message.return_value = mock_response
             
             try:
                 get_analysis("test")
@@ -180,7 +184,9 @@ class TestConfigurationDefaults:
             mock_response.usage = MagicMock(input_tokens=100, output_tokens=50)
             mock_response.model = "claude-3-opus-20240229"
             mock_response.stop_reason = "end_turn"
-            mock_client.return_value.messages.create.return_value = mock_response
+            mock_stream = mock_client.return_value.messages.stream.return_value.__enter__.return_value
+            mock_stream.text_stream = [mock_response.content[0].text]
+            mock_stream.get_final_message.return_value = mock_response
             
             result = get_analysis("test", model="claude-3-opus-20240229")
             assert result['model'] == "claude-3-opus-20240229"
@@ -199,7 +205,9 @@ class TestConfigurationDefaults:
             mock_response.usage = MagicMock(input_tokens=100, output_tokens=50)
             mock_response.model = "claude-sonnet-4"
             mock_response.stop_reason = "end_turn"
-            mock_client.return_value.messages.create.return_value = mock_response
+            mock_stream = mock_client.return_value.messages.stream.return_value.__enter__.return_value
+            mock_stream.text_stream = [mock_response.content[0].text]
+            mock_stream.get_final_message.return_value = mock_response
             
             result = get_analysis("test", timeout=120)
             
@@ -9,12 +9,14 @@ Tests cover:
 """
 
 import pytest
-import warnings
+import logging
 from src.analysis.prompt_template import (
     ANALYSIS_PROMPT_TEMPLATE,
+    STATIC_PREAMBLE,
     get_required_placeholders,
     validate_template,
-    format_prompt
+    format_prompt,
+    format_prompt_blocks
 )
 
 
@@ -70,6 +72,18 @@ class TestFormatPrompt:
 30,3500,2800
 60,3500,3480"""
     
+    def test_format_prompt_matches_str_format(self, sample_csv_content):
+        """Pre-split rendering should match str.format, even with braces in data."""
+        values = dict(
+            test_id="r2_39",
+            miner_number="39",
+            step_direction="UP-STEP",
+            power_range="1000W → 3500W",
+            csv_content=sample_csv_content + "\n{not_a_field}"
+        )
+        
+        assert format_prompt(**values) == ANALYSIS_PROMPT_TEMPLATE.format(**values)
+    
     def test_format_prompt_upstep(self, sample_csv_content):
         """Should format prompt correctly for UP-STEP scenario."""
         result = format_prompt(
@@ -127,11 +141,9 @@ class TestFormatPrompt:
         
         assert "1000W -> 3500W" in result
     
-    def test_format_prompt_warns_on_malformed_power_range(self, sample_csv_content):
-        """Should warn if power_range doesn't contain arrow."""
-        with warnings.catch_warnings(record=True) as w:
-            warnings.simplefilter("always")
-            
+    def test_format_prompt_warns_on_malformed_power_range(self, sample_csv_content, caplog):
+        """Should log a warning if power_range doesn't contain arrow."""
+        with caplog.at_level(logging.WARNING, logger='src.analysis.prompt_template'):
             format_prompt(
                 test_id="r2_39",
                 miner_number="39",
@@ -139,10 +151,10 @@ class TestFormatPrompt:
                 power_range="1000W to 3500W",  # No arrow
                 csv_content=sample_csv_content
             )
-            
-            assert len(w) == 1
-            assert "power_range" in str(w[0].message).lower()
-            assert "format" in str(w[0].message).lower()
+        
+        assert len(caplog.records) == 1
+        assert "power_range" in caplog.records[0].getMessage().lower()
+        assert "format" in caplog.records[0].getMessage().lower()
     
     def test_format_prompt_empty_csv(self):
         """Should handle empty CSV content gracefully."""
@@ -188,6 +200,63 @@ class TestFormatPrompt:
         assert "1,000W → 3,500W" in result
 
 
+class TestFormatPromptBlocks:
+    """Test suite for cache-friendly content block formatting."""
+    
+    def test_static_preamble_has_no_placeholders(self):
+        """Static preamble must be identical across tests to be cacheable."""
+        assert "{" not in STATIC_PREAMBLE
+        assert "}" not in STATIC_PREAMBLE
+    
+    def test_static_preamble_meets_cache_minimum(self):
+        """Preamble must exceed the 1,024-token minimum or it is never cached."""
+        # ~4 characters per token, the same estimate used for the CSV budget
+        estimated_tokens = len(STATIC_PREAMBLE) // 4
+        
+        assert estimated_tokens >= 1024
+    
+    def test_blocks_structure(self):
+        """Should return cached preamble block followed by dynamic block."""
+        blocks = format_prompt_blocks(
+            test_id="r2_39",
+            miner_number="39",
+            step_direction="UP-STEP",
+            power_range="1000W → 3500W",
+            csv_content="col1,col2\n1,2"
+        )
+        
+        assert len(blocks) == 2
+        assert blocks[0]['text'] == STATIC_PREAMBLE
+        assert blocks[0]['cache_control'] == {'type': 'ephemeral'}
+        assert 'cache_control' not in blocks[1]
+        assert "r2_39" in blocks[1]['text']
+        assert "col1,col2\n1,2" in blocks[1]['text']
+    
+    def test_blocks_match_flat_prompt(self):
+        """Joined blocks should equal the flat prompt text."""
+        kwargs = dict(
+            test_id="r2_39",
+            miner_number="39",
+            step_direction="DOWN-STEP",
+            power_range="3500W → 1000W",
+            csv_content="a,b\n1,2"
+        )
+        blocks = format_prompt_blocks(**kwargs)
+        
+        assert "\n\n".join(b['text'] for b in blocks) == format_prompt(**kwargs)
+    
+    def test_blocks_invalid_step_direction(self):
+        """Should raise ValueError for invalid step_direction."""
+        with pytest.raises(ValueError, match="Invalid step_direction"):
+            format_prompt_blocks(
+                test_id="r2_39",
+                miner_number="39",
+                step_direction="SIDE-STEP",
+                power_range="1000W → 3500W",
+                csv_content=""
+            )
+
+
 class TestPromptQuality:
     """Test suite for prompt quality and completeness."""
     
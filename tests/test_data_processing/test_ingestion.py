@@ -4,16 +4,19 @@ import pandas as pd
 import numpy as np
 from pathlib import Path
 import sys
+from unittest.mock import patch
 
 # Add src to path for imports
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root / "src"))
 
+import data_processing.ingestion as ingestion_module
 from data_processing.ingestion import (
     DataIngestion,
     MissingColumnsError,
     DataValidationError,
-    FileFormatError
+    FileFormatError,
+    load_many
 )
 
 
@@ -140,6 +143,19 @@ class TestDataIngestionErrors:
             ingestion.load_csv(no_action_file)
         
         assert "action time" in str(exc_info.value).lower()
+    
+    def test_no_action_time_with_nan_seconds(self, ingestion, tmp_path):
+        """Test that unparseable times sorted last are not taken as the action"""
+        csv_content = """miner.seconds,miner.mode.power,miner.summary.wattage,miner.temp.hash_board_max,miner.psu.temp_max,miner.outage
+-60.0,3600,3550.5,65.2,45.3,false
+bad,3600,3575.2,66.1,46.0,false
+-40.0,3600,3562.8,65.8,45.8,false"""
+        
+        nan_time_file = tmp_path / "nan_time.csv"
+        nan_time_file.write_text(csv_content)
+        
+        with pytest.raises(DataValidationError, match="No action time found"):
+            ingestion.load_csv(nan_time_file)
 
 
 class TestDataIngestionTypeConversion:
@@ -168,6 +184,23 @@ class TestDataIngestionTypeConversion:
         # Should handle 0/1 representations
         assert df['outage'].isin([True, False]).all()
     
+    def test_mixed_boolean_representations(self, ingestion, tmp_path):
+        """Test mixed text/numeric outage values map to the right booleans"""
+        csv_content = """miner.seconds,miner.mode.power,miner.summary.wattage,miner.temp.hash_board_max,miner.psu.temp_max,miner.outage
+-20.0,3600,3550.5,65.2,45.3,TRUE
+-10.0,3600,3575.2,66.1,46.0,0
+0.0,1000,3598.2,67.8,47.2,
+10.0,1000,2850.5,68.0,48.5,false
+20.0,1000,1525.3,66.5,47.0,yes"""
+        
+        mixed_file = tmp_path / "mixed_outage.csv"
+        mixed_file.write_text(csv_content)
+        
+        df, action_idx, warnings = ingestion.load_csv(mixed_file)
+        
+        assert df['outage'].dtype == 'bool'
+        assert df['outage'].tolist() == [True, False, False, False, True]
+    
     def test_nan_handling(self, ingestion, fixtures_dir):
         """Test that NaN values are preserved appropriately"""
         filepath = fixtures_dir / "with_nan_values.csv"
@@ -196,6 +229,20 @@ class TestDataIngestionColumnValidation:
         assert 'mode_power' in df.columns
         assert 'summary_wattage' in df.columns
     
+    def test_unused_columns_not_loaded(self, ingestion, tmp_path):
+        """Test that columns outside REQUIRED_COLUMNS are skipped at parse time"""
+        csv_content = """miner.seconds,miner.mode.power,miner.summary.wattage,miner.temp.hash_board_max,miner.psu.temp_max,miner.outage,miner.collection.summary_error
+-10.0,3600,3575.2,66.1,46.0,false,
+0.0,1000,3598.2,67.8,47.2,false,
+10.0,1000,2850.5,68.0,48.5,false,"""
+        
+        wide_file = tmp_path / "wide.csv"
+        wide_file.write_text(csv_content)
+        
+        df, action_idx, warnings = ingestion.load_csv(wide_file)
+        
+        assert list(df.columns) == ingestion.STANDARD_COLUMNS
+    
     def test_all_required_columns_validated(self, ingestion):
         """Test that all required columns are checked"""
         required = ingestion.REQUIRED_COLUMNS
@@ -236,3 +283,131 @@ class TestDataIngestionSorting:
         # Last row should have most positive time
         assert df.iloc[-1]['seconds'] == 20.0
 
+
+
+class TestDataIngestionChunked:
+    """Test chunked loading for large CSV files"""
+    
+    def test_chunks_cover_all_rows(self, ingestion, fixtures_dir):
+        """Test that chunked loading yields every row, standardized"""
+        filepath = fixtures_dir / "r2_39_2025-08-28T09_40_10.csv"
+        full_df, _, _ = DataIngestion().load_csv(filepath)
+        
+        chunks = list(ingestion.load_csv_chunked(filepath, chunksize=100))
+        
+        assert len(chunks) > 1
+        assert sum(len(c) for c in chunks) == len(full_df)
+        assert all(list(c.columns) == ingestion.STANDARD_COLUMNS for c in chunks)
+        assert all(c['outage'].dtype == 'bool' for c in chunks)
+    
+    def test_chunked_missing_columns(self, ingestion, fixtures_dir):
+        """Test that missing columns are reported on the first chunk"""
+        filepath = fixtures_dir / "missing_columns.csv"
+        
+        with pytest.raises(MissingColumnsError):
+            next(ingestion.load_csv_chunked(filepath))
+    
+    def test_find_action_chunk_matches_full_load(self, ingestion, fixtures_dir):
+        """Test that the action window locates the same action row"""
+        filepath = fixtures_dir / "r2_39_2025-08-28T09_40_10.csv"
+        full_df, full_idx, _ = DataIngestion().load_csv(filepath)
+        
+        df, action_idx = ingestion.find_action_chunk(
+            filepath, chunksize=100, lookback_chunks=1, lookahead_chunks=1
+        )
+        
+        assert len(df) < len(full_df)
+        assert df.at[action_idx, 'seconds'] == full_df.at[full_idx, 'seconds']
+        assert df.at[action_idx - 1, 'seconds'] < 0
+    
+    def test_find_action_chunk_no_action(self, ingestion, tmp_path):
+        """Test error when no row reaches t >= 0"""
+        csv_content = """miner.seconds,miner.mode.power,miner.summary.wattage,miner.temp.hash_board_max,miner.psu.temp_max,miner.outage
+-20.0,3600,3550.5,65.2,45.3,false
+-10.0,3600,3575.2,66.1,46.0,false"""
+        
+        pre_only = tmp_path / "pre_only.csv"
+        pre_only.write_text(csv_content)
+        
+        with pytest.raises(DataValidationError, match="No action time found"):
+            ingestion.find_action_chunk(pre_only, chunksize=1)
+
+
+class TestLoadMany:
+    """Test parallel multi-file loading"""
+    
+    def test_load_many_matches_sequential(self, fixtures_dir):
+        """Test that pooled results match load_csv and keep input order"""
+        paths = [
+            fixtures_dir / "r2_39_2025-08-28T09_40_10.csv",
+            fixtures_dir / "r6_39_2025-08-27T19_19_13.csv",
+        ]
+        
+        results = load_many(paths, workers=2)
+        
+        assert len(results) == 2
+        for path, (df, action_idx, warnings) in zip(paths, results):
+            expected_df, expected_idx, expected_warnings = DataIngestion().load_csv(path)
+            pd.testing.assert_frame_equal(df, expected_df)
+            assert action_idx == expected_idx
+            assert warnings == expected_warnings
+    
+    def test_load_many_empty(self):
+        """Test that no paths gives no results"""
+        assert load_many([]) == []
+    
+    def test_load_many_propagates_errors(self, fixtures_dir):
+        """Test that a failing file raises the ingestion error"""
+        with pytest.raises(MissingColumnsError):
+            load_many([fixtures_dir / "missing_columns.csv"], workers=1)
+
+
+class TestParquetCache:
+    """Test the optional Parquet side-cache"""
+    
+    @pytest.fixture
+    def csv_copy(self, fixtures_dir, tmp_path):
+        """Copy a fixture CSV so the cache is written to a temp dir"""
+        target = tmp_path / "r2_39_2025-08-28T09_40_10.csv"
+        target.write_bytes((fixtures_dir / target.name).read_bytes())
+        return target
+    
+    def test_cache_round_trip(self, csv_copy):
+        """Test that a cached load matches the fresh load"""
+        pytest.importorskip("pyarrow")
+        
+        fresh_df, fresh_idx, fresh_warnings = DataIngestion(use_parquet_cache=True).load_csv(csv_copy)
+        assert csv_copy.with_suffix('.parquet').exists()
+        
+        with patch.object(pd, 'read_csv', side_effect=AssertionError("CSV re-parsed")):
+            cached_df, cached_idx, cached_warnings = DataIngestion(use_parquet_cache=True).load_csv(csv_copy)
+        
+        pd.testing.assert_frame_equal(cached_df, fresh_df)
+        assert cached_idx == fresh_idx
+        assert cached_warnings == fresh_warnings
+    
+    def test_stale_cache_is_ignored(self, csv_copy):
+        """Test that a CSV newer than its cache is parsed again"""
+        pytest.importorskip("pyarrow")
+        import os
+        
+        DataIngestion(use_parquet_cache=True).load_csv(csv_copy)
+        cache_path = csv_copy.with_suffix('.parquet')
+        cache_mtime = cache_path.stat().st_mtime
+        os.utime(csv_copy, (cache_mtime + 10, cache_mtime + 10))
+        
+        with patch.object(pd, 'read_csv', wraps=pd.read_csv) as mock_read:
+            DataIngestion(use_parquet_cache=True).load_csv(csv_copy)
+        
+        assert mock_read.call_count == 1
+    
+    def test_cache_disabled_without_pyarrow(self, csv_copy, monkeypatch):
+        """Test that loading works and writes nothing when pyarrow is missing"""
+        monkeypatch.setattr(ingestion_module, 'pq', None)
+        
+        ingestion = DataIngestion(use_parquet_cache=True)
+        df, _, _ = ingestion.load_csv(csv_copy)
+        
+        assert ingestion.use_parquet_cache is False
+        assert len(df) > 0
+        assert not csv_copy.with_suffix('.parquet').exists()
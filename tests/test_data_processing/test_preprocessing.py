@@ -2,14 +2,12 @@
 import pytest
 import pandas as pd
 import numpy as np
-import sys
-from pathlib import Path
 
-# Add src to path for imports
-project_root = Path(__file__).parent.parent.parent
-sys.path.insert(0, str(project_root / "src"))
-
-from data_processing.preprocessing import DataPreprocessor
+# Imported by its package path only: numba's on-disk kernel cache records the
+# module name, so importing this module under a second name breaks cache loads
+from src.data_processing.preprocessing import (
+    DataPreprocessor, _scan_time_gaps, _scan_time_gaps_numpy, post_action_arrays
+)
 
 
 # Fixtures
@@ -79,10 +77,16 @@ class TestDataPreprocessorInit:
         assert preprocessor.metadata['action_index'] == 3
         assert preprocessor.metadata['action_time'] == 0
     
-    def test_init_copies_dataframe(self, sample_normal_data):
-        """Test that DataFrame is copied, not referenced"""
+    def test_init_references_dataframe(self, sample_normal_data):
+        """Test that DataFrame is used by reference by default"""
         preprocessor = DataPreprocessor(sample_normal_data, action_idx=3)
         
+        assert preprocessor.df is sample_normal_data
+    
+    def test_init_copies_dataframe(self, sample_normal_data):
+        """Test that copy=True copies the DataFrame"""
+        preprocessor = DataPreprocessor(sample_normal_data, action_idx=3, copy=True)
+        
         # Modify preprocessor's df
         preprocessor.df.at[0, 'seconds'] = -999
         
@@ -121,6 +125,50 @@ class TestDataPreprocessorPreprocess:
         assert 'power_change' in metadata
         assert 'transition_direction' in metadata
 
+    def test_preprocess_arrow_backed_dataframe(self, sample_data_with_nan):
+        """Test that Arrow-backed frames give the same metadata as NumPy-backed ones"""
+        pytest.importorskip("pyarrow")
+        df = sample_data_with_nan.copy()
+        df.loc[3, 'outage'] = True
+        arrow_df = df.convert_dtypes(dtype_backend='pyarrow')
+
+        _, expected = DataPreprocessor(df, action_idx=2).preprocess()
+        preprocessor = DataPreprocessor(arrow_df, action_idx=2)
+        _, metadata = preprocessor.preprocess()
+
+        for key in ('summary_wattage_nan_count', 'wattage_nan_segments', 'outage_count',
+                    'max_time_gap', 'pre_action_duration', 'post_action_duration',
+                    'target_power_before', 'target_power_after', 'transition_direction'):
+            assert metadata[key] == expected[key]
+        assert len(preprocessor.get_valid_wattage_data()) == 3
+
+
+class TestDataQualityAnalysis:
+    """Test per-column NaN and outage statistics"""
+    
+    def test_nan_counts_by_column_type(self):
+        """Test NaN counting across float, object and integer columns"""
+        df = pd.DataFrame({
+            'seconds': [-10, 0, 10, 20],
+            'mode_power': [1000, 3500, 3500, 3500],
+            'summary_wattage': [1000.0, np.nan, np.nan, 3400.0],
+            'psu_temp_max': [40.0, 41.0, np.nan, 42.0],
+            'note': ['a', None, 'b', 'c'],
+            'outage': [False, True, False, False]
+        })
+        
+        preprocessor = DataPreprocessor(df, action_idx=1)
+        _, metadata = preprocessor.preprocess()
+        
+        assert metadata['summary_wattage_nan_count'] == 2
+        assert metadata['summary_wattage_nan_pct'] == 50.0
+        assert metadata['psu_temp_max_nan_count'] == 1
+        assert metadata['note_nan_count'] == 1
+        assert 'seconds_nan_count' not in metadata
+        assert 'mode_power_nan_count' not in metadata
+        assert metadata['outage_count'] == 1
+        assert metadata['outage_pct'] == 25.0
+
 
 class TestNaNSegmentIdentification:
     """Test NaN segment detection"""
@@ -162,6 +210,22 @@ class TestNaNSegmentIdentification:
         segments = preprocessor.metadata['wattage_nan_segments']
         assert len(segments) == 1
         assert segments[0] == (2, 3)
+    
+    def test_nan_segment_at_start(self):
+        """Test NaN segment that begins at the first row"""
+        df = pd.DataFrame({
+            'seconds': [0, 10, 20, 30, 40],
+            'mode_power': [1000] * 5,
+            'summary_wattage': [None, None, 1000, None, 1005],
+            'outage': [False] * 5
+        })
+        
+        preprocessor = DataPreprocessor(df, action_idx=0)
+        preprocessor.preprocess()
+        
+        segments = preprocessor.metadata['wattage_nan_segments']
+        assert segments == [(0, 1), (3, 3)]
+        assert all(isinstance(i, int) for segment in segments for i in segment)
 
 
 class TestTimeGapDetection:
@@ -210,6 +274,49 @@ class TestTimeGapDetection:
         
         max_gap = preprocessor.metadata['max_time_gap']
         assert max_gap == 30.0  # Largest gap in sample data
+    
+    def test_single_row_has_no_gaps(self):
+        """Test that a single row records no gap and no gap index"""
+        df = pd.DataFrame({
+            'seconds': [0.0],
+            'mode_power': [1000],
+            'summary_wattage': [1000],
+            'outage': [False]
+        })
+        
+        preprocessor = DataPreprocessor(df, action_idx=0)
+        preprocessor.preprocess()
+        
+        assert np.isnan(preprocessor.metadata['max_time_gap'])
+        assert preprocessor.metadata['max_time_gap_at_index'] is None
+        assert preprocessor.metadata['large_time_gaps'] == []
+    
+    def test_gap_scan_matches_numpy(self):
+        """Test the gap scan kernel against np.diff, with NaN and tied gaps"""
+        seconds = np.array([0.0, 15.0, np.nan, 40.0, 55.0, 56.0, 71.0])
+        
+        max_gap, max_pos, positions, sizes = _scan_time_gaps(seconds, 10.0)
+        diffs = np.diff(seconds)
+        
+        assert max_gap == 15.0
+        assert max_pos == 0  # earliest of the tied 15s gaps
+        np.testing.assert_array_equal(positions, np.flatnonzero(diffs > 10.0))
+        np.testing.assert_array_equal(sizes, diffs[diffs > 10.0])
+        
+        python_scan = getattr(_scan_time_gaps, 'py_func', _scan_time_gaps)
+        expected = python_scan(seconds, 10.0)
+        assert (max_gap, max_pos) == expected[:2]
+        np.testing.assert_array_equal(positions, expected[2])
+        
+        fallback = _scan_time_gaps_numpy(seconds, 10.0)
+        assert (max_gap, max_pos) == fallback[:2]
+        np.testing.assert_array_equal(positions, fallback[2])
+        np.testing.assert_array_equal(sizes, fallback[3])
+        
+        # No valid gap at all
+        fallback = _scan_time_gaps_numpy(np.array([np.nan, np.nan]), 10.0)
+        assert np.isnan(fallback[0]) and fallback[1] == -1
+        assert len(fallback[2]) == 0
 
 
 class TestDurationCalculation:
@@ -354,6 +461,31 @@ class TestDataSegmentation:
         assert window['seconds'].min() == -30
         assert window['seconds'].max() == 30
     
+    def test_get_column_arrays(self, sample_normal_data):
+        """Test metric columns are exposed as NumPy arrays"""
+        preprocessor = DataPreprocessor(sample_normal_data, action_idx=3)
+        arrays = preprocessor.get_column_arrays()
+
+        for column in ('seconds', 'summary_wattage', 'mode_power',
+                       'psu_temp_max', 'temp_hash_board_max'):
+            values = getattr(arrays, column)
+            assert isinstance(values, np.ndarray)
+            np.testing.assert_array_equal(values, sample_normal_data[column].to_numpy())
+        assert not hasattr(arrays, 'outage')
+
+    def test_post_action_arrays(self, sample_normal_data):
+        """Test post-action arrays match the index >= action_idx rows, sorted or not"""
+        expected = sample_normal_data[sample_normal_data.index >= 3]
+        
+        seconds, wattage = post_action_arrays(sample_normal_data, 3)
+        np.testing.assert_array_equal(seconds, expected['seconds'].to_numpy())
+        np.testing.assert_array_equal(wattage, expected['summary_wattage'].to_numpy())
+        
+        shuffled = sample_normal_data.iloc[::-1]
+        seconds, wattage = post_action_arrays(shuffled, 3)
+        np.testing.assert_array_equal(seconds, expected['seconds'].to_numpy()[::-1])
+        np.testing.assert_array_equal(wattage, expected['summary_wattage'].to_numpy()[::-1])
+    
     def test_get_valid_wattage_data(self, sample_data_with_nan):
         """Test getting only valid wattage data"""
         preprocessor = DataPreprocessor(sample_data_with_nan, action_idx=2)
@@ -363,6 +495,22 @@ class TestDataSegmentation:
         
         assert len(valid_data) == 4  # Only 4 rows have valid wattage
         assert valid_data['summary_wattage'].notna().all()
+    
+    def test_get_valid_wattage_data_excludes_nan_and_outages(self):
+        """Test NaN and outage filters combine into one selection"""
+        df = pd.DataFrame({
+            'seconds': [-20, -10, 0, 10, 20],
+            'mode_power': [1000] * 5,
+            'summary_wattage': [1000, None, 1005, 1002, None],
+            'outage': [False, False, True, False, True]
+        })
+        preprocessor = DataPreprocessor(df, action_idx=2)
+        
+        valid_data = preprocessor.get_valid_wattage_data()
+        window = preprocessor.get_time_window(-10, 20, exclude_outages=True)
+        
+        assert list(valid_data['seconds']) == [-20, 10]
+        assert list(window['seconds']) == [-10, 10]
 
 
 class TestMetadataSummary:
@@ -190,7 +190,21 @@ class TestDataFrameValidator:
             validator.validate_data_quality(df, warnings)
         
         assert "data quality" in str(exc_info.value).lower()
-    
+
+    def test_validate_data_quality_precomputed_counts(self, validator):
+        """Test that precomputed counts are used instead of rescanning columns"""
+        df = pd.DataFrame({
+            'summary_wattage': [100, 200, 300, 400, 500],
+            'outage': [False] * 5
+        })
+
+        result = validator.validate_data_quality(
+            df, [], precomputed={'nan_wattage': 3, 'outage': 0}
+        )
+
+        assert any('NaN wattage percentage (60.0%)' in w for w in result)
+        assert not any('Outage' in w for w in result)
+
     def test_validate_column_ranges_power(self, validator, sample_df):
         """Test power range validation"""
         warnings = validator.validate_column_ranges(sample_df)
@@ -217,7 +231,22 @@ class TestDataFrameValidator:
         
         assert len(warnings) > 0
         assert any('above maximum temp' in w for w in warnings)
-    
+
+    def test_validate_column_ranges_ignores_nan(self, validator):
+        """Test that NaN values are not counted as out of range"""
+        df = pd.DataFrame({
+            'seconds': [-60, 0, 60],
+            'summary_wattage': [None, -5.0, 6000.0],
+            'psu_temp_max': [None, None, 45.0]
+        })
+
+        warnings = validator.validate_column_ranges(df)
+
+        assert warnings == [
+            "1 rows in 'summary_wattage' below minimum power (0.0W)",
+            "1 rows in 'summary_wattage' above maximum power (5000.0W)"
+        ]
+
     def test_validate_action_time_coverage_sufficient(self, validator, sample_df):
         """Test action time coverage validation with sufficient data"""
         # Action time at index 2 (t=0)
@@ -186,7 +186,34 @@ class TestOrchestratorIntegration:
         expected_cols = {'seconds', 'mode_power', 'summary_wattage', 
                         'temp_hash_board_max', 'psu_temp_max', 'outage'}
         assert expected_cols.issubset(first_row.keys())
-    
+
+    def test_raw_data_frame_format(self, temp_upstep_csv):
+        """Test that raw_data_format='frame' returns the preprocessed DataFrame"""
+        orchestrator = MetricOrchestrator()
+        records = orchestrator.process_file(temp_upstep_csv)['raw_data']
+        result = orchestrator.process_file(temp_upstep_csv, raw_data_format='frame')
+
+        assert result['success'] is True
+        assert isinstance(result['raw_data'], pd.DataFrame)
+        assert len(result['raw_data']) == len(records)
+
+        with pytest.raises(ValueError):
+            orchestrator.process_file(temp_upstep_csv, raw_data_format='json')
+
+    def test_raw_data_skipped_or_arrow(self, temp_upstep_csv):
+        """Test that raw_data can be skipped or returned as an Arrow table"""
+        pa = pytest.importorskip('pyarrow')
+        orchestrator = MetricOrchestrator()
+
+        skipped = orchestrator.process_file(temp_upstep_csv, raw_data_format=None)
+        assert skipped['success'] is True
+        assert skipped['raw_data'] is None
+
+        result = orchestrator.process_file(temp_upstep_csv, raw_data_format='arrow')
+        assert isinstance(result['raw_data'], pa.Table)
+        assert result['raw_data'].num_rows == skipped['metadata']['total_rows']
+        assert 'summary_wattage' in result['raw_data'].column_names
+
     def test_multiple_files_same_orchestrator(self, temp_upstep_csv, temp_downstep_csv):
         """Test processing multiple files with same orchestrator instance"""
         orchestrator = MetricOrchestrator()
@@ -204,6 +231,17 @@ class TestOrchestratorIntegration:
         # Results should be independent
         assert result1['metrics']['step_direction']['delta'] != result2['metrics']['step_direction']['delta']
 
+    def test_process_files_in_parallel(self, temp_upstep_csv, temp_downstep_csv):
+        """Test batch processing returns one result per file in input order"""
+        results = MetricOrchestrator.process_files(
+            [temp_upstep_csv, temp_downstep_csv, 'missing.csv'], workers=2
+        )
+
+        assert len(results) == 3
+        assert results[0]['metrics']['step_direction']['direction'] == 'UP-STEP'
+        assert results[1]['metrics']['step_direction']['direction'] == 'DOWN-STEP'
+        assert results[2]['success'] is False
+
 
 @pytest.mark.integration
 class TestOrchestratorWithRealFixtures:
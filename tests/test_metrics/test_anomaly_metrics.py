@@ -357,6 +357,99 @@ class TestMetric8SharpDrops:
         # Should not have excessive duplicates
         assert result['summary']['count'] <= 3
         
+    def test_window_minimum_ties_and_repeated_times(self):
+        """Test earliest minimum is used and repeated timestamps are rescanned"""
+        df = pd.DataFrame({
+            'seconds': [0, 0, 1, 2, 3, 10],
+            'mode_power': [3500] * 6,
+            'summary_wattage': [3500, 3600, 2500, 2500, 3000, 3000],
+            'temp_hash_board_max': [60] * 6,
+            'psu_temp_max': [40] * 6,
+            'outage': [False] * 6
+        })
+        
+        metrics = AnomalyMetrics(df, action_idx=0)
+        
+        result = metrics.calculate_sharp_drops()
+        
+        # Both samples at t=0 start a drop; t=1..2 are already covered
+        assert [d['time'] for d in result['sharp_drops']] == [0.0, 0.0]
+        assert [d['duration'] for d in result['sharp_drops']] == [1.0, 1.0]
+        assert result['sharp_drops'][1]['start_wattage'] == 3600.0
+        
+    def test_scan_kernel_matches_python_fallback(self):
+        """Test the compiled scan kernel agrees with its pure-Python body"""
+        from src.metrics.anomaly_metrics import _scan_drops_and_rises
+        
+        rng = np.random.default_rng(0)
+        times = np.sort(rng.choice(np.arange(0, 200, 0.5), 150))
+        wattages = rng.choice([1000.0, 2000.0, 3000.0, 3500.0], 150)
+        python_scan = getattr(_scan_drops_and_rises, 'py_func', _scan_drops_and_rises)
+        
+        result = _scan_drops_and_rises(times, wattages, 0.15, 5.0)
+        expected = python_scan(times, wattages, 0.15, 5.0)
+        
+        assert len(result[0]) > 0 and len(result[2]) > 0
+        for actual, reference in zip(result, expected):
+            np.testing.assert_array_equal(actual, reference)
+
+    def test_numpy_scan_matches_kernel(self):
+        """Test the sliding-window NumPy fallback agrees with the scan kernel"""
+        from src.metrics.anomaly_metrics import (
+            _scan_drops_and_rises, _scan_drops_and_rises_numpy
+        )
+
+        rng = np.random.default_rng(1)
+        times = np.sort(np.concatenate((
+            rng.choice(np.arange(0, 100, 0.5), 120),
+            rng.uniform(100, 200, 30)
+        )))
+        wattages = rng.choice([1000.0, 2000.0, 3000.0, 3500.0], 150)
+
+        result = _scan_drops_and_rises_numpy(times, wattages, 0.15, 5.0)
+        expected = _scan_drops_and_rises(times, wattages, 0.15, 5.0)
+
+        assert len(result[0]) > 0 and len(result[2]) > 0
+        for actual, reference in zip(result, expected):
+            np.testing.assert_array_equal(actual, reference)
+
+    def test_numpy_scan_blocks_dense_windows(self, monkeypatch):
+        """Test the NumPy fallback gives kernel results when windows span many row blocks"""
+        import src.metrics.anomaly_metrics as anomaly_module
+
+        # Every sample shares one window; a tiny budget forces many blocks
+        monkeypatch.setattr(anomaly_module, '_WINDOW_BLOCK_CELLS', 64)
+        rng = np.random.default_rng(2)
+        times = np.sort(rng.choice(np.arange(0, 4, 0.25), 300))
+        wattages = rng.choice([1000.0, 2000.0, 3000.0, 3500.0], 300)
+
+        result = anomaly_module._scan_drops_and_rises_numpy(times, wattages, 0.15, 5.0)
+        expected = anomaly_module._scan_drops_and_rises(times, wattages, 0.15, 5.0)
+
+        assert len(result[0]) > 0 and len(result[2]) > 0
+        for actual, reference in zip(result, expected):
+            np.testing.assert_array_equal(actual, reference)
+
+    def test_zero_wattage_cannot_start_event(self):
+        """Test that zero-power samples end drops but never start drops or rises"""
+        df = pd.DataFrame({
+            'seconds': [0, 1, 2, 3, 10, 11, 12],
+            'mode_power': [3500] * 7,
+            'summary_wattage': [3000, 0, 0, 3000, 3000, 3000, 3000],
+            'temp_hash_board_max': [60] * 7,
+            'psu_temp_max': [40] * 7,
+            'outage': [False] * 7
+        })
+
+        metrics = AnomalyMetrics(df, action_idx=0)
+
+        drops = metrics.calculate_sharp_drops()
+        rises = metrics.calculate_sharp_rises()
+
+        assert [d['time'] for d in drops['sharp_drops']] == [0.0]
+        assert drops['sharp_drops'][0]['end_wattage'] == 0.0
+        assert rises['summary']['count'] == 0
+
     def test_all_nan_values(self):
         """Test handling of all NaN wattage values"""
         df = pd.DataFrame({
@@ -150,6 +150,20 @@ class TestMetric1StartPower:
         expected_median = np.median([3450, 3460, 3458, 3462])
         assert result['median'] == pytest.approx(expected_median, abs=1)
 
+    def test_nan_median_kernel_matches_numpy(self):
+        """Test the compiled nan-median agrees with the NumPy fallback"""
+        from src.metrics.basic_metrics import _nan_median, _nan_median_numpy
+
+        rng = np.random.default_rng(0)
+        for size in (1, 2, 7, 50):
+            values = rng.uniform(3000, 4000, size)
+            values[rng.random(size) < 0.3] = np.nan
+            values[0] = 3500.0
+
+            assert _nan_median(values) == _nan_median_numpy(values)
+
+        assert np.isnan(_nan_median(np.array([np.nan, np.nan])))
+
 
 class TestMetric2TargetPower:
     """Tests for METRIC 2: Target Power extraction"""
@@ -312,6 +326,22 @@ class TestMetric2TargetPower:
         assert result['after'] == 3500.0
         assert result['change'] == 2500.0
 
+    def test_action_at_first_row_error(self):
+        """Test target power when there is no row before the action"""
+        df = pd.DataFrame({
+            'seconds': [0, 10, 20, 30],
+            'mode_power': [3500] * 4,
+            'summary_wattage': [3450, 3455, 3460, 3458],
+            'temp_hash_board_max': [65] * 4,
+            'psu_temp_max': [45] * 4,
+            'outage': [False] * 4
+        })
+
+        metrics = BasicMetrics(df, action_idx=0)
+
+        with pytest.raises(ValueError, match="No target power before action"):
+            metrics.calculate_target_power()
+
 
 class TestBasicMetricsIntegration:
     """Integration tests using real data patterns"""
@@ -407,7 +407,29 @@ class TestMetric10OvershootUndershoot:
             assert result['overshoot']['duration'] > 0
             # Peak time should be >= initial crossing time
             assert result['overshoot']['peak_time'] >= result['overshoot']['time']
-            
+
+    def test_undershoot_duration_skips_nan(self):
+        """Test that a NaN sample after the low point does not end the undershoot"""
+        df = pd.DataFrame({
+            'seconds': [0, 10, 20, 30, 40, 50],
+            'mode_power': [1500] * 6,
+            'summary_wattage': [3000, 1100, 1000, np.nan, 1200, 1500],
+            'temp_hash_board_max': [60] * 6,
+            'psu_temp_max': [40] * 6,
+            'outage': [False] * 6
+        })
+
+        metrics = AnomalyMetrics(df, action_idx=0)
+        target_power = {'after': 1500.0}
+        step_direction = {'delta': -1500.0}  # DOWN-STEP
+
+        result = metrics.calculate_overshoot_undershoot(target_power, step_direction)
+
+        assert result['undershoot']['occurred'] is True
+        assert result['undershoot']['time'] == 10.0
+        assert result['undershoot']['lowest_time'] == 20.0
+        assert result['undershoot']['duration'] == 40.0
+
     def test_minimal_step_no_detection(self):
         """Test that MINIMAL-STEP with small delta behaves correctly"""
         df = pd.DataFrame({
@@ -8,7 +8,9 @@ import pytest
 import os
 import tempfile
 import shutil
+import time
 from pathlib import Path
+from unittest.mock import patch
 
 from src.pipeline.report_pipeline import (
     ReportPipeline,
@@ -263,4 +265,100 @@ class TestBatchProcessing:
         assert result['failed'] == 0
         assert result['reports'] == []
         assert result['errors'] == []
-
+    
+    def test_generate_batch_analyzes_per_file_by_default(self, temp_dir, batch_csv_dir):
+        """Test the Message Batches API is opt-in; default is one call per file."""
+        pipeline = ReportPipeline(output_dir=temp_dir, enable_analysis=True)
+        
+        with patch('src.pipeline.report_pipeline.get_analysis_batch') as mock_batch, \
+                patch('src.pipeline.report_pipeline.get_analysis') as mock_single:
+            mock_single.return_value = {
+                'analysis': 'Single analysis.',
+                'tokens_used': {'total': 100, 'input': 50, 'output': 50}
+            }
+            
+            result = pipeline.generate_batch(batch_csv_dir, pattern='r*_39*.csv')
+        
+        assert result['successful'] == result['total_files']
+        assert mock_single.call_count == result['total_files']
+        mock_batch.assert_not_called()
+        assert result['analysis_wait_seconds'] == 0
+    
+    def test_generate_batch_uses_one_batched_analysis_request(self, temp_dir, batch_csv_dir):
+        """Test opted-in batches send all prompts in one batch request."""
+        pipeline = ReportPipeline(output_dir=temp_dir, enable_analysis=True)
+        
+        with patch('src.pipeline.report_pipeline.get_analysis_batch') as mock_batch, \
+                patch('src.pipeline.report_pipeline.get_analysis') as mock_single:
+            mock_batch.side_effect = lambda prompts, max_wait: [
+                {'test_id': item['test_id'], 'analysis': 'Batched analysis.'}
+                for item in prompts
+            ]
+            
+            result = pipeline.generate_batch(
+                batch_csv_dir, pattern='r*_39*.csv', use_batch_api=True, batch_max_wait=600
+            )
+        
+        assert result['total_files'] >= 2
+        assert result['successful'] == result['total_files']
+        assert mock_batch.call_count == 1
+        assert len(mock_batch.call_args.args[0]) == result['total_files']
+        assert mock_batch.call_args.kwargs['max_wait'] == 600
+        mock_single.assert_not_called()
+        
+        for report_path in result['reports']:
+            with open(report_path, encoding='utf-8') as f:
+                assert 'Batched analysis.' in f.read()
+    
+    def test_generate_batch_batched_analysis_failure_falls_back(self, temp_dir, batch_csv_dir):
+        """Test a failed or timed-out batch falls back to per-file analysis."""
+        pipeline = ReportPipeline(output_dir=temp_dir, enable_analysis=True)
+        
+        with patch('src.pipeline.report_pipeline.get_analysis_batch') as mock_batch, \
+                patch('src.pipeline.report_pipeline.get_analysis') as mock_single:
+            mock_batch.side_effect = TimeoutError("Message batch did not finish")
+            mock_single.return_value = {
+                'analysis': 'Fallback analysis.',
+                'tokens_used': {'total': 100, 'input': 50, 'output': 50}
+            }
+            
+            result = pipeline.generate_batch(batch_csv_dir, pattern='r*_39*.csv', use_batch_api=True)
+        
+        assert result['failed'] == 0
+        assert result['successful'] == result['total_files']
+        assert mock_single.call_count == result['total_files']
+        
+        for report_path in result['reports']:
+            with open(report_path, encoding='utf-8') as f:
+                assert 'Fallback analysis.' in f.read()
+    
+    def test_generate_batch_batched_analysis_failure_continues(self, temp_dir, batch_csv_dir):
+        """Test reports are still saved when the batch and fallback requests fail."""
+        pipeline = ReportPipeline(output_dir=temp_dir, enable_analysis=True)
+        
+        with patch('src.pipeline.report_pipeline.get_analysis_batch') as mock_batch, \
+                patch('src.pipeline.report_pipeline.get_analysis') as mock_single:
+            mock_batch.side_effect = RuntimeError("API unavailable")
+            mock_single.side_effect = RuntimeError("API unavailable")
+            
+            result = pipeline.generate_batch(batch_csv_dir, pattern='r*_39*.csv', use_batch_api=True)
+        
+        assert result['failed'] == 0
+        assert result['successful'] == result['total_files']
+    
+    def test_generate_batch_excludes_analysis_wait_from_file_duration(self, temp_dir, batch_csv_dir):
+        """Test the shared batch wait is reported once, not added to each file."""
+        pipeline = ReportPipeline(output_dir=temp_dir, enable_analysis=True)
+        
+        def slow_batch(prompts, max_wait):
+            time.sleep(1.0)
+            return [{'test_id': item['test_id'], 'analysis': 'Batched.'} for item in prompts]
+        
+        with patch('src.pipeline.report_pipeline.get_analysis_batch', side_effect=slow_batch), \
+                patch.object(pipeline, '_record_batch_result', wraps=pipeline._record_batch_result) as record:
+            result = pipeline.generate_batch(batch_csv_dir, pattern='r*_39*.csv', use_batch_api=True)
+        
+        file_durations = [call.args[2]['duration_seconds'] for call in record.call_args_list]
+        assert result['analysis_wait_seconds'] >= 1.0
+        assert len(file_durations) == result['total_files']
+        assert all(duration < result['analysis_wait_seconds'] for duration in file_durations)
@@ -244,6 +244,20 @@ class TestReportGeneration:
         assert 'raw_data' in result
         assert len(result['metrics']) > 0
     
+    def test_build_analysis_prompt_uses_ingested_frame(self, temp_dir, sample_csv):
+        """Prompt CSV comes from the in-memory frame without re-reading the file."""
+        import pandas as pd
+        from src.analysis.claude_client import format_csv_for_llm
+        
+        pipeline = ReportPipeline(output_dir=temp_dir)
+        orchestrator_result = pipeline._calculate_metrics(sample_csv)
+        
+        with patch('pandas.read_csv', side_effect=AssertionError("CSV re-read")):
+            blocks = pipeline._build_analysis_prompt(orchestrator_result, sample_csv)
+        
+        expected_csv, _ = format_csv_for_llm(pd.read_csv(sample_csv))
+        assert blocks[-1]['text'].endswith(expected_csv)
+    
     def test_generate_visualization_success(self, temp_dir, sample_csv):
         """Test _generate_visualization creates valid HTML."""
         pipeline = ReportPipeline(output_dir=temp_dir)